@@ -10,6 +10,8 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.1/ref/settings/
 """
 
+import os
+import tempfile
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -44,6 +46,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'task.middleware.RequestMetricsMiddleware',
+    'task.middleware.CompressionMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -77,12 +81,51 @@ WSGI_APPLICATION = 'TaskManagement.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.1/ref/settings/#databases
 
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+# TASK_DATABASE=postgresql switches to PostgreSQL, configured by the
+# TASK_DB_* environment variables; SQLite is the default.
+TASK_DATABASE = os.environ.get('TASK_DATABASE', 'sqlite')
+
+if TASK_DATABASE == 'postgresql':
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': os.environ.get('TASK_DB_NAME', 'task_management'),
+            'USER': os.environ.get('TASK_DB_USER', 'postgres'),
+            'PASSWORD': os.environ.get('TASK_DB_PASSWORD', ''),
+            'HOST': os.environ.get('TASK_DB_HOST', 'localhost'),
+            'PORT': os.environ.get('TASK_DB_PORT', '5432'),
+            # Connections come from the psycopg pool (pip install "psycopg[pool]"),
+            # which does not mix with persistent connections.
+            'CONN_MAX_AGE': 0,
+            'OPTIONS': {
+                'pool': {
+                    'min_size': int(os.environ.get('TASK_DB_POOL_MIN', 2)),
+                    'max_size': int(os.environ.get('TASK_DB_POOL_MAX', 20)),
+                    'timeout': 10,
+                },
+            },
+        }
+    }
+else:
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': BASE_DIR / 'db.sqlite3',
+            # Keep connections open between requests, checking they still work
+            # before reuse. Under ASGI set TASK_DB_CONN_MAX_AGE=0, as Django
+            # advises for persistent connections there.
+            'CONN_MAX_AGE': int(os.environ.get('TASK_DB_CONN_MAX_AGE', 600)),
+            'CONN_HEALTH_CHECKS': True,
+            'OPTIONS': {
+                # Seconds a writer waits for the lock before "database is locked".
+                'timeout': 20,
+                # Take the write lock when a transaction starts. A deferred
+                # transaction that reads and then writes fails at once, without
+                # waiting, when another writer got there first.
+                'transaction_mode': 'IMMEDIATE',
+            },
+        }
     }
-}
 
 
 # Password validation
@@ -133,6 +176,26 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 AUTH_USER_MODEL = 'task.User'
 REST_FRAMEWORK = {
     'DEFAULT_SCHEMA_CLASS' : 'drf_spectacular.openapi.AutoSchema',
+    'DEFAULT_AUTHENTICATION_CLASSES': [
+        'task.authentication.CachedTokenAuthentication',
+        'rest_framework.authentication.SessionAuthentication',
+        'rest_framework.authentication.BasicAuthentication',
+    ],
+    # JSON stays the default, `Accept: application/msgpack` picks MessagePack.
+    'DEFAULT_RENDERER_CLASSES': [
+        'rest_framework.renderers.JSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+        'task.renderers.MessagePackRenderer',
+    ],
+    'DEFAULT_THROTTLE_CLASSES': [
+        'task.throttling.TokenBucketThrottle',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'rest_framework.parsers.JSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+        'task.renderers.MessagePackParser',
+    ],
 }
 
 SPECTACULAR_SETTINGS = {
@@ -140,4 +203,135 @@ SPECTACULAR_SETTINGS = {
 }
 
 LOGIN_REDIRECT_URL = 'task:home'
-LOGIN_URL = 'task:login'
\ No newline at end of file
+LOGIN_URL = 'task:login'
+
+# Task list pagination
+TASK_PAGE_SIZE = 50
+TASK_MAX_PAGE_SIZE = 500
+
+# Bulk task endpoint
+TASK_BULK_MAX_ITEMS = 10000
+TASK_BULK_BATCH_SIZE = 500
+
+# Task ids carry a worker id (0-1023) that must differ between all processes
+# creating tasks. Each process takes the first free id of TASK_ID_WORKER_RANGE
+# by locking its byte of TASK_ID_LEASE_FILE until it exits. Hosts sharing a
+# database need disjoint ranges ('0-255', '256-511', ...); or set
+# TASK_ID_WORKER_ID in the environment of each process, e.g. from a gunicorn
+# post_fork hook.
+TASK_ID_LEASE_FILE = os.environ.get('TASK_ID_LEASE_FILE', os.path.join(tempfile.gettempdir(), 'task-ids.lock'))
+TASK_ID_WORKER_RANGE = tuple(int(part) for part in os.environ.get('TASK_ID_WORKER_RANGE', '0-1023').split('-'))
+
+# Rows fetched per database round trip by the streaming task export
+TASK_EXPORT_CHUNK_SIZE = 2000
+
+# Streaming task import
+TASK_IMPORT_CHUNK_SIZE = 1000
+TASK_IMPORT_MAX_ERRORS = 1000
+
+# Caches
+# https://docs.djangoproject.com/en/5.1/topics/cache/
+# Point TASK_CACHE_ALIAS at a shared backend (Redis, Memcached) when running
+# more than one process, otherwise each process keeps its own copy.
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'task-management',
+    }
+}
+
+TASK_CACHE_ALIAS = 'default'
+TASK_CACHE_TIMEOUT = 300
+
+# In-process cache of API token lookups. Entries are dropped when the token
+# or its user changes in this process; other processes see the change once
+# the TTL (seconds) runs out.
+TASK_AUTH_CACHE_TTL = 60
+TASK_AUTH_CACHE_SIZE = 10000
+
+# Per request query count and timings (Server-Timing header, task.metrics
+# logger and /api/v1/metrics/)
+TASK_REQUEST_METRICS = DEBUG
+
+# Due date reminders (manage.py run_reminders)
+# A task due on D is reminded at TASK_REMINDER_TIME on D - TASK_REMINDER_DAYS_BEFORE.
+TASK_REMINDER_DAYS_BEFORE = 1
+TASK_REMINDER_TIME = '09:00'
+TASK_REMINDER_SINK = 'task.reminders.EmailSink'
+TASK_REMINDER_BATCH_SIZE = 500
+TASK_REMINDER_MAX_HEAP = 100000
+TASK_REMINDER_POLL_SECONDS = 30
+TASK_REMINDER_CATCH_UP_HOURS = 1
+
+EMAIL_BACKEND = 'django.core.mail.backends.console.EmailBackend'
+DEFAULT_FROM_EMAIL = 'tasks@localhost'
+
+# Task search only pages through this many top ranked results
+TASK_SEARCH_MAX_RESULTS = 1000
+
+# Delta sync (/api/v1/task/sync/)
+# Cursors stay TASK_SYNC_LAG_SECONDS behind the clock so rows written by
+# transactions that commit late are not skipped; recent changes may be sent twice.
+# This assumes every write commits within the lag of stamping updated_at or
+# deleted_at. Bulk writes, imports and archive batches stamp their rows in
+# their last statements, so the time is that of one UPDATE or INSERT of
+# TASK_BULK_MAX_ITEMS / TASK_ARCHIVE_BATCH_SIZE rows plus the commit. An
+# atomic /api/v1/batch/ holds earlier items' rows until its last item is done.
+# The task.sync logger warns when a write commits later than this.
+TASK_SYNC_LAG_SECONDS = 5
+# Tombstones are pruned after this many days (manage.py prune_tombstones);
+# older cursors get 410 Gone and the client syncs from scratch.
+TASK_SYNC_TOMBSTONE_DAYS = 30
+
+# Server-Sent Events change feed (/api/v1/task/events/, ASGI only)
+# Use 'task.events.RedisBackend' with TASK_EVENTS_REDIS_URL when running
+# several workers, so every worker sees the events of the others.
+TASK_EVENTS_BACKEND = 'task.events.LocalBackend'
+TASK_EVENTS_REDIS_URL = 'redis://localhost:6379/0'
+# Events buffered per connection before a slow client is told to resync
+TASK_EVENTS_QUEUE_SIZE = 100
+TASK_EVENTS_KEEPALIVE_SECONDS = 15
+
+# Response compression (task.middleware.CompressionMiddleware)
+# Bodies smaller than this are sent uncompressed. zstd is offered when the
+# zstandard package is installed, gzip otherwise.
+TASK_COMPRESSION_MIN_BYTES = 1024
+TASK_COMPRESSION_TYPES = ['application/json', 'application/msgpack']
+TASK_COMPRESSION_GZIP_LEVEL = 6
+TASK_COMPRESSION_ZSTD_LEVEL = 3
+
+# PRAGMAs run on every new SQLite connection (task.signals). WAL lets reads
+# go on while a write commits; synchronous=NORMAL is safe in WAL mode and only
+# risks the last commits on power loss. Negative cache_size is in KiB.
+TASK_SQLITE_PRAGMAS = {
+    'journal_mode': 'wal',
+    'synchronous': 'normal',
+    'cache_size': -64000,
+    'mmap_size': 256 * 1024 * 1024,
+}
+
+# Rate limiting (task.throttling), a token bucket per scope and client.
+# 'N/period' allows bursts of N requests refilled at N per period (s, min,
+# hour, day); None turns a scope off. Clients are counted per credentials
+# (token or session) or per IP without them, login always per IP.
+TASK_THROTTLE_RATES = {
+    'login': '10/min',
+    'reads': '600/min',
+    'writes': '120/min',
+    'export': '10/min',
+}
+# Use 'task.throttling.RedisBackend' with TASK_THROTTLE_REDIS_URL to share
+# the buckets between workers.
+TASK_THROTTLE_BACKEND = 'task.throttling.LocalBackend'
+TASK_THROTTLE_REDIS_URL = 'redis://localhost:6379/0'
+# Refilled buckets are dropped once the local backend holds more keys
+TASK_THROTTLE_MAX_KEYS = 100000
+
+# Most sub-requests accepted by /api/v1/batch/
+TASK_BATCH_MAX_REQUESTS = 20
+
+# Archive (task.archive): completed tasks not updated for this many days are
+# moved to the archive table by archive_tasks, in batches of this size.
+TASK_ARCHIVE_AFTER_DAYS = 90
+TASK_ARCHIVE_BATCH_SIZE = 500
@@ -0,0 +1,127 @@
+"""
+Task list latency before and after archive_tasks moves the old completed
+tasks out of the task table.
+
+Seeds with `manage.py seed_tasks` plus --history tasks completed over the
+past years (what piles up in a long running install), dates the completed
+tasks' last update to their due date, then times the heaviest users' list
+pages (uncached) before and after archiving, and the archive run itself.
+"""
+import argparse
+import io
+import random
+import time
+from datetime import datetime, time as day_time, timedelta
+
+from benchmarks.common import report, setup_django, timeit
+
+URLS = {
+    'list': '',
+    'list_pending': '?status=pending',
+    'list_by_update': '?ordering=-updated_at',
+}
+
+
+def add_history(count, years=3, batch_size=5000):
+    '''`count` completed tasks due over the past `years`, owned like the seeded ones'''
+    from django.db import transaction
+    from django.db.models import Count
+    from django.utils import timezone
+    from task import stats
+    from task.ids import next_task_id
+    from task.models import TaskModel
+
+    rng = random.Random(1)
+    owners = list(TaskModel.objects.values('user').annotate(tasks=Count('id')).values_list('user', 'tasks'))
+    user_ids, weights = zip(*owners)
+    today = timezone.localdate()
+    for start in range(0, count, batch_size):
+        with transaction.atomic():
+            batch = TaskModel.objects.bulk_create([
+                TaskModel(user_id=user_id, task_id=next_task_id(), title='Done', description='Finished a while ago',
+                          due_date=today - timedelta(days=rng.randint(1, 365 * years)), status='completed')
+                for user_id in rng.choices(user_ids, weights, k=min(batch_size, count - start))
+            ])
+            stats.record(stats.added(batch))
+
+
+def age_completed_tasks():
+    '''Completed tasks were last touched when they were due'''
+    from django.utils import timezone
+    from task.models import TaskModel
+
+    completed = TaskModel.objects.filter(status='completed', due_date__lt=timezone.localdate())
+    for due_date in completed.values_list('due_date', flat=True).distinct():
+        updated_at = timezone.make_aware(datetime.combine(due_date, day_time(18)))
+        completed.filter(due_date=due_date).update(updated_at=updated_at)
+
+
+def measure(users, repeat):
+    from django.core.cache import cache
+    from django.urls import reverse
+    from rest_framework.test import APIClient
+
+    base = reverse('task:task-list')
+    results = {}
+    for name, query in URLS.items():
+        samples = []
+        for user in users:
+            client = APIClient()
+            client.force_authenticate(user=user)
+
+            def get():
+                cache.clear()
+                response = client.get(base + query)
+                assert response.status_code == 200, response.status_code
+
+            samples.append(timeit(get, repeat))
+        results[name] = {
+            key: round(sum(sample[key] for sample in samples) / len(samples), 3)
+            for key in ('mean_ms', 'p50_ms', 'p95_ms', 'p99_ms')
+        }
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--users', type=int, default=50)
+    parser.add_argument('--tasks', type=int, default=100_000)
+    parser.add_argument('--history', type=int, default=200_000, help='Extra tasks completed in the past years')
+    parser.add_argument('--days', type=int, default=30, help='Archive tasks completed longer ago than this')
+    parser.add_argument('--heaviest', type=int, default=5, help='How many of the largest users to time')
+    parser.add_argument('--repeat', type=int, default=30)
+    args = parser.parse_args()
+
+    setup_django()
+    from django.contrib.auth import get_user_model
+    from django.core.management import call_command
+    from django.db.models import Count
+    from task.models import ArchivedTask, TaskModel
+
+    call_command('seed_tasks', users=args.users, tasks=args.tasks, stdout=io.StringIO())
+    add_history(args.history)
+    age_completed_tasks()
+    users = list(get_user_model().objects.annotate(tasks=Count('TaskUser')).order_by('-tasks')[:args.heaviest])
+
+    before = measure(users, args.repeat)
+    start = time.perf_counter()
+    call_command('archive_tasks', days=args.days, stdout=io.StringIO())
+    archive_seconds = time.perf_counter() - start
+    after = measure(users, args.repeat)
+
+    report({
+        'users': args.users,
+        'tasks': args.tasks,
+        'history': args.history,
+        'heaviest_user_tasks': [user.tasks for user in users],
+        'archived': ArchivedTask.objects.count(),
+        'remaining': TaskModel.objects.count(),
+        'archive_seconds': round(archive_seconds, 2),
+        'before': before,
+        'after': after,
+        'speedup_p50': {name: round(before[name]['p50_ms'] / after[name]['p50_ms'], 2) for name in URLS},
+    })
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,88 @@
+"""
+Compare the sync DRF task API with the async native views, both served by
+uvicorn, reporting requests per second and latency percentiles per path.
+"""
+import argparse
+import asyncio
+import itertools
+import random
+
+from benchmarks.common import report, seed, setup_django
+from benchmarks.load import build_request, run_load, serve
+
+STACKS = {
+    'sync': {
+        'list': '/api/v1/task/',
+        'detail': '/api/v1/task/{pk}/',
+        'complete': '/api/v1/task/{pk}/completed',
+    },
+    'async': {
+        'list': '/api/v1/async/task/',
+        'detail': '/api/v1/async/task/{pk}/',
+        'complete': '/api/v1/async/task/{pk}/completed',
+    },
+}
+SCENARIOS = ('list', 'retrieve', 'create', 'update', 'complete')
+
+
+def request_factory(stack, scenario, owners, rng):
+    '''Cycle over users so list pages are not all served from one cache entry'''
+    routes = STACKS[stack]
+    users = itertools.cycle(owners)
+
+    def next_request():
+        token, task_ids = next(users)
+        headers = {'Authorization': f'Token {token}'}
+        if scenario == 'list':
+            return build_request('GET', routes['list'], headers)
+        if scenario == 'create':
+            return build_request('POST', routes['list'], headers, {
+                'title': 'Benchmark', 'description': 'Created by the benchmark',
+                'status': 'pending', 'due_date': '2099-12-25',
+            })
+        path = routes['complete' if scenario == 'complete' else 'detail'].format(pk=rng.choice(task_ids))
+        if scenario == 'retrieve':
+            return build_request('GET', path, headers)
+        if scenario == 'update':
+            return build_request('PATCH', path, headers, {'title': f'Renamed {rng.random()}'})
+        return build_request('PATCH', path, headers)
+
+    return next_request
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--users', type=int, default=200)
+    parser.add_argument('--tasks', type=int, default=20000)
+    parser.add_argument('--concurrency', type=int, default=256)
+    parser.add_argument('--duration', type=float, default=10.0)
+    parser.add_argument('--scenario', action='append', choices=SCENARIOS)
+    args = parser.parse_args()
+
+    setup_django()
+    users = seed(users=args.users, tasks=args.tasks)
+
+    from rest_framework.authtoken.models import Token
+    from task.models import TaskModel
+
+    owners = []
+    for user in users:
+        token = Token.objects.create(user=user)
+        owners.append((token.key, list(TaskModel.objects.filter(user=user).values_list('id', flat=True)[:50])))
+    owners = [owner for owner in owners if owner[1]]
+
+    rng = random.Random(0)
+    results = {'users': args.users, 'tasks': args.tasks, 'scenarios': {}}
+    with serve() as port:
+        for scenario in args.scenario or SCENARIOS:
+            results['scenarios'][scenario] = {
+                stack: asyncio.run(run_load(
+                    port, request_factory(stack, scenario, owners, rng), args.concurrency, args.duration,
+                ))
+                for stack in STACKS
+            }
+    report(results)
+
+
+if __name__ == '__main__':
+    main()
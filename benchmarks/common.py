@@ -0,0 +1,102 @@
+"""
+Shared setup for the benchmark scripts.
+
+Every script runs against a throwaway SQLite database so it never touches
+db.sqlite3. Run them from the project root, e.g.
+
+    python -m benchmarks.search --rows 1000000
+"""
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+WORDS = (
+    'invoice report meeting client budget review deploy release bug fix design '
+    'call email plan draft update schedule contract payment audit backlog sprint '
+    'customer server database migration backup security training hiring onboarding'
+).split()
+
+
+def setup_django(db_path=None):
+    '''Point the project at a fresh SQLite file, migrate it and return the path'''
+    db_path = db_path or os.path.join(tempfile.mkdtemp(prefix='task-bench-'), 'bench.sqlite3')
+    # Exported so servers started by the benchmark use the same database.
+    os.environ['TASK_BENCH_DB'] = db_path
+    os.environ['DJANGO_SETTINGS_MODULE'] = 'benchmarks.settings'
+    import django
+    django.setup()
+    from django.core.management import call_command
+    call_command('migrate', verbosity=0)
+    return db_path
+
+
+def sentence(rng, words):
+    return ' '.join(rng.choice(WORDS) for _ in range(words))
+
+
+def seed(users=10, tasks=1000, seed=0, batch_size=5000):
+    '''Bulk insert `users` users and `tasks` tasks spread over them'''
+    from django.contrib.auth import get_user_model
+    from task.ids import next_task_id
+    from task.models import TaskModel
+
+    rng = random.Random(seed)
+    User = get_user_model()
+    owners = User.objects.bulk_create([
+        User(email=f'bench{i}@example.com', name=f'Bench {i}') for i in range(users)
+    ])
+    statuses = ['pending'] * 5 + ['in_progress'] * 3 + ['completed'] * 2
+    today = date.today()
+    for start in range(0, tasks, batch_size):
+        TaskModel.objects.bulk_create([
+            TaskModel(
+                user=owners[rng.randrange(users)],
+                task_id=next_task_id(),
+                title=sentence(rng, 4),
+                description=sentence(rng, 30),
+                due_date=today + timedelta(days=rng.randint(-60, 120)),
+                status=rng.choice(statuses),
+            )
+            for _ in range(min(batch_size, tasks - start))
+        ])
+    return owners
+
+
+def percentiles(samples):
+    '''Latency summary in milliseconds of `samples` given in seconds'''
+    if not samples:
+        return {}
+    samples = sorted(samples)
+
+    def at(fraction):
+        return round(samples[min(len(samples) - 1, int(len(samples) * fraction))] * 1000, 3)
+
+    return {
+        'mean_ms': round(statistics.fmean(samples) * 1000, 3),
+        'p50_ms': at(0.50),
+        'p95_ms': at(0.95),
+        'p99_ms': at(0.99),
+        'max_ms': round(samples[-1] * 1000, 3),
+    }
+
+
+def timeit(func, repeat=20):
+    '''Run func `repeat` times and return latency percentiles in milliseconds'''
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - start)
+    return {'runs': repeat, **percentiles(samples)}
+
+
+def report(results):
+    print(json.dumps(results, indent=2, default=str))
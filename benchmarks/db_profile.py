@@ -0,0 +1,78 @@
+"""
+Concurrent read/write load against SQLite with the baseline settings
+(rollback journal, no busy timeout, a connection per request) and with the
+tuned profile (WAL, PRAGMAs, IMMEDIATE transactions, persistent connections).
+
+Several uvicorn worker processes serve a mix of list and retrieve reads and
+update, complete and create writes. Each profile runs on its own copy of the
+same seeded database; failed requests (mostly "database is locked") are
+counted in the statuses.
+"""
+import argparse
+import asyncio
+import os
+import random
+import shutil
+
+from benchmarks.common import report, seed, setup_django
+from benchmarks.load import run_load, serve
+
+PROFILES = ('baseline', 'tuned')
+
+
+def mixed_requests(owners, write_share, rng):
+    from benchmarks.async_views import request_factory
+
+    reads = [request_factory('sync', scenario, owners, rng) for scenario in ('list', 'retrieve')]
+    writes = [request_factory('sync', scenario, owners, rng) for scenario in ('update', 'complete', 'create')]
+
+    def next_request():
+        return rng.choice(writes if rng.random() < write_share else reads)()
+    return next_request
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--users', type=int, default=200)
+    parser.add_argument('--tasks', type=int, default=50000)
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--concurrency', type=int, default=64)
+    parser.add_argument('--duration', type=float, default=15.0)
+    parser.add_argument('--write-share', type=float, default=0.2)
+    args = parser.parse_args()
+
+    # Seed with the baseline so the file starts in rollback journal mode.
+    os.environ['TASK_BENCH_DB_PROFILE'] = 'baseline'
+    db_path = setup_django()
+    users = seed(users=args.users, tasks=args.tasks)
+
+    from django.db import connection
+    from rest_framework.authtoken.models import Token
+    from task.models import TaskModel
+
+    owners = []
+    for user in users:
+        token = Token.objects.create(user=user)
+        owners.append((token.key, list(TaskModel.objects.filter(user=user).values_list('id', flat=True)[:50])))
+    owners = [owner for owner in owners if owner[1]]
+    connection.close()
+
+    results = {
+        'users': args.users, 'tasks': args.tasks, 'workers': args.workers,
+        'write_share': args.write_share, 'profiles': {},
+    }
+    for profile in PROFILES:
+        path = f'{db_path}.{profile}'
+        shutil.copy(db_path, path)
+        os.environ['TASK_BENCH_DB'] = path
+        os.environ['TASK_BENCH_DB_PROFILE'] = profile
+        with serve(workers=args.workers) as port:
+            next_request = mixed_requests(owners, args.write_share, random.Random(0))
+            results['profiles'][profile] = asyncio.run(run_load(port, next_request, args.concurrency, args.duration))
+    baseline, tuned = (results['profiles'][profile] for profile in PROFILES)
+    results['throughput_gain'] = round(tuned['successful_per_second'] / baseline['successful_per_second'], 2)
+    report(results)
+
+
+if __name__ == '__main__':
+    main()
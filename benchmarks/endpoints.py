@@ -0,0 +1,270 @@
+"""
+Load test every API and HTML endpoint of the project under uvicorn, one
+endpoint after the other, with concurrent keep-alive clients spread over
+the users made by `manage.py seed_tasks`.
+
+Prints JSON with throughput, latency percentiles and queries per request
+(from the Server-Timing header) per endpoint. Save it with --output and
+pass it back as --baseline on the next release to list the regressions;
+the exit status is 1 when there are any.
+
+    python -m benchmarks.endpoints --output release.json
+    python -m benchmarks.endpoints --baseline release.json
+
+The event stream never ends and is left to benchmarks.events.
+"""
+import argparse
+import asyncio
+import io
+import itertools
+import json
+import os
+import random
+import re
+import sys
+from collections import deque
+
+from benchmarks.common import report, setup_django
+from benchmarks.load import build_request, run_load, serve
+
+PASSWORD = 'seed@123'
+QUERIES = re.compile(r'desc="(\d+) queries"')
+SERVER_TOTAL = re.compile(r'total;dur=([\d.]+)')
+# Stands for one of the client's task ids in a URL.
+TASK = object()
+
+
+class Clients:
+    '''The seeded users with a token, a session and some of their task ids'''
+
+    def __init__(self, users, delete_pool):
+        from importlib import import_module
+
+        from django.conf import settings
+        from django.contrib.auth import BACKEND_SESSION_KEY, HASH_SESSION_KEY, SESSION_KEY
+        from rest_framework.authtoken.models import Token
+        from task.models import TaskModel
+
+        tokens = Token.objects.bulk_create([Token(user=user, key=Token.generate_key()) for user in users])
+        SessionStore = import_module(settings.SESSION_ENGINE).SessionStore
+        self.users = []
+        for user, token in zip(users, tokens):
+            task_ids = list(TaskModel.objects.filter(user=user).values_list('id', flat=True)[:50])
+            if not task_ids:
+                continue
+            session = SessionStore()
+            session.update({
+                SESSION_KEY: str(user.pk),
+                BACKEND_SESSION_KEY: settings.AUTHENTICATION_BACKENDS[0],
+                HASH_SESSION_KEY: user.get_session_auth_hash(),
+            })
+            session.create()
+            self.users.append({
+                'email': user.email,
+                'task_ids': task_ids,
+                'api': {'Authorization': f'Token {token.key}'},
+                'html': {'Cookie': f'{settings.SESSION_COOKIE_NAME}={session.session_key}'},
+            })
+        admin = type(users[0]).objects.create_superuser('bench-admin@example.com', PASSWORD)
+        self.admin = {'Authorization': f'Token {Token.objects.create(user=admin).key}'}
+
+        # Tasks only there to be deleted, one DELETE each.
+        owner = next(user for user in users if user.email == self.users[0]['email'])
+        TaskModel.objects.bulk_create([
+            TaskModel(user=owner, task_id=10 ** 15 + i, title='Delete me', description='D',
+                      due_date='2099-12-25', status='pending')
+            for i in range(delete_pool)
+        ])
+        self.owner_api = self.users[0]['api']
+        self.doomed = deque(TaskModel.objects.filter(title='Delete me', user=owner).values_list('id', flat=True))
+        self.cycle = itertools.cycle(self.users)
+
+    def next(self):
+        return next(self.cycle)
+
+
+def multipart(name, filename, content):
+    boundary = 'benchmark-boundary'
+    body = (
+        f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"; filename="{filename}"\r\n'
+        f'Content-Type: application/octet-stream\r\n\r\n'
+    ).encode() + content + f'\r\n--{boundary}--\r\n'.encode()
+    return body, f'multipart/form-data; boundary={boundary}'
+
+
+def endpoints(clients, rng):
+    '''name -> function returning the next raw request of that endpoint'''
+    from django.urls import reverse
+
+    def url(name, *args):
+        return reverse(f'task:{name}', args=args)
+
+    def task_id(user):
+        return rng.choice(user['task_ids'])
+
+    def get(name, *args, query='', auth='api'):
+        def next_request():
+            user = clients.next()
+            path = url(name, *[task_id(user) if arg is TASK else arg for arg in args]) + query
+            return build_request('GET', path, user[auth])
+        return next_request
+
+    def write(method, name, body, *args):
+        def next_request():
+            user = clients.next()
+            path = url(name, *[task_id(user) if arg is TASK else arg for arg in args])
+            return build_request(method, path, user['api'], body() if callable(body) else body)
+        return next_request
+
+    new_task = {'title': 'Benchmark', 'description': 'Created by the benchmark',
+                'status': 'pending', 'due_date': '2099-12-25'}
+    emails = itertools.count()
+    lines = b'\n'.join(json.dumps(new_task).encode() for _ in range(5))
+    upload, upload_type = multipart('file', 'tasks.ndjson', lines)
+
+    def delete():
+        path = url('task-detail', clients.doomed.popleft()) if clients.doomed else url('task-detail', 0)
+        return build_request('DELETE', path, clients.owner_api)
+
+    def token():
+        user = clients.next()
+        return build_request('POST', url('token'), {}, {'email': user['email'], 'password': PASSWORD})
+
+    def register():
+        return build_request('POST', url('register'), {}, {
+            'email': f'bench-new{next(emails)}@example.com', 'password': PASSWORD, 'name': 'New',
+        })
+
+    def import_file():
+        user = clients.next()
+        return build_request('POST', url('task-import-file'), {**user['api'], 'Content-Type': upload_type}, upload)
+
+    def batch():
+        user = clients.next()
+        return build_request('POST', url('batch'), user['api'], {'requests': [
+            {'path': url('user')},
+            {'path': url('task-list')},
+            {'path': url('task-detail', task_id(user))},
+            {'path': url('task-detail', task_id(user))},
+            {'path': url('task-stats')},
+        ]})
+
+    def metrics():
+        return build_request('GET', url('metrics'), clients.admin)
+
+    return {
+        'api.list': get('task-list'),
+        'api.list_filtered': get('task-list', query='?status=pending&ordering=due_date'),
+        'api.list_fields': get('task-list', query='?fields=id,title,status'),
+        'api.retrieve': get('task-detail', TASK),
+        'api.create': write('POST', 'task-list', new_task),
+        'api.update': write('PATCH', 'task-detail', lambda: {'title': f'Renamed {rng.random()}'}, TASK),
+        'api.complete': write('PATCH', 'completed', None, TASK),
+        'api.delete': delete,
+        'api.bulk': write('POST', 'task-bulk', {'create': [new_task] * 10}),
+        'api.stats': get('task-stats'),
+        'api.sync': get('task-sync'),
+        'api.search': get('task-search', query='?q=invoice'),
+        'api.export': get('task-export', query='?file_format=csv'),
+        'api.import': import_file,
+        'api.user': get('user'),
+        'api.token': token,
+        'api.register': register,
+        'api.batch': batch,
+        'api.metrics': metrics,
+        'async.list': get('async_task_list'),
+        'async.retrieve': get('async_task_detail', TASK),
+        'async.complete': write('PATCH', 'async_completed', None, TASK),
+        'html.home': get('home', auth='html'),
+        'html.login': get('login', auth='html'),
+        'html.signup': get('signupUser', auth='html'),
+        'html.task_list': get('task_list', auth='html'),
+        'html.task_detail': get('task_detail', TASK, auth='html'),
+        'html.task_create': get('create_task', auth='html'),
+        'html.task_update': get('update_task', TASK, auth='html'),
+        'html.task_delete': get('delete_task', TASK, auth='html'),
+    }
+
+
+def measure(port, next_request, concurrency, duration):
+    queries, server_ms = [], []
+
+    def on_response(status, headers, body):
+        timing = headers.get('server-timing', '')
+        match = QUERIES.search(timing)
+        if match:
+            queries.append(int(match.group(1)))
+            server_ms.append(float(SERVER_TOTAL.search(timing).group(1)))
+
+    result = asyncio.run(run_load(port, next_request, concurrency, duration, on_response))
+    result['queries_per_request'] = round(sum(queries) / len(queries), 2) if queries else None
+    result['server_mean_ms'] = round(sum(server_ms) / len(server_ms), 3) if server_ms else None
+    return result
+
+
+def regressions(baseline, results, tolerance):
+    '''Endpoints that got slower, less productive or chattier than in `baseline`'''
+    found = []
+    for name, current in results.items():
+        before = baseline.get(name)
+        if before is None:
+            continue
+        checks = [
+            ('successful_per_second', current['successful_per_second'] < before['successful_per_second'] * (1 - tolerance)),
+            ('p95_ms', current.get('p95_ms', 0) > before.get('p95_ms', 0) * (1 + tolerance)),
+            ('queries_per_request', (current['queries_per_request'] or 0) > (before['queries_per_request'] or 0) + 0.5),
+        ]
+        for metric, worse in checks:
+            if worse:
+                found.append({'endpoint': name, 'metric': metric, 'baseline': before.get(metric), 'current': current.get(metric)})
+    return found
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--users', type=int, default=100)
+    parser.add_argument('--tasks', type=int, default=20000)
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--duration', type=float, default=3.0, help='Seconds per endpoint')
+    parser.add_argument('--workers', type=int, default=1, help='uvicorn worker processes')
+    parser.add_argument('--delete-pool', type=int, default=20000, help='Tasks set aside for the delete endpoint')
+    parser.add_argument('--endpoint', action='append', help='Only these endpoints (repeatable), e.g. api.list')
+    parser.add_argument('--output', help='Also write the JSON report to this file')
+    parser.add_argument('--baseline', help='A previous report to compare against')
+    parser.add_argument('--tolerance', type=float, default=0.2, help='Allowed relative change before a regression')
+    args = parser.parse_args()
+
+    os.environ['TASK_BENCH_REQUEST_METRICS'] = '1'
+    setup_django()
+    from django.contrib.auth import get_user_model
+    from django.core.management import call_command
+
+    call_command('seed_tasks', users=args.users, tasks=args.tasks, password=PASSWORD, stdout=io.StringIO())
+    clients = Clients(list(get_user_model().objects.filter(email__startswith='seed').order_by('pk')), args.delete_pool)
+    available = endpoints(clients, random.Random(0))
+    unknown = set(args.endpoint or ()) - set(available)
+    if unknown:
+        parser.error(f'unknown endpoints: {", ".join(sorted(unknown))}')
+
+    results = {}
+    with serve(workers=args.workers) as port:
+        for name in args.endpoint or available:
+            results[name] = measure(port, available[name], args.concurrency, args.duration)
+
+    summary = {
+        'users': args.users, 'tasks': args.tasks, 'concurrency': args.concurrency,
+        'duration': args.duration, 'workers': args.workers, 'endpoints': results,
+    }
+    if args.baseline:
+        with open(args.baseline) as f:
+            summary['regressions'] = regressions(json.load(f)['endpoints'], results, args.tolerance)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(summary, f, indent=2)
+    report(summary)
+    if summary.get('regressions'):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,50 @@
+"""
+Hold many idle SSE subscriptions in one event loop and fan events out to
+them, reporting memory per subscriber and dispatch latency.
+"""
+import argparse
+import asyncio
+import time
+import tracemalloc
+
+from benchmarks.common import report, setup_django
+
+
+async def run(subscribers, events):
+    from task.events import hub, render
+
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    subscriptions = [hub.subscribe(i % 1000) for i in range(subscribers)]
+    memory = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+
+    frame = render('updated', {'id': 1, 'title': 'Benchmark'})
+    start = time.perf_counter()
+    for i in range(events):
+        hub.dispatch(i % 1000, frame)
+    dispatch = time.perf_counter() - start
+    await asyncio.sleep(0)
+    delivered = sum(subscription.queue.qsize() for subscription in subscriptions)
+    for subscription in subscriptions:
+        hub.unsubscribe(subscription)
+    return {
+        'subscribers': subscribers,
+        'events': events,
+        'delivered': delivered,
+        'bytes_per_subscriber': round(memory / subscribers),
+        'dispatch_us_per_event': round(dispatch / events * 1e6, 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--subscribers', type=int, default=10000)
+    parser.add_argument('--events', type=int, default=1000)
+    args = parser.parse_args()
+    setup_django()
+    report(asyncio.run(run(args.subscribers, args.events)))
+
+
+if __name__ == '__main__':
+    main()
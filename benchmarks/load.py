@@ -0,0 +1,140 @@
+"""
+A small keep-alive HTTP/1.1 load generator on asyncio streams, and a helper
+to run the project under uvicorn for the duration of a benchmark.
+"""
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+from collections import Counter
+from contextlib import contextmanager
+
+from benchmarks.common import percentiles
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+@contextmanager
+def serve(app='TaskManagement.asgi:application', workers=1, extra_args=()):
+    '''Run `app` under uvicorn with the benchmark settings, yield its port'''
+    port = free_port()
+    process = subprocess.Popen(
+        [sys.executable, '-m', 'uvicorn', app, '--port', str(port), '--workers', str(workers),
+         '--log-level', 'warning', '--no-access-log', *extra_args],
+        env=os.environ.copy(),
+    )
+    try:
+        deadline = time.monotonic() + 30
+        while True:
+            try:
+                socket.create_connection(('127.0.0.1', port), timeout=1).close()
+                break
+            except OSError:
+                if process.poll() is not None or time.monotonic() > deadline:
+                    raise RuntimeError('uvicorn did not start')
+                time.sleep(0.1)
+        yield port
+    finally:
+        process.terminate()
+        process.wait(10)
+
+
+async def _read_response(reader):
+    status_line = await reader.readline()
+    if not status_line:
+        raise ConnectionError('connection closed')
+    status = int(status_line.split()[1])
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b'\n', b''):
+            break
+        name, _, value = line.decode('latin-1').partition(':')
+        headers[name.strip().lower()] = value.strip()
+    if 'content-length' in headers:
+        body = await reader.readexactly(int(headers['content-length']))
+    elif headers.get('transfer-encoding') == 'chunked':
+        body = b''
+        while True:
+            size = int((await reader.readline()).strip(), 16)
+            chunk = await reader.readexactly(size + 2)
+            if not size:
+                break
+            body += chunk[:-2]
+    else:
+        body = await reader.read()
+    return status, headers, body
+
+
+def build_request(method, path, headers=None, body=None):
+    '''A raw request; `body` is sent as JSON, or as is when it is bytes (set its Content-Type)'''
+    if body is None or isinstance(body, bytes):
+        payload = body or b''
+    else:
+        payload = json.dumps(body).encode()
+        headers = {'Content-Type': 'application/json', **(headers or {})}
+    lines = [f'{method} {path} HTTP/1.1', 'Host: 127.0.0.1', 'Connection: keep-alive']
+    for name, value in (headers or {}).items():
+        lines.append(f'{name}: {value}')
+    lines.append(f'Content-Length: {len(payload)}')
+    return ('\r\n'.join(lines) + '\r\n\r\n').encode() + payload
+
+
+async def _worker(port, next_request, deadline, latencies, statuses, on_response):
+    reader = writer = None
+    while time.monotonic() < deadline:
+        request = next_request()
+        start = time.perf_counter()
+        try:
+            if writer is None:
+                reader, writer = await asyncio.open_connection('127.0.0.1', port)
+            writer.write(request)
+            await writer.drain()
+            status, headers, body = await _read_response(reader)
+        except (ConnectionError, asyncio.IncompleteReadError, OSError):
+            statuses['connection_error'] += 1
+            if writer is not None:
+                writer.close()
+            reader = writer = None
+            continue
+        latencies.append(time.perf_counter() - start)
+        statuses[status] += 1
+        if on_response is not None:
+            on_response(status, headers, body)
+        if headers.get('connection') == 'close':
+            writer.close()
+            reader = writer = None
+    if writer is not None:
+        writer.close()
+
+
+async def run_load(port, next_request, concurrency=64, duration=10.0, on_response=None):
+    '''
+    Keep `concurrency` connections busy for `duration` seconds, each sending
+    the raw request returned by `next_request()` and waiting for the answer.
+    '''
+    latencies, statuses = [], Counter()
+    deadline = time.monotonic() + duration
+    started = time.perf_counter()
+    await asyncio.gather(*(
+        _worker(port, next_request, deadline, latencies, statuses, on_response) for _ in range(concurrency)
+    ))
+    elapsed = time.perf_counter() - started
+    return {
+        'requests': len(latencies),
+        'concurrency': concurrency,
+        'seconds': round(elapsed, 2),
+        'requests_per_second': round(len(latencies) / elapsed, 1),
+        'successful_per_second': round(
+            sum(count for status, count in statuses.items() if isinstance(status, int) and status < 400) / elapsed, 1,
+        ),
+        'statuses': {str(status): count for status, count in sorted(statuses.items(), key=str)},
+        **percentiles(latencies),
+    }
@@ -0,0 +1,54 @@
+"""
+Bytes on the wire and encode time of a task list response in JSON and
+MessagePack, each uncompressed, gzipped and zstd compressed (when the
+zstandard package is installed), at the project's compression levels.
+"""
+import argparse
+import json
+
+from benchmarks.common import report, seed, setup_django, timeit
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=10_000)
+    parser.add_argument('--repeat', type=int, default=10)
+    args = parser.parse_args()
+
+    setup_django()
+    seed(users=1, tasks=args.rows)
+
+    import msgpack
+    from rest_framework.renderers import JSONRenderer
+    from task import compression
+    from task.fastpath import RowEncoder
+    from task.models import TaskModel
+    from task.renderers import MessagePackRenderer
+
+    encoder = RowEncoder()
+    data = {'next': None, 'previous': None, 'results': encoder.encode(encoder.values(TaskModel.objects.all()))}
+    decoders = {'json': json.loads, 'msgpack': msgpack.unpackb}
+    results = {'rows': args.rows, 'formats': {}}
+    for name, renderer in (('json', JSONRenderer()), ('msgpack', MessagePackRenderer())):
+        body = renderer.render(data)
+        decode = decoders[name]
+        if decode(body) != json.loads(JSONRenderer().render(data)):
+            raise SystemExit(f'{name} does not round trip')
+        entry = {
+            'bytes': len(body),
+            'encode': timeit(lambda: renderer.render(data), args.repeat),
+            'decode': timeit(lambda: decode(body), args.repeat),
+        }
+        for coding in compression.available_codings():
+            compressed = compression.compress(coding, body)
+            entry[coding] = {
+                'bytes': len(compressed),
+                'ratio': round(len(body) / len(compressed), 1),
+                'compress': timeit(lambda: compression.compress(coding, body), args.repeat),
+            }
+        results['formats'][name] = entry
+    report(results)
+
+
+if __name__ == '__main__':
+    main()
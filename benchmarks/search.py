@@ -0,0 +1,53 @@
+"""
+Compare FTS5 task search with icontains filtering.
+
+Common words let icontains stop after the first page of matches, so the
+comparison also covers a rare word and the unscoped (admin) search where
+icontains has to scan the whole table.
+"""
+import argparse
+
+from benchmarks.common import report, seed, setup_django, timeit
+
+QUERIES = ('invoice', 'client budget', 'migr', 'zyzzyva')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    parser.add_argument('--users', type=int, default=100)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    setup_django()
+    owners = seed(users=args.users, tasks=args.rows)
+
+    from django.contrib.auth import get_user_model
+    from task import search
+    from task.models import TaskModel
+
+    # A handful of rows carry a rare word.
+    rare = list(TaskModel.objects.order_by('id').values_list('id', flat=True)[::max(1, args.rows // 50)])
+    for task in TaskModel.objects.filter(id__in=rare):
+        task.description += ' zyzzyva'
+        task.save(update_fields=['description'])
+
+    admin = get_user_model()(pk=0, is_superuser=True)
+    results = {'rows': args.rows, 'users': args.users, 'queries': {}}
+    for scope, user in (('user', owners[0]), ('all', admin)):
+        queryset = TaskModel.objects.all()
+        if scope == 'user':
+            queryset = queryset.filter(user=user)
+        for query in QUERIES:
+            fts = timeit(lambda: search._search_fts5(user, query, 20, 0), args.repeat)
+            icontains = timeit(lambda: search._search_icontains(queryset, query, 20, 0), args.repeat)
+            results['queries'][f'{scope}:{query}'] = {
+                'fts5': fts,
+                'icontains': icontains,
+                'speedup_p50': round(icontains['p50_ms'] / max(fts['p50_ms'], 1e-6), 1),
+            }
+    report(results)
+
+
+if __name__ == '__main__':
+    main()
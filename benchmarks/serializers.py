@@ -0,0 +1,67 @@
+"""
+Compare TaskSerializer with the .values() row encoder of task.fastpath.
+
+Each size first checks that both render byte identical JSON, then times the
+query plus serialization, and the serialization alone, for both paths.
+"""
+import argparse
+
+from benchmarks.common import report, seed, setup_django, timeit
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10_000, 100_000])
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    setup_django()
+    seed(users=1, tasks=max(args.sizes))
+
+    from rest_framework.renderers import JSONRenderer
+    from task.fastpath import RowEncoder
+    from task.models import TaskModel
+    from task.serializers import TaskSerializer
+
+    render = JSONRenderer().render
+    results = {'sizes': {}}
+    for size in args.sizes:
+        queryset = TaskModel.objects.order_by('due_date', 'id')[:size]
+
+        def serializer():
+            return TaskSerializer(list(queryset), many=True).data
+
+        def fastpath():
+            encoder = RowEncoder()
+            return encoder.encode(encoder.values(queryset))
+
+        identical = render(serializer()) == render(fastpath())
+        if not identical:
+            raise SystemExit(f'Outputs differ at {size} rows')
+
+        instances = list(queryset)
+        encoder = RowEncoder()
+        # Rows are converted in place, so each run builds its dicts from
+        # tuples the way .values() does.
+        rows = list(queryset.values_list(*encoder.columns))
+        timings = {
+            'serializer': timeit(serializer, args.repeat),
+            'fastpath': timeit(fastpath, args.repeat),
+            'serializer_render_only': timeit(lambda: TaskSerializer(instances, many=True).data, args.repeat),
+            'fastpath_render_only': timeit(
+                lambda: encoder.encode(dict(zip(encoder.columns, row)) for row in rows), args.repeat,
+            ),
+        }
+        results['sizes'][size] = {
+            'identical_json': identical,
+            **timings,
+            'speedup_p50': round(timings['serializer']['p50_ms'] / timings['fastpath']['p50_ms'], 1),
+            'render_speedup_p50': round(
+                timings['serializer_render_only']['p50_ms'] / timings['fastpath_render_only']['p50_ms'], 1,
+            ),
+        }
+    report(results)
+
+
+if __name__ == '__main__':
+    main()
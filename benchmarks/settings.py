@@ -0,0 +1,26 @@
+"""
+Settings for benchmark runs: the project settings (or TASK_BENCH_BASE_SETTINGS)
+pointed at the throwaway database in TASK_BENCH_DB, with DEBUG off.
+TASK_BENCH_DB_PROFILE=baseline restores SQLite's defaults, as the settings
+were before the tuned profile, for comparison. Rate limiting is off unless
+TASK_BENCH_THROTTLE=1, and TASK_BENCH_REQUEST_METRICS=1 turns the request
+metrics (and their Server-Timing header) on.
+"""
+import importlib
+import os
+
+_base = importlib.import_module(os.environ.get('TASK_BENCH_BASE_SETTINGS', 'TaskManagement.settings'))
+globals().update({name: value for name, value in vars(_base).items() if name.isupper()})
+
+DEBUG = False
+ALLOWED_HOSTS = ['*']
+TASK_REQUEST_METRICS = os.environ.get('TASK_BENCH_REQUEST_METRICS') == '1'
+if os.environ.get('TASK_BENCH_THROTTLE') != '1':
+    TASK_THROTTLE_RATES = {scope: None for scope in TASK_THROTTLE_RATES}
+DATABASES = {
+    **DATABASES,
+    'default': {**DATABASES['default'], 'NAME': os.environ['TASK_BENCH_DB']},
+}
+if os.environ.get('TASK_BENCH_DB_PROFILE') == 'baseline':
+    DATABASES['default'] = {'ENGINE': 'django.db.backends.sqlite3', 'NAME': os.environ['TASK_BENCH_DB']}
+    TASK_SQLITE_PRAGMAS = {}
@@ -0,0 +1,75 @@
+'''
+Cold storage for completed tasks. archive_completed moves tasks completed
+(last updated while completed) more than a number of days ago from
+TaskModel into ArchivedTask, so the active table and its indexes only hold
+the working set. restore moves one back, and takes back its tombstones so
+sync clients do not see it both changed and deleted.
+
+Each batch is its own short transaction, so writers to the task table are
+never held up for long. Moving a task out goes through the usual delete
+signals: its TaskStat counter drops, sync clients get a tombstone and the
+cached lists are invalidated, the same as for a deleted task.
+'''
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from task import stats, sync
+from task.models import ArchivedTask, TaskModel
+
+COPIED_FIELDS = ['id', 'user_id', 'task_id', 'title', 'description', 'due_date', 'status', 'created_at', 'updated_at']
+
+
+def archive_completed(days=None, batch_size=None, pause=0, progress=None):
+    '''
+    Move the tasks completed more than `days` ago to the archive,
+    `batch_size` at a time, sleeping `pause` seconds between batches.
+    Returns how many were moved.
+    '''
+    days = settings.TASK_ARCHIVE_AFTER_DAYS if days is None else days
+    batch_size = batch_size or settings.TASK_ARCHIVE_BATCH_SIZE
+    cutoff = timezone.now() - timedelta(days=days)
+    moved = 0
+    while True:
+        # The tombstones are written last, right before the commit.
+        with transaction.atomic(), sync.deferred(), stats.deferred():
+            # Oldest first along the updated_at index; locked so a task
+            # reopened meanwhile is not archived as completed.
+            tasks = list(
+                TaskModel.objects.select_for_update()
+                .filter(status='completed', updated_at__lt=cutoff)
+                .order_by('updated_at', 'id')
+                .values(*COPIED_FIELDS)[:batch_size]
+            )
+            if not tasks:
+                break
+            archived_at = timezone.now()
+            ArchivedTask.objects.bulk_create([ArchivedTask(archived_at=archived_at, **task) for task in tasks])
+            TaskModel.objects.filter(id__in=[task['id'] for task in tasks]).delete()
+        moved += len(tasks)
+        if progress:
+            progress(moved)
+        if pause:
+            time.sleep(pause)
+    return moved
+
+
+def restore(archived):
+    '''
+    Move `archived` back to the task table under its old id, returns the task.
+    Raises ArchivedTask.DoesNotExist when it was restored meanwhile.
+    '''
+    with transaction.atomic():
+        # Locked so two restores of the same row cannot both insert it.
+        archived = ArchivedTask.objects.select_for_update().get(pk=archived.pk)
+        task = TaskModel(**{field: getattr(archived, field) for field in COPIED_FIELDS if field != 'created_at'})
+        # Saved like any new task so counters, sync and events see it.
+        task.save(force_insert=True)
+        TaskModel.objects.filter(pk=task.pk).update(created_at=archived.created_at)
+        task.created_at = archived.created_at
+        sync.task_restored(task)
+        archived.delete()
+    return task
@@ -0,0 +1,217 @@
+'''
+Async native versions of the TaskView list, retrieve, create and update
+paths and of CompleteTaskView, for deployments on ASGI. They return the
+same JSON as the DRF views but are plain Django views, since DRF views
+are synchronous and would be run in a thread for every request.
+'''
+import json
+
+from django.http import JsonResponse
+from django.middleware.csrf import CsrfViewMiddleware
+from django.views.decorators.csrf import csrf_exempt
+
+from rest_framework import serializers, status
+from rest_framework.exceptions import Throttled
+from rest_framework.utils.urls import replace_query_param
+
+from task.authentication import aauthenticate
+from task.caching import acache_get, acache_set, alist_cache_key
+from task.conditional import alist_validators, not_modified, set_validators, task_validators
+from task.fastpath import RowEncoder
+from task.filters import TaskListFilterSerializer
+from task.ids import next_task_id
+from task.models import TaskModel
+from task.pagination import (
+    InvalidCursor, TaskCursorPagination, apaginate_keyset, decode_cursor, encode_cursor, get_page_size,
+)
+from task.serializers import TaskSerializer, selected_fields
+from task.throttling import TokenBucketThrottle
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+
+def _error(detail, status_code):
+    return JsonResponse({'detail': detail}, status=status_code)
+
+
+async def _authenticate(request):
+    '''The user, or the error response DRF would have sent'''
+    # Throttled first, in the same reads/writes buckets as the DRF views, as
+    # ThrottleFirstMixin does there.
+    throttle = TokenBucketThrottle()
+    if not throttle.allow_request(request, None):
+        throttled = Throttled(throttle.wait())
+        response = _error(throttled.detail, throttled.status_code)
+        response['Retry-After'] = '%d' % throttled.wait
+        return None, response
+    user = await aauthenticate(request)
+    if user is None:
+        response = _error('Authentication credentials were not provided.', status.HTTP_401_UNAUTHORIZED)
+        response['WWW-Authenticate'] = 'Token'
+        return None, response
+    if 'HTTP_AUTHORIZATION' not in request.META and request.method not in SAFE_METHODS:
+        # Session authenticated writes need a CSRF token, as in DRF.
+        reason = CsrfViewMiddleware(lambda request: None).process_view(request, None, (), {})
+        if reason is not None:
+            return None, _error('CSRF Failed.', status.HTTP_403_FORBIDDEN)
+    return user, None
+
+
+def _read_body(request):
+    if request.content_type == 'application/json':
+        try:
+            return json.loads(request.body or b'{}')
+        except ValueError:
+            return None
+    return request.POST.dict()
+
+
+def _queryset(user):
+    if user.is_superuser:
+        return TaskModel.objects.all()
+    return TaskModel.objects.filter(user=user)
+
+
+async def _owned_task(user, pk):
+    '''The task for a write, or the error response'''
+    try:
+        task = await TaskModel.objects.aget(pk=pk)
+    except (TaskModel.DoesNotExist, ValueError):
+        return None, _error('Not found.', status.HTTP_404_NOT_FOUND)
+    if task.user_id != user.id:
+        return None, JsonResponse({'error': 'You are not authorized to update this task.'},
+                                  status=status.HTTP_403_FORBIDDEN)
+    return task, None
+
+
+def _selected_fields(request):
+    '''The ?fields= / ?exclude= selection, or the 400 response DRF would send'''
+    try:
+        return selected_fields(request.GET), None
+    except serializers.ValidationError as error:
+        return None, JsonResponse(error.detail, status=status.HTTP_400_BAD_REQUEST)
+
+
+async def _list(request, user):
+    fields, error = _selected_fields(request)
+    if error:
+        return error
+    url = request.build_absolute_uri()
+    key = await alist_cache_key(user, 'api', url)
+    cached = await acache_get(key)
+    if cached is not None:
+        etag, last_modified, data = cached
+        return not_modified(request, etag, last_modified) or set_validators(JsonResponse(data), etag, last_modified)
+    params = TaskListFilterSerializer(data=request.GET, context={'all_users': user.is_superuser})
+    if not params.is_valid():
+        return JsonResponse(params.errors, status=status.HTTP_400_BAD_REQUEST)
+    queryset = _queryset(user)
+    etag, last_modified = await alist_validators(queryset, user, url)
+    response = not_modified(request, etag, last_modified)
+    if response is not None:
+        return response
+
+    ordering = params.validated_data['ordering']
+    pagination = TaskCursorPagination
+    token = request.GET.get(pagination.cursor_query_param)
+    try:
+        cursor = decode_cursor(token, ordering) if token else None
+    except InvalidCursor:
+        return _error(pagination.invalid_cursor_message, status.HTTP_404_NOT_FOUND)
+    page_size = get_page_size(request.GET.get(pagination.page_size_query_param))
+    encoder = RowEncoder(fields=fields, extra=[field.lstrip('-') for field in ordering])
+    rows, next_cursor, previous_cursor = await apaginate_keyset(
+        encoder.values(params.filter(queryset)), ordering, cursor, page_size,
+    )
+
+    def link(cursor):
+        return replace_query_param(url, pagination.cursor_query_param, encode_cursor(cursor)) if cursor else None
+
+    data = {
+        'next': link(next_cursor),
+        'previous': link(previous_cursor),
+        'results': encoder.encode(rows),
+    }
+    await acache_set(key, (etag, last_modified, data))
+    return set_validators(JsonResponse(data), etag, last_modified)
+
+
+async def _create(request, user):
+    data = _read_body(request)
+    if data is None:
+        return _error('JSON parse error.', status.HTTP_400_BAD_REQUEST)
+    serializer = TaskSerializer(data=data)
+    if not serializer.is_valid():
+        return JsonResponse(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+    task = await TaskModel.objects.acreate(user=user, task_id=next_task_id(), **serializer.validated_data)
+    return JsonResponse(TaskSerializer(task).data, status=status.HTTP_201_CREATED)
+
+
+async def _save(task, data, partial):
+    serializer = TaskSerializer(task, data=data, partial=partial)
+    if not serializer.is_valid():
+        return JsonResponse(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+    for attr, value in serializer.validated_data.items():
+        setattr(task, attr, value)
+    await task.asave()
+    return JsonResponse(TaskSerializer(task).data)
+
+
+@csrf_exempt
+async def task_list(request):
+    '''GET lists the tasks a page at a time, POST creates one'''
+    user, error = await _authenticate(request)
+    if error:
+        return error
+    if request.method == 'GET':
+        return await _list(request, user)
+    if request.method == 'POST':
+        return await _create(request, user)
+    return _error(f'Method "{request.method}" not allowed.', status.HTTP_405_METHOD_NOT_ALLOWED)
+
+
+@csrf_exempt
+async def task_detail(request, pk):
+    '''GET retrieves a task, PUT and PATCH update it'''
+    user, error = await _authenticate(request)
+    if error:
+        return error
+    if request.method == 'GET':
+        fields, error = _selected_fields(request)
+        if error:
+            return error
+        queryset = _queryset(user)
+        if fields is not None:
+            queryset = queryset.only(*fields, 'id', 'updated_at')
+        try:
+            task = await queryset.aget(pk=pk)
+        except (TaskModel.DoesNotExist, ValueError):
+            return _error('Not found.', status.HTTP_404_NOT_FOUND)
+        etag, last_modified = task_validators(task, fields)
+        response = not_modified(request, etag, last_modified)
+        if response is not None:
+            return response
+        return set_validators(JsonResponse(TaskSerializer(task, fields=fields).data), etag, last_modified)
+    if request.method in ('PUT', 'PATCH'):
+        task, error = await _owned_task(user, pk)
+        if error:
+            return error
+        data = _read_body(request)
+        if data is None:
+            return _error('JSON parse error.', status.HTTP_400_BAD_REQUEST)
+        return await _save(task, data, partial=request.method == 'PATCH')
+    return _error(f'Method "{request.method}" not allowed.', status.HTTP_405_METHOD_NOT_ALLOWED)
+
+
+@csrf_exempt
+async def complete_task(request, pk):
+    '''PATCH marks a task completed'''
+    user, error = await _authenticate(request)
+    if error:
+        return error
+    if request.method != 'PATCH':
+        return _error(f'Method "{request.method}" not allowed.', status.HTTP_405_METHOD_NOT_ALLOWED)
+    task, error = await _owned_task(user, pk)
+    if error:
+        return error
+    return await _save(task, {'status': 'completed'}, partial=True)
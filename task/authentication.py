@@ -0,0 +1,118 @@
+import copy
+import threading
+import time
+from collections import OrderedDict
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+
+from rest_framework import exceptions
+from rest_framework.authentication import TokenAuthentication, get_authorization_header
+
+
+class TokenCache:
+    '''
+    Bounded LRU of token key -> (user, token) with a TTL.
+
+    It lives in process memory, so a change made by another process is only
+    picked up once the entry expires; the TTL is the staleness bound.
+    '''
+
+    def __init__(self, max_size, ttl, clock=time.monotonic):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.clock = clock
+        self._entries = OrderedDict()
+        self._keys_by_user = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < self.clock():
+                if entry is not None:
+                    self._remove(key)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1], entry[2]
+
+    def set(self, key, user, token):
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (self.clock() + self.ttl, user, token)
+            self._keys_by_user.setdefault(user.pk, set()).add(key)
+            while len(self._entries) > self.max_size:
+                self._remove(next(iter(self._entries)))
+
+    def evict_key(self, key):
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+
+    def evict_user(self, user_pk):
+        with self._lock:
+            for key in list(self._keys_by_user.get(user_pk, ())):
+                self._remove(key)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._keys_by_user.clear()
+
+    def _remove(self, key):
+        _, user, _ = self._entries.pop(key)
+        keys = self._keys_by_user.get(user.pk)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._keys_by_user[user.pk]
+
+    def __len__(self):
+        return len(self._entries)
+
+
+token_cache = TokenCache(settings.TASK_AUTH_CACHE_SIZE, settings.TASK_AUTH_CACHE_TTL)
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    '''TokenAuthentication that skips the Token + User query for recently seen keys'''
+
+    def authenticate_credentials(self, key):
+        cached = token_cache.get(key)
+        if cached is not None:
+            user, token = cached
+            # Hand out copies so one request never mutates another's user.
+            return copy.copy(user), token
+        user, token = super().authenticate_credentials(key)
+        token_cache.set(key, copy.copy(user), token)
+        return user, token
+
+
+async def aauthenticate(request):
+    '''
+    Token or session user for plain async views, None if anonymous or the
+    token is invalid. A cached token is resolved without leaving the loop.
+    '''
+    auth = get_authorization_header(request).split()
+    if auth and auth[0].lower() == CachedTokenAuthentication.keyword.lower().encode():
+        if len(auth) != 2:
+            return None
+        try:
+            key = auth[1].decode()
+        except UnicodeError:
+            return None
+        cached = token_cache.get(key)
+        if cached is not None:
+            return copy.copy(cached[0])
+        try:
+            user, _ = await sync_to_async(CachedTokenAuthentication().authenticate_credentials)(key)
+        except exceptions.AuthenticationFailed:
+            return None
+        return user
+    user = await request.auser()
+    return user if user.is_authenticated else None
@@ -0,0 +1,158 @@
+'''
+Run several API requests in one HTTP request, for clients that need a few
+small calls at once (a page load: the user, a task list, some details).
+
+The batch is authenticated once and its sub-requests are passed that user
+and token, they go straight to the DRF views of task.urls without the
+middleware and run one after the other on the same database connection,
+optionally in one transaction. Each still checks its permissions and its
+own throttle scope.
+'''
+import io
+import json
+import logging
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.core.handlers.wsgi import WSGIRequest
+from django.db import transaction
+from django.urls import Resolver404, resolve
+from rest_framework import serializers
+from rest_framework.views import APIView
+
+from task.instrumentation import collect, current_metrics, route_stats
+
+logger = logging.getLogger('task.batch')
+
+METHODS = ['GET', 'POST', 'PUT', 'PATCH', 'DELETE']
+
+# Routes a batch may not call: itself, the views that log a user in or
+# create one, and the streaming and upload actions.
+EXCLUDED = {'task:batch', 'task:token', 'task:register', 'task:task-export', 'task:task-import-file'}
+
+# Headers taken from the batch request rather than from its items.
+RESERVED_HEADERS = {'authorization', 'cookie', 'content-type', 'content-length', 'host'}
+
+
+def resolve_route(path):
+    '''The ResolverMatch of an API route a batch may call, or None'''
+    try:
+        match = resolve(urlsplit(path).path)
+    except Resolver404:
+        return None
+    view_class = getattr(match.func, 'cls', None)
+    if match.namespace != 'task' or match.view_name in EXCLUDED:
+        return None
+    if view_class is None or not issubclass(view_class, APIView):
+        return None
+    return match
+
+
+class BatchItemSerializer(serializers.Serializer):
+    method = serializers.ChoiceField(choices=METHODS, default='GET')
+    path = serializers.CharField(max_length=2000)
+    body = serializers.JSONField(required=False)
+    headers = serializers.DictField(child=serializers.CharField(), required=False, default=dict)
+
+    def validate_path(self, value):
+        if resolve_route(value) is None:
+            raise serializers.ValidationError('Not an API route that can be batched.')
+        return value
+
+    def validate_headers(self, value):
+        reserved = sorted(name for name in value if name.lower() in RESERVED_HEADERS)
+        if reserved:
+            raise serializers.ValidationError(f'{", ".join(reserved)} cannot be set per request.')
+        return value
+
+
+class BatchSerializer(serializers.Serializer):
+    requests = BatchItemSerializer(many=True, allow_empty=False)
+    atomic = serializers.BooleanField(default=False)
+
+    def validate_requests(self, value):
+        if len(value) > settings.TASK_BATCH_MAX_REQUESTS:
+            raise serializers.ValidationError(f'At most {settings.TASK_BATCH_MAX_REQUESTS} requests per batch.')
+        return value
+
+
+def _sub_request(request, item):
+    '''A Django request for `item`, with the connection details of `request`'''
+    url = urlsplit(item['path'])
+    body = json.dumps(item['body']).encode() if 'body' in item else b''
+    environ = {
+        key: value for key, value in request.META.items()
+        if not key.startswith(('HTTP_IF_', 'HTTP_ACCEPT', 'CONTENT_', 'wsgi.'))
+    }
+    environ.update({
+        'REQUEST_METHOD': item['method'],
+        'PATH_INFO': url.path,
+        'QUERY_STRING': url.query,
+        'HTTP_ACCEPT': 'application/json',
+        'CONTENT_TYPE': 'application/json',
+        'CONTENT_LENGTH': str(len(body)),
+        'wsgi.input': io.BytesIO(body),
+        'wsgi.url_scheme': request.scheme,
+    })
+    for name, value in item['headers'].items():
+        environ['HTTP_' + name.upper().replace('-', '_')] = value
+    sub_request = WSGIRequest(environ)
+    # Read by rest_framework.request.Request: authenticate as the batch did.
+    sub_request._force_auth_user = request.user
+    sub_request._force_auth_token = request.auth
+    return sub_request
+
+
+def _body(response):
+    if hasattr(response, 'data'):
+        return response.data
+    if not response.content:
+        return None
+    if response.get('Content-Type', '').startswith('application/json'):
+        return json.loads(response.content)
+    return response.content.decode(response.charset)
+
+
+def _run(request, item):
+    match = resolve_route(item['path'])
+    sub_request = _sub_request(request, item)
+    sub_request.resolver_match = match
+    with collect() as metrics:
+        try:
+            response = match.func(sub_request, *match.args, **match.kwargs)
+            result = {'status': response.status_code, 'headers': dict(response.headers), 'body': _body(response)}
+        except Exception:
+            logger.exception('Batch request failed: %s %s', item['method'], item['path'])
+            result = {'status': 500, 'headers': {}, 'body': {'detail': 'A server error occurred.'}}
+    metrics.finish()
+    result['timing'] = {
+        'total_ms': round(metrics.total_time * 1000, 2),
+        'db_ms': round(metrics.db_time * 1000, 2),
+        'queries': metrics.queries,
+    }
+    # The sub-requests' costs also belong to the batch request itself.
+    outer = current_metrics()
+    if outer is not None:
+        outer.queries += metrics.queries
+        outer.db_time += metrics.db_time
+        outer.serializer_time += metrics.serializer_time
+        route_stats.record(f'{item["method"]} {match.route}', metrics)
+    return result
+
+
+def run_batch(request, items, atomic=False):
+    '''
+    Run the validated `items` as `request.user` and return their results in
+    order. With `atomic` they share one transaction, which is rolled back
+    at the first response of 400 or above; the items after it are not run.
+    '''
+    if not atomic:
+        return [_run(request, item) for item in items], True
+    results = []
+    with transaction.atomic():
+        for item in items:
+            results.append(_run(request, item))
+            if results[-1]['status'] >= 400:
+                transaction.set_rollback(True)
+                return results, False
+    return results, True
@@ -0,0 +1,110 @@
+import hashlib
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+
+ALL_TASKS = 'all'
+
+stats = Counter(hits=0, misses=0)
+
+
+def get_cache():
+    return caches[settings.TASK_CACHE_ALIAS]
+
+
+def _version_key(scope):
+    return f'task:list-version:{scope}'
+
+
+def list_scope(user, all_users=None):
+    '''
+    Users who list every task share the global version; everyone else is
+    keyed by their own pk. Only superusers see every task through the API,
+    so that is the default; the HTML list passes its own rule.
+    '''
+    if all_users is None:
+        all_users = user.is_superuser
+    return ALL_TASKS if all_users else user.pk
+
+
+def get_version(scope):
+    cache = get_cache()
+    key = _version_key(scope)
+    version = cache.get(key)
+    if version is None:
+        # Start from the clock rather than 1, so a version key that was
+        # evicted can never come back to match entries written before.
+        cache.add(key, time.time_ns(), timeout=None)
+        version = cache.get(key)
+    return version
+
+
+async def aget_version(scope):
+    cache = get_cache()
+    key = _version_key(scope)
+    version = await cache.aget(key)
+    if version is None:
+        await cache.aadd(key, time.time_ns(), timeout=None)
+        version = await cache.aget(key)
+    return version
+
+
+def bump_version(*user_ids):
+    '''Invalidate the cached lists of the given users and of the admins'''
+    cache = get_cache()
+    for scope in {*user_ids, ALL_TASKS}:
+        key = _version_key(scope)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.add(key, time.time_ns(), timeout=None)
+
+
+def invalidate(*user_ids):
+    '''
+    Bump now and again once the surrounding transaction commits, so a reader
+    that cached the old rows in between does not keep serving them.
+    '''
+    bump_version(*user_ids)
+    transaction.on_commit(lambda: bump_version(*user_ids))
+
+
+def list_cache_key(user, kind, url, all_users=None):
+    scope = list_scope(user, all_users)
+    digest = hashlib.md5(url.encode()).hexdigest()
+    return f'task:list:{kind}:{scope}:{get_version(scope)}:{digest}'
+
+
+async def alist_cache_key(user, kind, url, all_users=None):
+    scope = list_scope(user, all_users)
+    digest = hashlib.md5(url.encode()).hexdigest()
+    return f'task:list:{kind}:{scope}:{await aget_version(scope)}:{digest}'
+
+
+def cache_get(key):
+    value = get_cache().get(key)
+    stats['hits' if value is not None else 'misses'] += 1
+    return value
+
+
+def cache_set(key, value):
+    get_cache().set(key, value, timeout=settings.TASK_CACHE_TIMEOUT)
+
+
+async def acache_get(key):
+    value = await get_cache().aget(key)
+    stats['hits' if value is not None else 'misses'] += 1
+    return value
+
+
+async def acache_set(key, value):
+    await get_cache().aset(key, value, timeout=settings.TASK_CACHE_TIMEOUT)
+
+
+def cache_stats():
+    hits, misses = stats['hits'], stats['misses']
+    total = hits + misses
+    return {'hits': hits, 'misses': misses, 'hit_rate': hits / total if total else 0.0}
@@ -0,0 +1,65 @@
+'''
+Response compression for CompressionMiddleware: Accept-Encoding negotiation
+between zstd, when the `zstandard` package is installed, and gzip.
+'''
+import gzip
+
+from django.conf import settings
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+def _gzip(content):
+    return gzip.compress(content, compresslevel=settings.TASK_COMPRESSION_GZIP_LEVEL, mtime=0)
+
+
+def _zstd(content):
+    # Compressors are not thread safe, and cheap to make next to the work.
+    return zstandard.ZstdCompressor(level=settings.TASK_COMPRESSION_ZSTD_LEVEL).compress(content)
+
+
+def available_codings():
+    '''Codings this process can produce, preferred first'''
+    codings = {}
+    if zstandard is not None:
+        codings['zstd'] = _zstd
+    codings['gzip'] = _gzip
+    return codings
+
+
+def accepted_codings(header):
+    '''{coding: q} from an Accept-Encoding header'''
+    accepted = {}
+    for item in header.split(','):
+        coding, _, params = item.strip().partition(';')
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        quality = 1.0
+        for param in params.split(';'):
+            name, _, value = param.strip().partition('=')
+            if name.strip().lower() == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        accepted[coding] = quality
+    return accepted
+
+
+def choose_coding(header):
+    '''The best coding both sides accept, or None to send the body as it is'''
+    accepted = accepted_codings(header)
+    best, best_quality = None, 0.0
+    for coding in available_codings():
+        quality = accepted.get(coding, accepted.get('*', 0.0))
+        if quality > best_quality:
+            best, best_quality = coding, quality
+    return best
+
+
+def compress(coding, content):
+    return available_codings()[coding](content)
@@ -0,0 +1,58 @@
+import hashlib
+import math
+
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
+
+from task.caching import aget_version, get_version, list_scope
+
+
+def _etag(*parts):
+    return '"%s"' % hashlib.md5('|'.join(str(part) for part in parts).encode()).hexdigest()
+
+
+def _timestamp(value):
+    return math.floor(value.timestamp()) if value else None
+
+
+def list_validators(queryset, user, url):
+    '''
+    ETag for a list from one aggregate query, and no Last-Modified: a delete
+    or a second write within the same second leaves MAX(updated_at) at the
+    same second, so If-Modified-Since would get a stale 304.
+    '''
+    summary = queryset.order_by().aggregate(last=Max('updated_at'), count=Count('id'))
+    version = get_version(list_scope(user))
+    etag = _etag('list', url, summary['last'] and summary['last'].isoformat(), summary['count'], version)
+    return etag, None
+
+
+async def alist_validators(queryset, user, url):
+    summary = await queryset.order_by().aaggregate(last=Max('updated_at'), count=Count('id'))
+    version = await aget_version(list_scope(user))
+    etag = _etag('list', url, summary['last'] and summary['last'].isoformat(), summary['count'], version)
+    return etag, None
+
+
+def task_validators(task, fields=None):
+    # A field selection is a different representation, with its own ETag.
+    parts = ('task', task.pk, task.updated_at.isoformat()) + ((','.join(fields),) if fields else ())
+    etag = _etag(*parts)
+    return etag, _timestamp(task.updated_at)
+
+
+def not_modified(request, etag, last_modified):
+    '''Return a 304 response when the client copy is still current'''
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is not None:
+        set_validators(response, etag, last_modified)
+    return response
+
+
+def set_validators(response, etag, last_modified):
+    response['ETag'] = etag
+    if last_modified is not None:
+        response['Last-Modified'] = http_date(last_modified)
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
@@ -0,0 +1,10 @@
+from django.conf import settings
+
+
+def apply_pragmas(connection):
+    '''Run TASK_SQLITE_PRAGMAS on a new SQLite connection'''
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        for name, value in settings.TASK_SQLITE_PRAGMAS.items():
+            cursor.execute(f'PRAGMA {name} = {value}')
@@ -0,0 +1,216 @@
+import asyncio
+import json
+import threading
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.utils.module_loading import import_string
+
+# Subscribers under this scope receive the events of every user (superusers).
+ALL_USERS = '*'
+
+# Queued in place of the backlog when a subscriber falls too far behind.
+OVERFLOW = object()
+
+RESET_FRAME = b'event: reset\ndata: {}\n\n'
+KEEPALIVE_FRAME = b': keepalive\n\n'
+
+
+def render(kind, data):
+    '''Encode one SSE frame; done once per event, whatever the number of subscribers'''
+    return f'event: {kind}\ndata: {json.dumps(data, cls=DjangoJSONEncoder)}\n\n'.encode()
+
+
+class Subscription:
+    '''
+    One open stream: a bounded queue owned by the event loop serving it.
+    Publishers never wait on it. When it is full the backlog is replaced by
+    OVERFLOW and the client is told to resync through the sync endpoint.
+    '''
+
+    def __init__(self, scope, maxsize):
+        self.scope = scope
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(maxsize)
+        self.overflowed = False
+
+    def offer(self, frame):
+        '''Runs on self.loop'''
+        if self.overflowed:
+            return
+        try:
+            self.queue.put_nowait(frame)
+        except asyncio.QueueFull:
+            self.overflowed = True
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(OVERFLOW)
+
+    async def get(self, timeout=None):
+        return await asyncio.wait_for(self.queue.get(), timeout)
+
+
+class Hub:
+    '''In-process fan-out of frames to the subscriptions of a scope'''
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscriptions = {}
+
+    def __len__(self):
+        return sum(len(subscriptions) for subscriptions in self._subscriptions.values())
+
+    def subscribe(self, scope, maxsize=None):
+        '''Must be called from the event loop that will read the subscription'''
+        subscription = Subscription(scope, maxsize or settings.TASK_EVENTS_QUEUE_SIZE)
+        with self._lock:
+            self._subscriptions.setdefault(scope, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            subscriptions = self._subscriptions.get(subscription.scope)
+            if subscriptions is not None:
+                subscriptions.discard(subscription)
+                if not subscriptions:
+                    del self._subscriptions[subscription.scope]
+
+    def has_subscribers(self, user_id):
+        return user_id in self._subscriptions or ALL_USERS in self._subscriptions
+
+    def dispatch(self, user_id, frame):
+        '''Thread safe and non-blocking; may be called from any thread'''
+        with self._lock:
+            subscriptions = [
+                *self._subscriptions.get(user_id, ()),
+                *self._subscriptions.get(ALL_USERS, ()),
+            ]
+        for subscription in subscriptions:
+            try:
+                subscription.loop.call_soon_threadsafe(subscription.offer, frame)
+            except RuntimeError:
+                # The loop is gone, so is the connection.
+                self.unsubscribe(subscription)
+
+
+hub = Hub()
+
+
+class LocalBackend:
+    '''Events only reach subscribers of this process'''
+
+    def __init__(self, hub):
+        self.hub = hub
+
+    def start(self):
+        pass
+
+    def wants(self, user_id):
+        return self.hub.has_subscribers(user_id)
+
+    def publish(self, user_id, frame):
+        self.hub.dispatch(user_id, frame)
+
+
+class RedisBackend:
+    '''
+    Fan events out through a Redis channel so every worker's hub sees every
+    event. Needs the `redis` package and TASK_EVENTS_REDIS_URL.
+    '''
+    channel = 'task-events'
+
+    def __init__(self, hub):
+        import redis
+
+        self.hub = hub
+        self.url = settings.TASK_EVENTS_REDIS_URL
+        self.client = redis.Redis.from_url(self.url)
+        self._listener = None
+
+    def start(self):
+        '''Listen on the running loop, once per process'''
+        if self._listener is None or self._listener.done():
+            self._listener = asyncio.get_running_loop().create_task(self._listen())
+
+    async def _listen(self):
+        import redis.asyncio
+
+        client = redis.asyncio.Redis.from_url(self.url)
+        async with client.pubsub() as pubsub:
+            await pubsub.subscribe(self.channel)
+            async for message in pubsub.listen():
+                if message['type'] != 'message':
+                    continue
+                user_id, _, frame = message['data'].partition(b'\n')
+                self.hub.dispatch(int(user_id), frame)
+
+    def wants(self, user_id):
+        return True
+
+    def publish(self, user_id, frame):
+        self.client.publish(self.channel, str(user_id).encode() + b'\n' + frame)
+
+
+_backend = None
+
+
+def get_backend():
+    global _backend
+    if _backend is None:
+        _backend = import_string(settings.TASK_EVENTS_BACKEND)(hub)
+    return _backend
+
+
+def publish(user_id, kind, data):
+    '''Send an event to the user's streams once the current transaction commits'''
+    backend = get_backend()
+    if not backend.wants(user_id):
+        return
+    frame = render(kind, data() if callable(data) else data)
+    transaction.on_commit(lambda: backend.publish(user_id, frame))
+
+
+def _task_data(task):
+    from task.serializers import TaskSerializer
+
+    return TaskSerializer(task).data
+
+
+def task_saved(task, created, previous_status=None):
+    if created:
+        kind = 'created'
+    elif task.status == 'completed' and previous_status != 'completed':
+        kind = 'completed'
+    else:
+        kind = 'updated'
+    publish(task.user_id, kind, lambda: _task_data(task))
+
+
+def task_deleted(task):
+    publish(task.user_id, 'deleted', {'id': task.pk, 'task_id': task.task_id})
+
+
+def tasks_changed(user_id, count):
+    '''Bulk writes send one event; clients pick the rows up from the sync endpoint'''
+    publish(user_id, 'sync', {'count': count})
+
+
+async def stream(scope):
+    '''Frames for one client until it disconnects or overflows'''
+    get_backend().start()
+    subscription = hub.subscribe(scope)
+    try:
+        yield b'retry: 3000\n\n'
+        while True:
+            try:
+                frame = await subscription.get(settings.TASK_EVENTS_KEEPALIVE_SECONDS)
+            except asyncio.TimeoutError:
+                yield KEEPALIVE_FRAME
+                continue
+            if frame is OVERFLOW:
+                yield RESET_FRAME
+                return
+            yield frame
+    finally:
+        hub.unsubscribe(subscription)
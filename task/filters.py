@@ -0,0 +1,82 @@
+'''
+Filters and ordering for the task list. Every accepted combination is
+answered by one index range scan that already returns rows in page order,
+other combinations are refused rather than left to scan and sort the table.
+'''
+from rest_framework import serializers
+
+from task.models import TaskModel
+
+# Column ranges filtered by ?<column>_after= / ?<column>_before=.
+RANGES = {
+    'due': 'due_date',
+    'created': 'created_at',
+    'updated': 'updated_at',
+}
+
+# (ordering column, equality filters) -> the index serving it for one user's
+# tasks and for every user's tasks (admins), None where there is none. The
+# index holds the id after its columns, so the keyset (column, id) is in
+# index order and ranges are only possible on the ordering column.
+INDEXES = {
+    ('due_date', ()): ('task_user_due_date_idx', 'task_due_date_idx'),
+    ('due_date', ('status',)): ('task_user_status_due_idx', None),
+    ('created_at', ()): ('task_user_created_at_idx', None),
+    ('updated_at', ()): ('task_user_updated_at_idx', 'task_updated_at_idx'),
+}
+
+ORDERINGS = [field for column in RANGES.values() for field in (column, f'-{column}')]
+
+
+class TaskListFilterSerializer(serializers.Serializer):
+    '''
+    Query parameters of the task list. Pass `all_users` in the context when
+    the list is not limited to one user. validated_data gets the `ordering`
+    to paginate on, defaulting to the column of the range filter given.
+    '''
+    status = serializers.ChoiceField(choices=TaskModel.STATUS_CHOICES, required=False)
+    due_after = serializers.DateField(required=False)
+    due_before = serializers.DateField(required=False)
+    created_after = serializers.DateTimeField(required=False)
+    created_before = serializers.DateTimeField(required=False)
+    updated_after = serializers.DateTimeField(required=False)
+    updated_before = serializers.DateTimeField(required=False)
+    ordering = serializers.ChoiceField(choices=ORDERINGS, required=False)
+
+    def validate(self, attrs):
+        ranged = []
+        for name, column in RANGES.items():
+            after, before = attrs.get(f'{name}_after'), attrs.get(f'{name}_before')
+            if after is not None and before is not None and after > before:
+                raise serializers.ValidationError(f'{name}_after must not be later than {name}_before.')
+            if after is not None or before is not None:
+                ranged.append(column)
+        if len(ranged) > 1:
+            raise serializers.ValidationError('Only one of the due, created and updated ranges can be filtered on.')
+
+        ordering = attrs.get('ordering') or (ranged[0] if ranged else 'due_date')
+        column = ordering.lstrip('-')
+        if ranged and ranged[0] != column:
+            raise serializers.ValidationError(f'A {ranged[0]} range needs ordering={ranged[0]} or -{ranged[0]}.')
+        equality = ('status',) if 'status' in attrs else ()
+        indexes = INDEXES.get((column, equality))
+        index = indexes and indexes[1 if self.context.get('all_users') else 0]
+        if index is None:
+            scope = ' when listing every user' if indexes else ''
+            raise serializers.ValidationError(
+                f'Filtering on {", ".join(equality) or "nothing"} ordered by {column} is not supported{scope}.'
+            )
+        attrs['ordering'] = (ordering, '-id' if ordering.startswith('-') else 'id')
+        return attrs
+
+    def filter(self, queryset):
+        '''Apply the validated filters to `queryset`'''
+        filters = self.validated_data
+        if 'status' in filters:
+            queryset = queryset.filter(status=filters['status'])
+        for name, column in RANGES.items():
+            if f'{name}_after' in filters:
+                queryset = queryset.filter(**{f'{column}__gte': filters[f'{name}_after']})
+            if f'{name}_before' in filters:
+                queryset = queryset.filter(**{f'{column}__lte': filters[f'{name}_before']})
+        return queryset
@@ -0,0 +1,149 @@
+import os
+import threading
+import time
+
+from django.conf import settings
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+# 1 sign bit | 41 bits milliseconds since EPOCH_MS | 10 bits worker | 12 bits sequence
+EPOCH_MS = 1704067200000  # 2024-01-01T00:00:00Z
+WORKER_BITS = 10
+SEQUENCE_BITS = 12
+MAX_WORKER_ID = (1 << WORKER_BITS) - 1
+MAX_SEQUENCE = (1 << SEQUENCE_BITS) - 1
+
+
+def _now_ms():
+    return time.time_ns() // 1_000_000
+
+
+# Worker ids leased by generators of this process. Record locks belong to
+# the process, so a second lock on the same byte here would succeed.
+_leased = set()
+# One descriptor per lease file, open for the life of the process. Closing
+# any descriptor of a file drops every record lock the process holds on it,
+# so these are never closed.
+_lease_fds = {}
+
+
+def _lease_fd(path):
+    if path not in _lease_fds:
+        _lease_fds[path] = os.open(path, os.O_RDWR | os.O_CREAT, 0o666)
+    return _lease_fds[path]
+
+
+def _lock_byte(fd, offset, lock=True):
+    if fcntl is not None:
+        fcntl.lockf(fd, (fcntl.LOCK_EX | fcntl.LOCK_NB) if lock else fcntl.LOCK_UN, 1, offset)
+    else:
+        os.lseek(fd, offset, os.SEEK_SET)
+        msvcrt.locking(fd, msvcrt.LK_NBLCK if lock else msvcrt.LK_UNLCK, 1)
+
+
+def lease_worker_id():
+    '''
+    Lock the byte of TASK_ID_LEASE_FILE of the first free worker id in
+    TASK_ID_WORKER_RANGE. The lock is held until the process exits, when the
+    OS drops it, even after a crash.
+    '''
+    first, last = settings.TASK_ID_WORKER_RANGE
+    fd = _lease_fd(settings.TASK_ID_LEASE_FILE)
+    for worker_id in range(first, last + 1):
+        if worker_id in _leased:
+            continue
+        try:
+            _lock_byte(fd, worker_id)
+        except OSError:
+            continue
+        _leased.add(worker_id)
+        return worker_id
+    raise RuntimeError(f'All task id workers {first}-{last} in {settings.TASK_ID_LEASE_FILE} are taken')
+
+
+def release_worker_id(worker_id):
+    '''Give a leased worker id back before the process exits'''
+    _lock_byte(_lease_fd(settings.TASK_ID_LEASE_FILE), worker_id, lock=False)
+    _leased.discard(worker_id)
+
+
+class TaskIdGenerator:
+    '''
+    Snowflake style 64 bit id generator.
+
+    Ids are unique across processes as long as every process has its own
+    worker id, so no database round trip is needed. The worker id is the
+    one passed in, else the TASK_ID_WORKER_ID environment variable of this
+    process, else a lease from lease_worker_id(). It is resolved on first
+    use, so a gunicorn post_fork hook can still set the variable. The lock
+    is only held for a few arithmetic operations, and for the lease once.
+    '''
+
+    def __init__(self, worker_id=None, clock=_now_ms):
+        self.clock = clock
+        self._configured_worker_id = worker_id
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        self.worker_id = self._configured_worker_id
+        self._last_ms = -1
+        self._sequence = 0
+
+    def _resolve_worker_id(self):
+        worker_id = os.environ.get('TASK_ID_WORKER_ID')
+        if worker_id is None:
+            worker_id = lease_worker_id()
+            # The previous holder may have exited within this millisecond,
+            # so start in the next one.
+            self._last_ms, self._sequence = self.clock(), MAX_SEQUENCE
+        worker_id = int(worker_id)
+        if not 0 <= worker_id <= MAX_WORKER_ID:
+            raise ValueError(f'Task id worker id {worker_id} is outside 0-{MAX_WORKER_ID}')
+        return worker_id
+
+    def __call__(self):
+        with self._lock:
+            if self.worker_id is None:
+                self.worker_id = self._resolve_worker_id()
+            now = max(self.clock(), self._last_ms)
+            if now == self._last_ms:
+                self._sequence = (self._sequence + 1) & MAX_SEQUENCE
+                if self._sequence == 0:
+                    # Sequence exhausted for this millisecond, borrow the next one.
+                    now = self._last_ms + 1
+            else:
+                self._sequence = 0
+            self._last_ms = now
+            sequence = self._sequence
+        return ((now - EPOCH_MS) << (WORKER_BITS + SEQUENCE_BITS)) | (self.worker_id << SEQUENCE_BITS) | sequence
+
+
+def parse_task_id(task_id):
+    '''Split a task id into (unix milliseconds, worker id, sequence)'''
+    return (
+        (task_id >> (WORKER_BITS + SEQUENCE_BITS)) + EPOCH_MS,
+        (task_id >> SEQUENCE_BITS) & MAX_WORKER_ID,
+        task_id & MAX_SEQUENCE,
+    )
+
+
+next_task_id = TaskIdGenerator()
+
+
+def _after_fork():
+    # Record locks are not inherited, so the child holds no lease and has to
+    # pick its own worker id. It takes it through the inherited descriptors,
+    # its locks on them are its own.
+    _leased.clear()
+    next_task_id._reset()
+
+
+if hasattr(os, 'register_at_fork'):
+    # Pre-forking servers (gunicorn --preload) import this module and may
+    # create tasks before fork, so every child starts without a worker id.
+    os.register_at_fork(after_in_child=_after_fork)
@@ -0,0 +1,133 @@
+import codecs
+import csv
+import json
+from itertools import islice
+
+from django.conf import settings
+from django.db import transaction
+
+from task.caching import invalidate
+from task.ids import next_task_id
+from task.models import TaskModel
+from task.serializers import TaskSerializer
+from task import events, stats
+
+IMPORT_FORMATS = ['ndjson', 'csv']
+
+
+class ImportResult:
+    def __init__(self, max_errors):
+        self.rows = 0
+        self.created = 0
+        self.failed = 0
+        self.chunks = 0
+        self.errors = []
+        self.max_errors = max_errors
+
+    def add_error(self, row, errors):
+        self.failed += 1
+        if len(self.errors) < self.max_errors:
+            self.errors.append({'row': row, 'errors': errors})
+
+    def as_dict(self):
+        return {
+            'rows': self.rows,
+            'created': self.created,
+            'failed': self.failed,
+            'chunks': self.chunks,
+            'errors': self.errors,
+        }
+
+
+def guess_format(filename, default='ndjson'):
+    extension = filename.rsplit('.', 1)[-1].lower() if filename and '.' in filename else ''
+    if extension in ('json', 'jsonl', 'ndjson'):
+        return 'ndjson'
+    if extension == 'csv':
+        return 'csv'
+    return default
+
+
+def iter_rows(stream, file_format):
+    '''
+    Yield (row number, row, parse error) from a binary stream, reading it
+    line by line so the whole file is never held in memory.
+    '''
+    if file_format == 'csv':
+        # A quoted field may span lines, so reading stops at the first part
+        # that is not UTF-8 or not CSV, reported as the next row.
+        number = 1
+        try:
+            for number, row in enumerate(csv.DictReader(codecs.iterdecode(stream, 'utf-8-sig')), start=2):
+                yield number, row, None
+        except (UnicodeDecodeError, csv.Error) as e:
+            yield number + 1, None, {'non_field_errors': [f'Unreadable CSV: {e}']}
+        return
+    for number, raw in enumerate(stream, start=1):
+        try:
+            line = raw.decode('utf-8-sig' if number == 1 else 'utf-8')
+        except UnicodeDecodeError as e:
+            yield number, None, {'non_field_errors': [f'Invalid UTF-8: {e}']}
+            continue
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError as e:
+            yield number, None, {'non_field_errors': [f'Invalid JSON: {e}']}
+            continue
+        if not isinstance(row, dict):
+            yield number, None, {'non_field_errors': ['Expected a JSON object.']}
+            continue
+        yield number, row, None
+
+
+def _import_chunk(user, chunk, result):
+    rows = []
+    for number, row, error in chunk:
+        if error:
+            result.add_error(number, error)
+        else:
+            rows.append((number, row))
+    if not rows:
+        return
+    serializer = TaskSerializer(data=[row for _, row in rows], many=True)
+    if not serializer.is_valid():
+        valid = []
+        for (number, row), errors in zip(rows, serializer.errors):
+            if errors:
+                result.add_error(number, errors)
+            else:
+                valid.append((number, row))
+        if not valid:
+            return
+        serializer = TaskSerializer(data=[row for _, row in valid], many=True)
+        serializer.is_valid(raise_exception=True)
+    with transaction.atomic():
+        created = TaskModel.objects.bulk_create(
+            [TaskModel(user=user, task_id=next_task_id(), **data) for data in serializer.validated_data]
+        )
+        stats.record(stats.added(created))
+        events.tasks_changed(user.pk, len(created))
+        invalidate(user.pk)
+    result.created += len(created)
+
+
+def import_tasks(user, stream, file_format, chunk_size=None, progress=None):
+    '''
+    Validate and insert tasks from `stream` chunk by chunk, each chunk in its
+    own transaction. Invalid rows are skipped and reported by row number.
+    '''
+    chunk_size = chunk_size or settings.TASK_IMPORT_CHUNK_SIZE
+    result = ImportResult(settings.TASK_IMPORT_MAX_ERRORS)
+    rows = iter_rows(stream, file_format)
+    while True:
+        chunk = list(islice(rows, chunk_size))
+        if not chunk:
+            break
+        result.rows += len(chunk)
+        result.chunks += 1
+        _import_chunk(user, chunk, result)
+        if progress:
+            progress(result)
+    return result
@@ -0,0 +1,121 @@
+import contextvars
+import logging
+import threading
+import time
+from contextlib import contextmanager
+
+logger = logging.getLogger('task.metrics')
+
+_current = contextvars.ContextVar('task_request_metrics', default=None)
+
+
+class RequestMetrics:
+    '''Costs collected while one request is being handled'''
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.db_time = 0.0
+        self.serializer_time = 0.0
+        self.total_time = 0.0
+
+    def execute_wrapper(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_time += time.perf_counter() - start
+            self.queries += 1
+
+    def finish(self):
+        self.total_time = time.perf_counter() - self.started
+
+    def server_timing(self):
+        return ', '.join([
+            f'db;dur={self.db_time * 1000:.2f};desc="{self.queries} queries"',
+            f'serializer;dur={self.serializer_time * 1000:.2f}',
+            f'total;dur={self.total_time * 1000:.2f}',
+        ])
+
+
+def current_metrics():
+    return _current.get()
+
+
+def record_query(execute, sql, params, many, context):
+    '''Execute wrapper installed on every connection, counts for the current request'''
+    metrics = _current.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+    return metrics.execute_wrapper(execute, sql, params, many, context)
+
+
+def instrument(connection):
+    # Connections are per thread while the metrics follow the request
+    # context, which also reaches the threads of sync_to_async.
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+@contextmanager
+def collect():
+    metrics = RequestMetrics()
+    token = _current.set(metrics)
+    try:
+        yield metrics
+    finally:
+        _current.reset(token)
+
+
+@contextmanager
+def serializer_timer():
+    '''Add the time spent in the block to the current request, if any'''
+    metrics = _current.get()
+    if metrics is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        metrics.serializer_time += time.perf_counter() - start
+
+
+class RouteStats:
+    '''Per route totals of the collected request metrics'''
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._routes = {}
+
+    def record(self, route, metrics):
+        with self._lock:
+            stats = self._routes.get(route)
+            if stats is None:
+                stats = self._routes[route] = {
+                    'requests': 0, 'queries': 0, 'db_ms': 0.0,
+                    'serializer_ms': 0.0, 'total_ms': 0.0, 'max_total_ms': 0.0,
+                }
+            total_ms = metrics.total_time * 1000
+            stats['requests'] += 1
+            stats['queries'] += metrics.queries
+            stats['db_ms'] += metrics.db_time * 1000
+            stats['serializer_ms'] += metrics.serializer_time * 1000
+            stats['total_ms'] += total_ms
+            stats['max_total_ms'] = max(stats['max_total_ms'], total_ms)
+
+    def snapshot(self):
+        with self._lock:
+            routes = {route: dict(stats) for route, stats in self._routes.items()}
+        for stats in routes.values():
+            count = stats['requests']
+            stats['avg_queries'] = stats['queries'] / count
+            stats['avg_total_ms'] = stats['total_ms'] / count
+        return routes
+
+    def reset(self):
+        with self._lock:
+            self._routes.clear()
+
+
+route_stats = RouteStats()
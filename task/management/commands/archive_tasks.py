@@ -0,0 +1,23 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from task.archive import archive_completed
+
+
+class Command(BaseCommand):
+    help = 'Move tasks completed more than --days ago to the archive table, in short batches'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, help=f'Defaults to TASK_ARCHIVE_AFTER_DAYS ({settings.TASK_ARCHIVE_AFTER_DAYS})')
+        parser.add_argument('--batch-size', type=int, help='Tasks moved per transaction')
+        parser.add_argument('--pause', type=float, default=0, help='Seconds to sleep between batches')
+
+    def handle(self, *args, **options):
+        if options['days'] is not None and options['days'] < 0:
+            raise CommandError('--days cannot be negative')
+
+        def progress(moved):
+            self.stdout.write(f'archived {moved}')
+
+        moved = archive_completed(options['days'], options['batch_size'], options['pause'], progress)
+        self.stdout.write(self.style.SUCCESS(f'Archived {moved} tasks'))
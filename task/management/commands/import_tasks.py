@@ -0,0 +1,41 @@
+import sys
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from task.imports import IMPORT_FORMATS, guess_format, import_tasks
+
+
+class Command(BaseCommand):
+    help = 'Import tasks for a user from a CSV or NDJSON file, streaming it in chunks'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="File to import, or '-' for stdin")
+        parser.add_argument('--user', required=True, help='Email of the user that will own the tasks')
+        parser.add_argument('--file-format', choices=IMPORT_FORMATS, help='Defaults to the file extension')
+        parser.add_argument('--chunk-size', type=int, help='Rows validated and inserted per transaction')
+
+    def handle(self, *args, **options):
+        try:
+            user = get_user_model().objects.get(email=options['user'])
+        except get_user_model().DoesNotExist:
+            raise CommandError(f"No user with email {options['user']}")
+
+        path = options['path']
+        file_format = options['file_format'] or guess_format(path)
+
+        def progress(result):
+            self.stdout.write(f'rows {result.rows}: created {result.created}, failed {result.failed}')
+
+        if path == '-':
+            result = import_tasks(user, sys.stdin.buffer, file_format, options['chunk_size'], progress)
+        else:
+            try:
+                with open(path, 'rb') as stream:
+                    result = import_tasks(user, stream, file_format, options['chunk_size'], progress)
+            except OSError as e:
+                raise CommandError(str(e))
+
+        for error in result.errors:
+            self.stderr.write(f"row {error['row']}: {error['errors']}")
+        self.stdout.write(self.style.SUCCESS(f'Imported {result.created} of {result.rows} rows'))
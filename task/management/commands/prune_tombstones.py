@@ -0,0 +1,17 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from task.sync import prune_tombstones
+
+
+class Command(BaseCommand):
+    help = 'Delete task tombstones older than TASK_SYNC_TOMBSTONE_DAYS'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help='Tombstones deleted per statement')
+
+    def handle(self, *args, **options):
+        deleted = prune_tombstones(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Deleted {deleted} tombstones older than {settings.TASK_SYNC_TOMBSTONE_DAYS} days'
+        ))
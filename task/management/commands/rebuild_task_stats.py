@@ -0,0 +1,26 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from task.stats import rebuild
+
+
+class Command(BaseCommand):
+    help = 'Recount every task and correct the per user TaskStat counters'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', action='append', help='Only rebuild the counters of this email (repeatable)')
+        parser.add_argument('--batch-size', type=int, default=500, help='Users recounted per transaction')
+
+    def handle(self, *args, **options):
+        users = get_user_model().objects.order_by('pk')
+        if options['user']:
+            users = users.filter(email__in=options['user'])
+            missing = set(options['user']) - set(users.values_list('email', flat=True))
+            if missing:
+                raise CommandError(f"No user with email {', '.join(sorted(missing))}")
+        user_ids = list(users.values_list('pk', flat=True))
+        fixed = 0
+        batch_size = options['batch_size']
+        for start in range(0, len(user_ids), batch_size):
+            fixed += rebuild(user_ids[start:start + batch_size])
+        self.stdout.write(self.style.SUCCESS(f'Checked {len(user_ids)} users, corrected {fixed} counters'))
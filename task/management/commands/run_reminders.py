@@ -0,0 +1,37 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from task import reminders
+
+
+class Command(BaseCommand):
+    help = 'Run the due date reminder worker'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help='Send what is due now and exit')
+        parser.add_argument('--poll', type=float, help='Seconds between scans for changed tasks')
+
+    def handle(self, *args, **options):
+        poll = options['poll'] or settings.TASK_REMINDER_POLL_SECONDS
+        scheduler = reminders.ReminderScheduler(reminders.get_sink(stdout=self.stdout))
+        reminders.active_scheduler = scheduler
+        try:
+            while True:
+                sent = scheduler.run_once()
+                if sent:
+                    self.stdout.write(f'Sent {sent} reminders ({len(scheduler)} scheduled)')
+                if options['once']:
+                    break
+                wake = scheduler.next_reminder()
+                delay = poll
+                if wake is not None:
+                    delay = max(0.0, min(poll, (wake - timezone.now()).total_seconds()))
+                time.sleep(delay)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            reminders.active_scheduler = None
+        self.stdout.write(self.style.SUCCESS(f'Sent {scheduler.sent} reminders'))
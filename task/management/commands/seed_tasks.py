@@ -0,0 +1,31 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from task.seeding import seed_tasks
+
+
+class Command(BaseCommand):
+    help = 'Generate users and tasks with realistic status and due date distributions for load testing'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=100, help='Users to create')
+        parser.add_argument('--tasks', type=int, default=10000, help='Tasks to create, spread over the users')
+        parser.add_argument('--password', default='seed@123', help='Password of every generated user')
+        parser.add_argument('--prefix', default='seed', help='Emails are <prefix><n>@example.com')
+        parser.add_argument('--seed', type=int, default=0, help='Random seed, the same seed gives the same data')
+        parser.add_argument('--batch-size', type=int, default=5000, help='Tasks inserted per transaction')
+
+    def handle(self, *args, **options):
+        if options['users'] < 1 or options['tasks'] < 0:
+            raise CommandError('Need at least one user and no negative task count')
+        if get_user_model().objects.filter(email__startswith=options['prefix'], email__endswith='@example.com').exists():
+            raise CommandError(f"Users {options['prefix']}<n>@example.com already exist, pick another --prefix")
+
+        def progress(created):
+            self.stdout.write(f'tasks {created}/{options["tasks"]}')
+
+        users = seed_tasks(
+            options['users'], options['tasks'], options['password'], prefix=options['prefix'],
+            seed=options['seed'], batch_size=options['batch_size'], progress=progress,
+        )
+        self.stdout.write(self.style.SUCCESS(f'Created {len(users)} users and {options["tasks"]} tasks'))
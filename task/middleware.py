@@ -0,0 +1,112 @@
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+
+from task.compression import choose_coding, compress
+from task.instrumentation import collect, logger, route_stats
+
+
+def _route(request):
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return 'unresolved'
+    return f'{request.method} {match.route}'
+
+
+class RequestMetricsMiddleware:
+    '''
+    Count SQL queries and time the database, serializers and the whole request.
+
+    Enabled by TASK_REQUEST_METRICS. Results go to the Server-Timing header,
+    the task.metrics logger and the per route stats at /api/v1/metrics/.
+    Works in both the sync and the async handler, so async views are not
+    pushed into a thread.
+    '''
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        if not settings.TASK_REQUEST_METRICS:
+            return self.get_response(request)
+        with collect() as metrics:
+            response = self.get_response(request)
+        return self.report(request, response, metrics)
+
+    async def __acall__(self, request):
+        if not settings.TASK_REQUEST_METRICS:
+            return await self.get_response(request)
+        with collect() as metrics:
+            response = await self.get_response(request)
+        return self.report(request, response, metrics)
+
+    def report(self, request, response, metrics):
+        metrics.finish()
+        route = _route(request)
+        route_stats.record(route, metrics)
+        response['Server-Timing'] = metrics.server_timing()
+        logger.info(
+            '%s %s queries=%d db=%.2fms serializer=%.2fms total=%.2fms',
+            route, response.status_code, metrics.queries, metrics.db_time * 1000,
+            metrics.serializer_time * 1000, metrics.total_time * 1000,
+        )
+        return response
+
+
+class CompressionMiddleware:
+    '''
+    Compress responses of at least TASK_COMPRESSION_MIN_BYTES with zstd or
+    gzip, whichever the client accepts and this process supports (zstd needs
+    the `zstandard` package). Smaller bodies are not worth the CPU time.
+    Only the TASK_COMPRESSION_TYPES API formats are compressed: HTML pages
+    carry CSRF tokens, which compression would expose to BREACH. Streaming
+    responses, the exports and the event stream, are sent as is.
+    '''
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        return self.compress(request, self.get_response(request))
+
+    async def __acall__(self, request):
+        return self.compress(request, await self.get_response(request))
+
+    def compress(self, request, response):
+        if response.streaming or response.has_header('Content-Encoding'):
+            return response
+        media_type = response.get('Content-Type', '').partition(';')[0].strip()
+        if media_type not in settings.TASK_COMPRESSION_TYPES:
+            return response
+        patch_vary_headers(response, ('Accept-Encoding',))
+        if len(response.content) < settings.TASK_COMPRESSION_MIN_BYTES:
+            return response
+        coding = choose_coding(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+        if coding is None:
+            return response
+        content = compress(coding, response.content)
+        if len(content) >= len(response.content):
+            return response
+        response.content = content
+        response['Content-Length'] = str(len(content))
+        response['Content-Encoding'] = coding
+        # The compressed bytes are a different representation of the same
+        # resource, so a strong validator becomes a weak one.
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response['ETag'] = 'W/' + etag
+        return response
@@ -0,0 +1,37 @@
+# Generated by Django 5.1.3 on 2026-10-18 19:04
+
+from django.db import migrations, models
+
+STATUS_KEYS = {
+    'Pending': 'pending',
+    'In Progress': 'in_progress',
+    'Completed': 'completed',
+}
+
+
+def forwards(apps, schema_editor):
+    TaskModel = apps.get_model('task', 'TaskModel')
+    for label, key in STATUS_KEYS.items():
+        TaskModel.objects.filter(status=label).update(status=key)
+
+
+def backwards(apps, schema_editor):
+    TaskModel = apps.get_model('task', 'TaskModel')
+    for label, key in STATUS_KEYS.items():
+        TaskModel.objects.filter(status=key).update(status=label)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('task', '0002_taskmodel_indexes'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='taskmodel',
+            name='status',
+            field=models.CharField(choices=[('pending', 'Pending'), ('in_progress', 'In Progress'), ('completed', 'Completed')], max_length=15),
+        ),
+        migrations.RunPython(forwards, backwards),
+    ]
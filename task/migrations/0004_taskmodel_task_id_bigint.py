@@ -0,0 +1,18 @@
+# Generated by Django 5.1.3 on 2026-10-18 19:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('task', '0003_taskmodel_status_keys'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='taskmodel',
+            name='task_id',
+            field=models.BigIntegerField(unique=True),
+        ),
+    ]
@@ -0,0 +1,71 @@
+from django.db import migrations
+
+FTS_SQL = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS task_fts USING fts5(
+        title, description, owner, tokenize = 'unicode61 remove_diacritics 2'
+    )
+    """,
+    """
+    INSERT INTO task_fts (rowid, title, description, owner)
+    SELECT id, title, description, 'u' || user_id FROM task_taskmodel
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS task_fts_insert AFTER INSERT ON task_taskmodel BEGIN
+        INSERT INTO task_fts (rowid, title, description, owner)
+        VALUES (NEW.id, NEW.title, NEW.description, 'u' || NEW.user_id);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS task_fts_update AFTER UPDATE OF title, description, user_id ON task_taskmodel BEGIN
+        UPDATE task_fts SET title = NEW.title, description = NEW.description, owner = 'u' || NEW.user_id
+        WHERE rowid = OLD.id;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS task_fts_delete AFTER DELETE ON task_taskmodel BEGIN
+        DELETE FROM task_fts WHERE rowid = OLD.id;
+    END
+    """,
+]
+
+DROP_SQL = [
+    'DROP TRIGGER IF EXISTS task_fts_insert',
+    'DROP TRIGGER IF EXISTS task_fts_update',
+    'DROP TRIGGER IF EXISTS task_fts_delete',
+    'DROP TABLE IF EXISTS task_fts',
+]
+
+
+def _fts5_supported(connection):
+    if connection.vendor != 'sqlite':
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute('PRAGMA compile_options')
+        return any('ENABLE_FTS5' in row[0] for row in cursor.fetchall())
+
+
+def create_fts(apps, schema_editor):
+    # Other backends (or SQLite builds without FTS5) use task.search's fallbacks.
+    if not _fts5_supported(schema_editor.connection):
+        return
+    for sql in FTS_SQL:
+        schema_editor.execute(sql)
+
+
+def drop_fts(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for sql in DROP_SQL:
+        schema_editor.execute(sql)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('task', '0004_taskmodel_task_id_bigint'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_fts, drop_fts),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 5.1.3 on 2026-10-18 19:24
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def count_tasks(apps, schema_editor):
+    TaskModel = apps.get_model('task', 'TaskModel')
+    TaskStat = apps.get_model('task', 'TaskStat')
+    rows = TaskModel.objects.values('user_id', 'status', 'due_date').annotate(count=Count('id')).order_by()
+    TaskStat.objects.bulk_create((TaskStat(**row) for row in rows.iterator()), batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('task', '0005_task_fts'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TaskStat',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('in_progress', 'In Progress'), ('completed', 'Completed')], max_length=15)),
+                ('due_date', models.DateField()),
+                ('count', models.IntegerField(default=0)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='task_stats', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('user', 'status', 'due_date'), name='task_stat_unique')],
+            },
+        ),
+        migrations.RunPython(count_tasks, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.1.3 on 2026-10-18 19:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('task', '0007_tasktombstone'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='taskmodel',
+            name='task_user_status_idx',
+        ),
+        migrations.AddIndex(
+            model_name='taskmodel',
+            index=models.Index(fields=['user', 'status', 'due_date'], name='task_user_status_due_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='taskmodel',
+            index=models.Index(fields=['user', 'created_at'], name='task_user_created_at_idx'),
+        ),
+    ]
@@ -1,4 +1,4 @@
-from django.db import models
+from django.db import models, transaction
 from django.contrib.auth.models import BaseUserManager, AbstractBaseUser, PermissionsMixin
 # Create your models here.
 
@@ -53,18 +53,97 @@ class User(AbstractBaseUser, PermissionsMixin):
 
 class TaskModel(models.Model):
     STATUS_CHOICES = [
-        ('Pending', 'Pending'), 
-        ('In Progress', 'In Progress'), 
-        ('Completed', 'Completed')
+        ('pending', 'Pending'), 
+        ('in_progress', 'In Progress'), 
+        ('completed', 'Completed')
     ]
     user = models.ForeignKey(User, related_name='TaskUser', on_delete=models.CASCADE, default=None)
-    task_id = models.IntegerField(unique=True)
+    task_id = models.BigIntegerField(unique=True)
     title = models.CharField(max_length=255)
     description = models.TextField()
     due_date = models.DateField()
     status = models.CharField(max_length=15, choices=STATUS_CHOICES)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', 'due_date'], name='task_user_due_date_idx'),
+            models.Index(fields=['user', 'status', 'due_date'], name='task_user_status_due_idx'),
+            models.Index(fields=['user', 'created_at'], name='task_user_created_at_idx'),
+            models.Index(fields=['due_date'], name='task_due_date_idx'),
+            models.Index(fields=['updated_at'], name='task_updated_at_idx'),
+            models.Index(fields=['user', 'updated_at'], name='task_user_updated_at_idx'),
+        ]
     
+    def save(self, *args, **kwargs):
+        # post_save updates TaskStat, keep both writes in one transaction.
+        with transaction.atomic(using=kwargs.get('using'), savepoint=False):
+            super().save(*args, **kwargs)
+
+    def __str__(self):
+        return self.title
+
+
+class TaskStat(models.Model):
+    '''Denormalized number of tasks per user, status and due date'''
+    user = models.ForeignKey(User, related_name='task_stats', on_delete=models.CASCADE)
+    status = models.CharField(max_length=15, choices=TaskModel.STATUS_CHOICES)
+    due_date = models.DateField()
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'status', 'due_date'], name='task_stat_unique'),
+        ]
+
+    def __str__(self):
+        return f'{self.user_id} {self.status} {self.due_date}: {self.count}'
+
+
+class TaskTombstone(models.Model):
+    '''Deletion log read by the sync endpoint, pruned after TASK_SYNC_TOMBSTONE_DAYS'''
+    user = models.ForeignKey(User, related_name='task_tombstones', on_delete=models.CASCADE)
+    task_pk = models.BigIntegerField()
+    task_id = models.BigIntegerField()
+    deleted_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', 'deleted_at'], name='task_tombstone_user_idx'),
+            models.Index(fields=['deleted_at'], name='task_tombstone_deleted_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.task_id} deleted {self.deleted_at}'
+
+
+class ArchivedTask(models.Model):
+    '''
+    Completed tasks moved out of TaskModel by archive_tasks, keeping their
+    id. Rows are only ever inserted, and deleted again when restored.
+    '''
+    id = models.BigIntegerField(primary_key=True)
+    user = models.ForeignKey(User, related_name='archived_tasks', on_delete=models.CASCADE)
+    task_id = models.BigIntegerField(unique=True)
+    title = models.CharField(max_length=255)
+    description = models.TextField()
+    due_date = models.DateField()
+    status = models.CharField(max_length=15, choices=TaskModel.STATUS_CHOICES)
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+    archived_at = models.DateTimeField()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', 'updated_at'], name='archived_task_user_idx'),
+            models.Index(fields=['updated_at'], name='archived_task_updated_idx'),
+        ]
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding:
+            raise ValueError('Archived tasks cannot be changed, restore them instead.')
+        super().save(*args, **kwargs)
+
     def __str__(self):
-        return self.title
\ No newline at end of file
+        return f'{self.title} archived {self.archived_at}'
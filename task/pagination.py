@@ -0,0 +1,184 @@
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from collections import namedtuple
+
+from django.conf import settings
+from django.db.models import Q
+
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+from task.models import TaskModel
+
+Cursor = namedtuple('Cursor', ['position', 'reverse'])
+
+
+class InvalidCursor(Exception):
+    pass
+
+
+def encode_cursor(cursor):
+    '''Encode a cursor as an opaque url safe token'''
+    payload = json.dumps([[str(value) for value in cursor.position], int(cursor.reverse)])
+    return urlsafe_b64encode(payload.encode('ascii')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(token, ordering):
+    '''Decode a token made by encode_cursor back into typed key values'''
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        position, reverse = json.loads(urlsafe_b64decode(padded.encode('ascii')))
+        if len(position) != len(ordering):
+            raise ValueError
+        position = tuple(
+            TaskModel._meta.get_field(field.lstrip('-')).to_python(value)
+            for field, value in zip(ordering, position)
+        )
+    except Exception:
+        raise InvalidCursor(token)
+    return Cursor(position=position, reverse=bool(reverse))
+
+
+def _invert(ordering):
+    return tuple(field[1:] if field.startswith('-') else '-' + field for field in ordering)
+
+
+def _seek(ordering, position):
+    '''Build the WHERE clause that starts a page right after `position`'''
+    first = ordering[0]
+    # The leading bound lets the database range-seek the index instead of
+    # filtering every row that sorts before the cursor.
+    bound = Q(**{f'{first.lstrip("-")}__{"lte" if first.startswith("-") else "gte"}': position[0]})
+    condition = Q()
+    for index, field in enumerate(ordering):
+        name = field.lstrip('-')
+        lookup = 'lt' if field.startswith('-') else 'gt'
+        clause = Q(**{f'{name}__{lookup}': position[index]})
+        for previous, value in zip(ordering[:index], position):
+            clause &= Q(**{previous.lstrip('-'): value})
+        condition |= clause
+    return bound & condition
+
+
+def row_position(row, ordering):
+    if isinstance(row, dict):
+        return tuple(row[field.lstrip('-')] for field in ordering)
+    return tuple(getattr(row, field.lstrip('-')) for field in ordering)
+
+
+def seek_after(queryset, ordering, position):
+    '''Order `queryset` by `ordering` and skip every row up to `position`'''
+    queryset = queryset.order_by(*ordering)
+    if position is not None:
+        queryset = queryset.filter(_seek(ordering, position))
+    return queryset
+
+
+def _page_query(queryset, ordering, cursor, page_size):
+    reverse = cursor.reverse if cursor else False
+    order = _invert(ordering) if reverse else tuple(ordering)
+    return seek_after(queryset, order, cursor.position if cursor else None)[:page_size + 1]
+
+
+def _page_result(rows, ordering, cursor, page_size):
+    reverse = cursor.reverse if cursor else False
+    has_more = len(rows) > page_size
+    rows = rows[:page_size]
+    if reverse:
+        rows.reverse()
+
+    next_cursor = previous_cursor = None
+    if rows:
+        if has_more or reverse:
+            next_cursor = Cursor(position=row_position(rows[-1], ordering), reverse=False)
+        if (has_more and reverse) or (cursor and not reverse):
+            previous_cursor = Cursor(position=row_position(rows[0], ordering), reverse=True)
+    return rows, next_cursor, previous_cursor
+
+
+def paginate_keyset(queryset, ordering, cursor, page_size):
+    '''
+    Return one page of `queryset` by seeking on the `ordering` key rather than
+    counting an OFFSET, along with the cursors for the neighbouring pages.
+    '''
+    rows = list(_page_query(queryset, ordering, cursor, page_size))
+    return _page_result(rows, ordering, cursor, page_size)
+
+
+async def apaginate_keyset(queryset, ordering, cursor, page_size):
+    '''paginate_keyset for async views'''
+    rows = [row async for row in _page_query(queryset, ordering, cursor, page_size)]
+    return _page_result(rows, ordering, cursor, page_size)
+
+
+def get_page_size(value):
+    '''Clamp a requested page size to the TASK_PAGE_SIZE / TASK_MAX_PAGE_SIZE settings'''
+    default = settings.TASK_PAGE_SIZE
+    try:
+        size = int(value)
+    except (TypeError, ValueError):
+        return default
+    if size <= 0:
+        return default
+    return min(size, settings.TASK_MAX_PAGE_SIZE)
+
+
+class TaskCursorPagination(BasePagination):
+    '''
+    Keyset pagination over (due_date, id), or the ordering the view sets as
+    `list_ordering`, so every page costs the same
+    '''
+    ordering = ('due_date', 'id')
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+    invalid_cursor_message = 'Invalid cursor'
+
+    def get_ordering(self, view):
+        '''The keyset the view picked for this request, if any'''
+        return getattr(view, 'list_ordering', None) or self.ordering
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        ordering = self.get_ordering(view)
+        page_size = get_page_size(request.query_params.get(self.page_size_query_param))
+        token = request.query_params.get(self.cursor_query_param)
+        try:
+            cursor = decode_cursor(token, ordering) if token else None
+        except InvalidCursor:
+            raise NotFound(self.invalid_cursor_message)
+        rows, self.next_cursor, self.previous_cursor = paginate_keyset(
+            queryset, ordering, cursor, page_size
+        )
+        return rows
+
+    def encode_link(self, cursor):
+        if cursor is None:
+            return None
+        return replace_query_param(self.base_url, self.cursor_query_param, encode_cursor(cursor))
+
+    def get_next_link(self):
+        return self.encode_link(self.next_cursor)
+
+    def get_previous_link(self):
+        return self.encode_link(self.previous_cursor)
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'previous': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
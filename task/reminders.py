@@ -0,0 +1,249 @@
+import heapq
+import threading
+from datetime import datetime, time as dtime, timedelta
+
+from django.conf import settings
+from django.core.mail import send_mass_mail
+from django.db.models import F, Q
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from task.models import TaskModel
+
+OPEN_TASKS = ~Q(status='completed')
+
+
+class ConsoleSink:
+    '''Print reminders, handy for development'''
+    def __init__(self, stdout=None):
+        self.stdout = stdout
+
+    def send(self, reminders):
+        for reminder in reminders:
+            line = f"Reminder: '{reminder['title']}' for {reminder['email']} is due {reminder['due_date']}"
+            if self.stdout:
+                self.stdout.write(line)
+            else:
+                print(line)
+
+
+class EmailSink:
+    '''Send one mail per reminder through a single EMAIL_BACKEND connection'''
+    def __init__(self, stdout=None):
+        pass
+
+    def send(self, reminders):
+        send_mass_mail([
+            (
+                f"Task due {reminder['due_date']}: {reminder['title']}",
+                f"Your task '{reminder['title']}' (#{reminder['task_id']}) is due on {reminder['due_date']}.",
+                None,
+                [reminder['email']],
+            )
+            for reminder in reminders
+        ], fail_silently=False)
+
+
+def get_sink(stdout=None):
+    return import_string(settings.TASK_REMINDER_SINK)(stdout=stdout)
+
+
+def remind_at(due_date):
+    '''The moment the reminder for a task due on `due_date` fires'''
+    day = due_date - timedelta(days=settings.TASK_REMINDER_DAYS_BEFORE)
+    hour, minute = (int(part) for part in settings.TASK_REMINDER_TIME.split(':'))
+    return timezone.make_aware(datetime.combine(day, dtime(hour, minute)))
+
+
+def first_due_date(now):
+    '''Earliest due date whose reminder is not in the past at `now`'''
+    due = timezone.localtime(now).date() + timedelta(days=settings.TASK_REMINDER_DAYS_BEFORE)
+    if remind_at(due) < now:
+        due += timedelta(days=1)
+    return due
+
+
+class ReminderScheduler:
+    '''
+    Min-heap of (due_date, task pk) for open tasks with an upcoming reminder.
+
+    Only a window of the earliest reminders is held in memory. The window is
+    filled by keyset range scans on the due_date index and topped up as it
+    drains, so memory stays bounded by `max_heap` whatever the table size.
+    Changes arrive through `track`/`forget` (model signals in this process)
+    and through an updated_at range scan for writes made by other processes.
+    Entries are never removed from the heap; a popped entry that no longer
+    matches `scheduled` is simply skipped. Sent reminders are remembered as
+    (pk, due_date) in `reminded` so a later edit does not queue them again;
+    moving the due date schedules a new reminder.
+    '''
+
+    def __init__(self, sink, now=None, batch_size=None, max_heap=None):
+        self.sink = sink
+        self.batch_size = batch_size or settings.TASK_REMINDER_BATCH_SIZE
+        self.max_heap = max_heap or settings.TASK_REMINDER_MAX_HEAP
+        now = now or timezone.now()
+        self._lock = threading.Lock()
+        self._heap = []
+        self.scheduled = {}
+        self.reminded = {}
+        # Reminders missed by up to TASK_REMINDER_CATCH_UP_HOURS while no
+        # worker was running are still sent.
+        self.start = first_due_date(now - timedelta(hours=settings.TASK_REMINDER_CATCH_UP_HOURS))
+        # Highest (due_date, pk) read by the due_date scan, None until the first load.
+        self.frontier = None
+        self.exhausted = False
+        # Position of the updated_at scan; uses the wall clock because it is
+        # compared with the timestamps writers store.
+        self.changes_since = (timezone.now(), 0)
+        self.sent = 0
+
+    def __len__(self):
+        return len(self._heap)
+
+    def _push(self, due_date, pk):
+        self.scheduled[pk] = due_date
+        heapq.heappush(self._heap, (due_date, pk))
+
+    def _in_window(self, due_date, pk):
+        if due_date < self.start or self.reminded.get(pk) == due_date:
+            return False
+        return self.exhausted or (self.frontier is not None and (due_date, pk) <= self.frontier)
+
+    def track(self, pk, due_date, status):
+        '''Schedule, reschedule or drop a task after it changed'''
+        with self._lock:
+            if status == 'completed' or not self._in_window(due_date, pk):
+                self.scheduled.pop(pk, None)
+            elif self.scheduled.get(pk) != due_date:
+                self._push(due_date, pk)
+            self._shrink()
+
+    def forget(self, pk):
+        with self._lock:
+            self.scheduled.pop(pk, None)
+
+    def _shrink(self):
+        if len(self._heap) <= self.max_heap:
+            return
+        live = [entry for entry in self._heap if self.scheduled.get(entry[1]) == entry[0]]
+        keep = heapq.nsmallest(self.max_heap // 2, live)
+        self._heap = keep
+        heapq.heapify(self._heap)
+        # Everything past the new frontier is read again by refill later.
+        self.frontier = keep[-1] if keep else None
+        self.exhausted = False
+        kept = {pk for _, pk in keep}
+        self.scheduled = {pk: due for pk, due in self.scheduled.items() if pk in kept}
+
+    def refill(self):
+        '''Range scan the next batch past the frontier while there is room'''
+        while not self.exhausted and len(self._heap) < self.max_heap // 2:
+            if self.frontier:
+                due_date, pk = self.frontier
+                queryset = TaskModel.objects.filter(
+                    Q(due_date__gt=due_date) | Q(id__gt=pk), OPEN_TASKS, due_date__gte=due_date
+                )
+            else:
+                queryset = TaskModel.objects.filter(OPEN_TASKS, due_date__gte=self.start)
+            rows = list(queryset.order_by('due_date', 'id').values_list('due_date', 'id')[:self.batch_size])
+            with self._lock:
+                for due_date, pk in rows:
+                    if pk not in self.scheduled and self.reminded.get(pk) != due_date:
+                        self._push(due_date, pk)
+                if rows:
+                    self.frontier = rows[-1]
+                if len(rows) < self.batch_size:
+                    self.exhausted = True
+
+    def catch_up(self):
+        '''Pick up writes from other processes through the updated_at index'''
+        while True:
+            since, last_pk = self.changes_since
+            rows = list(
+                TaskModel.objects.filter(updated_at__gte=since)
+                .filter(Q(updated_at__gt=since) | Q(id__gt=last_pk))
+                .order_by('updated_at', 'id')
+                .values_list('updated_at', 'id', 'due_date', 'status')[:self.batch_size]
+            )
+            for updated_at, pk, due_date, status in rows:
+                self.track(pk, due_date, status)
+            if rows:
+                self.changes_since = rows[-1][:2]
+            if len(rows) < self.batch_size:
+                return
+
+    def next_reminder(self):
+        '''When the earliest scheduled reminder fires, or None'''
+        with self._lock:
+            while self._heap and self.scheduled.get(self._heap[0][1]) != self._heap[0][0]:
+                heapq.heappop(self._heap)
+            return remind_at(self._heap[0][0]) if self._heap else None
+
+    def _pop_due(self, now):
+        due = []
+        with self._lock:
+            while self._heap and len(due) < self.batch_size:
+                due_date, pk = self._heap[0]
+                if self.scheduled.get(pk) != due_date:
+                    heapq.heappop(self._heap)
+                    continue
+                if remind_at(due_date) > now:
+                    break
+                heapq.heappop(self._heap)
+                del self.scheduled[pk]
+                due.append((due_date, pk))
+        return due
+
+    def dispatch(self, now=None):
+        '''Send every reminder that is due, in batches; returns how many were sent'''
+        now = now or timezone.now()
+        sent = 0
+        while True:
+            due = self._pop_due(now)
+            if not due:
+                break
+            expected = {pk: due_date for due_date, pk in due}
+            # Re-read the rows so deleted, completed or moved tasks are skipped.
+            reminders = [
+                row for row in TaskModel.objects.filter(OPEN_TASKS, id__in=expected)
+                .order_by('due_date', 'id')
+                .values('id', 'task_id', 'title', 'due_date', email=F('user__email'))
+                if row['due_date'] == expected[row['id']]
+            ]
+            if reminders:
+                self.sink.send(reminders)
+                sent += len(reminders)
+                with self._lock:
+                    self.reminded.update((row['id'], row['due_date']) for row in reminders)
+            self.refill()
+        self._advance(now)
+        self.sent += sent
+        return sent
+
+    def _advance(self, now):
+        '''Move the window start like __init__ does and forget older reminders'''
+        start = first_due_date(now - timedelta(hours=settings.TASK_REMINDER_CATCH_UP_HOURS))
+        with self._lock:
+            self.start = max(self.start, start)
+            self.reminded = {pk: due for pk, due in self.reminded.items() if due >= self.start}
+
+    def run_once(self, now=None):
+        now = now or timezone.now()
+        self.catch_up()
+        self.refill()
+        return self.dispatch(now)
+
+
+# Set by run_reminders so model signals in the same process reach the heap.
+active_scheduler = None
+
+
+def task_changed(task):
+    if active_scheduler is not None:
+        active_scheduler.track(task.pk, task.due_date, task.status)
+
+
+def task_deleted(task):
+    if active_scheduler is not None:
+        active_scheduler.forget(task.pk)
@@ -0,0 +1,88 @@
+import re
+
+from django.db import connection
+from django.db.models import Q
+
+from task.models import TaskModel
+
+FTS_TABLE = 'task_fts'
+TERM = re.compile(r'\w+', re.UNICODE)
+
+
+def fts5_enabled(using=connection):
+    '''Whether the task_fts table exists, remembered per connection'''
+    if using.vendor != 'sqlite':
+        return False
+    enabled = getattr(using, '_task_fts5_enabled', None)
+    if enabled is None:
+        with using.cursor() as cursor:
+            cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = %s", [FTS_TABLE])
+            enabled = using._task_fts5_enabled = cursor.fetchone() is not None
+    return enabled
+
+
+def _scoped_to_user(user):
+    # Same rule as TaskView.get_queryset: only superusers see every task.
+    return not user.is_superuser
+
+
+def fts5_match(user, query):
+    '''
+    Build an FTS5 MATCH expression from free text. Every word becomes a quoted
+    prefix term, so user input can never inject FTS syntax, and the owner
+    token keeps the lookup inside one user's documents.
+    '''
+    terms = TERM.findall(query)
+    if not terms:
+        return None
+    expression = ' AND '.join('"%s"*' % term.replace('"', '""') for term in terms)
+    if _scoped_to_user(user):
+        expression = f'owner:"u{int(user.pk)}" AND ({expression})'
+    return expression
+
+
+def _search_fts5(user, query, limit, offset):
+    match = fts5_match(user, query)
+    if match is None:
+        return []
+    with connection.cursor() as cursor:
+        # Title matches weigh ten times more than description matches.
+        cursor.execute(
+            f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s '
+            f'ORDER BY bm25({FTS_TABLE}, 10.0, 1.0, 0.0), rowid LIMIT %s OFFSET %s',
+            [match, limit, offset],
+        )
+        ids = [row[0] for row in cursor.fetchall()]
+    tasks = TaskModel.objects.in_bulk(ids)
+    return [tasks[pk] for pk in ids if pk in tasks]
+
+
+def _search_postgres(queryset, query, limit, offset):
+    from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector
+
+    vector = SearchVector('title', weight='A') + SearchVector('description', weight='B')
+    search = SearchQuery(query, search_type='websearch')
+    return list(
+        queryset.annotate(rank=SearchRank(vector, search))
+        .filter(rank__gt=0)
+        .order_by('-rank', 'id')[offset:offset + limit]
+    )
+
+
+def _search_icontains(queryset, query, limit, offset):
+    condition = Q()
+    for term in TERM.findall(query):
+        condition &= Q(title__icontains=term) | Q(description__icontains=term)
+    return list(queryset.filter(condition).order_by('-updated_at', 'id')[offset:offset + limit])
+
+
+def search_tasks(user, query, limit, offset=0):
+    '''Ranked keyword search over the title and description of the user's tasks'''
+    if fts5_enabled():
+        return _search_fts5(user, query, limit, offset)
+    queryset = TaskModel.objects.all()
+    if _scoped_to_user(user):
+        queryset = queryset.filter(user=user)
+    if connection.vendor == 'postgresql':
+        return _search_postgres(queryset, query, limit, offset)
+    return _search_icontains(queryset, query, limit, offset)
@@ -0,0 +1,85 @@
+'''
+Synthetic users and tasks for load tests, generated in bulk.
+
+The distributions follow what a task list looks like in use rather than
+uniform noise: a few users own most of the tasks, due dates cluster around
+the coming weeks with a tail of old ones, and the status follows the due
+date (overdue tasks are mostly completed, far away ones mostly pending).
+'''
+import random
+from datetime import date, timedelta
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+
+from task import stats
+from task.caching import invalidate
+from task.ids import next_task_id
+from task.models import TaskModel
+
+VERBS = 'Prepare Review Send Update Fix Plan Draft Call Schedule Check Finish Book Pay Clean Test Deploy'.split()
+OBJECTS = (
+    'invoice report slides budget release notes contract newsletter backlog roadmap demo '
+    'migration backup audit offsite onboarding interview dentist groceries tax return'
+).split()
+WORDS = 'the a for with before after team client weekly final new old shared notes and of to'.split() + OBJECTS
+
+# Status weights (pending, in_progress, completed) by how far off the due date is.
+STATUS_WEIGHTS = [
+    (-1, (8, 12, 80)),      # overdue
+    (7, (45, 40, 15)),      # due within a week
+    (None, (80, 15, 5)),    # later
+]
+STATUSES = ['pending', 'in_progress', 'completed']
+
+
+def _status(rng, days):
+    for limit, weights in STATUS_WEIGHTS:
+        if limit is None or days <= limit:
+            return rng.choices(STATUSES, weights)[0]
+
+
+def _task(rng, user, today):
+    days = max(-365, min(365, round(rng.gauss(14, 45))))
+    title = f'{rng.choice(VERBS)} {rng.choice(OBJECTS)}'
+    return TaskModel(
+        user=user,
+        task_id=next_task_id(),
+        title=title,
+        description=' '.join(rng.choice(WORDS) for _ in range(rng.randint(5, 60))),
+        due_date=today + timedelta(days=days),
+        status=_status(rng, days),
+    )
+
+
+def seed_tasks(users, tasks, password, prefix='seed', seed=0, batch_size=5000, progress=None):
+    '''
+    Create `users` users, `prefix`0@example.com and on, sharing `password`,
+    and `tasks` tasks spread over them with Pareto weights. Tasks are
+    inserted `batch_size` at a time, each batch in its own transaction with
+    its counters. Returns the users.
+    '''
+    rng = random.Random(seed)
+    User = get_user_model()
+    # One hash for everyone, hashing per user would dominate the run.
+    password = make_password(password)
+    owners = User.objects.bulk_create([
+        User(email=f'{prefix}{i}@example.com', name=f'{prefix.title()} User {i}', password=password)
+        for i in range(users)
+    ])
+    weights = [rng.paretovariate(1.2) for _ in owners]
+    today = date.today()
+    created = 0
+    while created < tasks:
+        size = min(batch_size, tasks - created)
+        with transaction.atomic():
+            batch = TaskModel.objects.bulk_create([
+                _task(rng, user, today) for user in rng.choices(owners, weights, k=size)
+            ])
+            stats.record(stats.added(batch))
+        created += size
+        if progress:
+            progress(created)
+    invalidate(*[user.pk for user in owners])
+    return owners
@@ -1,16 +1,46 @@
+import functools
+
 from rest_framework import serializers, status
 from rest_framework.response import Response
 from datetime import datetime
+from django.conf import settings
 from django.contrib.auth import authenticate, get_user_model
 
 
-from.models import TaskModel
+from.models import ArchivedTask, TaskModel
+from.ids import next_task_id
+from.instrumentation import serializer_timer
+
+
+class TimedListSerializer(serializers.ListSerializer):
+    @property
+    def data(self):
+        with serializer_timer():
+            return super().data
+
 
+class TimedSerializerMixin:
+    '''Report the time spent building `.data` to the request metrics'''
+    @property
+    def data(self):
+        with serializer_timer():
+            return super().data
 
-class UserSerializer(serializers.ModelSerializer):
+
+class SparseFieldsMixin:
+    '''Render only the fields named by the `fields` argument, if given'''
+    def __init__(self, *args, fields=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+
+
+class UserSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = get_user_model()
         fields = ['email', 'password', 'name']
+        list_serializer_class = TimedListSerializer
         extra_kwargs = {'password': {'write_only': True}}
     
     def create(self, validated_data):
@@ -50,16 +80,16 @@ class AuthTokenSerializer(serializers.Serializer):
         return attrs
 
 
-class TaskSerializer(serializers.ModelSerializer):
+class TaskSerializer(TimedSerializerMixin, SparseFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = TaskModel
         fields = ['id', 'user', 'task_id', 'title', 'description', 'due_date', 'status', 'created_at', 'updated_at',]
         read_only_fields = ['id', 'user','task_id', 'created_at', 'updated_at']
+        list_serializer_class = TimedListSerializer
 
     
     def create(self, validated_data):
-        task_id = datetime.now().strftime("%Y%m%d%H%M%S") + str(self.request.user.id)
-        validated_data['task_id'] = task_id
+        validated_data['task_id'] = next_task_id()
         try:
             return TaskModel.objects.create(**validated_data)
         except Exception as e:
@@ -83,4 +113,72 @@ class TaskSerializer(serializers.ModelSerializer):
     def validate_status(self, value):
         if value not in ['pending', 'in_progress', 'completed']:
             raise serializers.ValidationError('Invalid status.')
-        return value
\ No newline at end of file
+        return value
+
+
+@functools.cache
+def readable_fields(serializer_class):
+    return tuple(name for name, field in serializer_class().fields.items() if not field.write_only)
+
+
+def selected_fields(params, serializer_class=TaskSerializer):
+    '''
+    The fields picked by the comma separated ?fields= and ?exclude= query
+    parameters, in the serializer's order, or None when all are wanted.
+    '''
+    if 'fields' not in params and 'exclude' not in params:
+        return None
+    available = readable_fields(serializer_class)
+
+    def names(param):
+        if param not in params:
+            return None
+        names = [name.strip() for name in params[param].split(',') if name.strip()]
+        unknown = [name for name in names if name not in available]
+        if unknown:
+            raise serializers.ValidationError({param: [f'Unknown field: {", ".join(unknown)}.']})
+        return names
+
+    include, exclude = names('fields'), names('exclude') or ()
+    selected = tuple(name for name in available if (include is None or name in include) and name not in exclude)
+    if not selected:
+        raise serializers.ValidationError({'fields': ['No fields left to return.']})
+    return None if selected == available else selected
+
+
+class ArchivedTaskSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = ArchivedTask
+        fields = TaskSerializer.Meta.fields + ['archived_at']
+        read_only_fields = fields
+
+
+class TaskBulkSerializer(serializers.Serializer):
+    create = serializers.ListField(child=serializers.DictField(), required=False, default=list)
+    update = serializers.ListField(child=serializers.DictField(), required=False, default=list)
+    delete = serializers.ListField(child=serializers.IntegerField(), required=False, default=list)
+
+    def validate(self, attrs):
+        total = len(attrs['create']) + len(attrs['update']) + len(attrs['delete'])
+        if not total:
+            raise serializers.ValidationError('Nothing to do.')
+        if total > settings.TASK_BULK_MAX_ITEMS:
+            raise serializers.ValidationError(f'At most {settings.TASK_BULK_MAX_ITEMS} items per request.')
+        return attrs
+
+
+class TaskExportSerializer(serializers.Serializer):
+    file_format = serializers.ChoiceField(choices=['ndjson', 'csv'], default='ndjson')
+    status = serializers.ChoiceField(choices=TaskModel.STATUS_CHOICES, required=False)
+    due_after = serializers.DateField(required=False)
+    due_before = serializers.DateField(required=False)
+
+    def validate(self, attrs):
+        if 'due_after' in attrs and 'due_before' in attrs and attrs['due_after'] > attrs['due_before']:
+            raise serializers.ValidationError('due_after must not be later than due_before.')
+        return attrs
+
+
+class TaskSearchSerializer(serializers.Serializer):
+    q = serializers.CharField(max_length=200)
+    page = serializers.IntegerField(min_value=1, default=1)
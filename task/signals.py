@@ -0,0 +1,103 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from rest_framework.authtoken.models import Token
+
+from task.authentication import token_cache
+from task import events, reminders, stats, sync
+from task.caching import invalidate
+from task.database import apply_pragmas
+from task.instrumentation import instrument
+from task.models import TaskModel
+
+
+@receiver(post_save, sender=TaskModel)
+@receiver(post_delete, sender=TaskModel)
+def invalidate_task_lists(sender, instance, **kwargs):
+    invalidate(instance.user_id)
+
+
+@receiver(post_save, sender=TaskModel)
+def reschedule_reminder(sender, instance, **kwargs):
+    reminders.task_changed(instance)
+
+
+@receiver(post_delete, sender=TaskModel)
+def cancel_reminder(sender, instance, **kwargs):
+    reminders.task_deleted(instance)
+
+
+def _deleting_user(origin):
+    '''Whether a task delete cascades from its user, whose counters and tombstones go too'''
+    User = get_user_model()
+    return isinstance(origin, User) or getattr(origin, 'model', None) is User
+
+
+@receiver(pre_save, sender=TaskModel)
+def remember_task_counter(sender, instance, update_fields=None, **kwargs):
+    stats.task_saving(instance, update_fields)
+
+
+@receiver(post_save, sender=TaskModel)
+def update_task_counters(sender, instance, using=None, **kwargs):
+    stats.task_saved(instance, using)
+
+
+@receiver(post_delete, sender=TaskModel)
+def decrement_task_counter(sender, instance, using=None, origin=None, **kwargs):
+    if _deleting_user(origin):
+        return
+    stats.task_deleted(instance, using)
+
+
+@receiver(post_delete, sender=TaskModel)
+def log_task_deletion(sender, instance, origin=None, **kwargs):
+    if _deleting_user(origin):
+        return
+    sync.task_deleted(instance)
+
+
+@receiver(post_save, sender=TaskModel)
+def publish_task_saved(sender, instance, created, **kwargs):
+    previous = stats.previous_key(instance)
+    events.task_saved(instance, created, previous[1] if previous else None)
+
+
+@receiver(post_delete, sender=TaskModel)
+def publish_task_deleted(sender, instance, origin=None, **kwargs):
+    if _deleting_user(origin):
+        return
+    events.task_deleted(instance)
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+def invalidate_user_lists(sender, instance, update_fields=None, **kwargs):
+    if update_fields and set(update_fields) == {'last_login'}:
+        return
+    token_cache.evict_user(instance.pk)
+    # Ids can be reused (e.g. after a rollback) and admin flags change the
+    # list scope, so a saved user never inherits entries cached before.
+    invalidate(instance.pk)
+
+
+@receiver(post_delete, sender=settings.AUTH_USER_MODEL)
+def forget_deleted_user(sender, instance, **kwargs):
+    token_cache.evict_user(instance.pk)
+
+
+@receiver(post_delete, sender=Token)
+def forget_deleted_token(sender, instance, **kwargs):
+    token_cache.evict_key(instance.key)
+
+
+@receiver(connection_created)
+def instrument_connection(sender, connection, **kwargs):
+    instrument(connection)
+
+
+@receiver(connection_created)
+def tune_connection(sender, connection, **kwargs):
+    apply_pragmas(connection)
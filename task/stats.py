@@ -0,0 +1,178 @@
+import contextvars
+from collections import Counter
+from contextlib import contextmanager
+from datetime import timedelta
+
+from django.db import connections, router, transaction
+from django.db.models import Count, F, Q, Sum
+from django.utils import timezone
+
+from task.caching import invalidate
+from task.models import TaskModel, TaskStat
+
+COUNTED_FIELDS = ('user_id', 'status', 'due_date')
+UPSERT_BATCH_SIZE = 250
+
+_deferred = contextvars.ContextVar('task_stats_deferred', default=None)
+
+
+def counter_key(task):
+    return (task.user_id, task.status, task.due_date)
+
+
+def added(tasks):
+    '''Deltas for newly inserted tasks'''
+    return Counter(counter_key(task) for task in tasks)
+
+
+def moved(before, after, count=1):
+    '''Deltas for `count` tasks moving from one counter to another'''
+    deltas = Counter()
+    if before != after:
+        if before is not None:
+            deltas[before] -= count
+        if after is not None:
+            deltas[after] += count
+    return deltas
+
+
+def _upsert(deltas, using):
+    connection = connections[using]
+    quote = connection.ops.quote_name
+    table, count = quote(TaskStat._meta.db_table), quote('count')
+    columns = ', '.join(quote(column) for column in ('user_id', 'status', 'due_date', 'count'))
+    items = list(deltas.items())
+    with connection.cursor() as cursor:
+        for start in range(0, len(items), UPSERT_BATCH_SIZE):
+            batch = items[start:start + UPSERT_BATCH_SIZE]
+            params = []
+            for (user_id, status, due_date), delta in batch:
+                params += [user_id, status, connection.ops.adapt_datefield_value(due_date), delta]
+            cursor.execute(
+                f'INSERT INTO {table} ({columns}) VALUES {", ".join(["(%s, %s, %s, %s)"] * len(batch))} '
+                f'ON CONFLICT ({quote("user_id")}, {quote("status")}, {quote("due_date")}) '
+                f'DO UPDATE SET {count} = {table}.{count} + EXCLUDED.{count}',
+                params,
+            )
+
+
+def apply(deltas, using=None):
+    '''Add `deltas` ({(user_id, status, due_date): n}) to the counters'''
+    deltas = {key: delta for key, delta in deltas.items() if delta}
+    if not deltas:
+        return
+    using = using or router.db_for_write(TaskStat)
+    if connections[using].vendor in ('sqlite', 'postgresql'):
+        _upsert(deltas, using)
+        return
+    with transaction.atomic(using=using, savepoint=False):
+        for (user_id, status, due_date), delta in deltas.items():
+            counters = TaskStat.objects.using(using).filter(user_id=user_id, status=status, due_date=due_date)
+            if not counters.update(count=F('count') + delta):
+                TaskStat.objects.using(using).create(user_id=user_id, status=status, due_date=due_date, count=delta)
+
+
+def record(deltas, using=None):
+    '''Apply `deltas` now, or when the enclosing `deferred()` block ends'''
+    pending = _deferred.get()
+    if pending is not None:
+        pending.update(deltas)
+    else:
+        apply(deltas, using)
+
+
+@contextmanager
+def deferred(using=None):
+    '''Collect the counter changes of a block and write them in one statement'''
+    if _deferred.get() is not None:
+        yield _deferred.get()
+        return
+    pending = Counter()
+    token = _deferred.set(pending)
+    try:
+        yield pending
+    finally:
+        _deferred.reset(token)
+    apply(pending, using)
+
+
+def task_saving(task, update_fields=None):
+    '''pre_save: remember the counter the stored row is in'''
+    task._stats_before = None
+    if task._state.adding and task.pk is None:
+        return
+    if update_fields is not None and not {'user', 'user_id', 'status', 'due_date'} & set(update_fields):
+        task._stats_before = counter_key(task)
+        return
+    # Read locked inside the save's transaction (TaskModel.save), so two
+    # concurrent saves of a task cannot both move it out of the same counter.
+    task._stats_before = (
+        TaskModel.objects.select_for_update().filter(pk=task.pk).values_list(*COUNTED_FIELDS).first()
+    )
+
+
+def task_saved(task, using=None):
+    '''post_save: move the task to its new counter'''
+    record(moved(getattr(task, '_stats_before', None), counter_key(task)), using)
+
+
+def previous_key(task):
+    '''The counter the task was in before its last save, None if it was new'''
+    return getattr(task, '_stats_before', None)
+
+
+def task_deleted(task, using=None):
+    record(moved(counter_key(task), None), using)
+
+
+def week_end(day):
+    return day + timedelta(days=6 - day.weekday())
+
+
+def user_stats(user, today=None):
+    '''
+    Task counts of a user by status and due date bucket. Reads only the
+    user's counter rows, one per status and due date, never the tasks.
+    '''
+    today = today or timezone.localdate()
+    open_tasks = ~Q(status='completed')
+    aggregates = {
+        status: Sum('count', filter=Q(status=status)) for status, _ in TaskModel.STATUS_CHOICES
+    }
+    totals = TaskStat.objects.filter(user=user).aggregate(
+        total=Sum('count'),
+        overdue=Sum('count', filter=open_tasks & Q(due_date__lt=today)),
+        due_today=Sum('count', filter=open_tasks & Q(due_date=today)),
+        due_this_week=Sum('count', filter=open_tasks & Q(due_date__gte=today, due_date__lte=week_end(today))),
+        **aggregates,
+    )
+    return {
+        'total': totals['total'] or 0,
+        'by_status': {status: totals[status] or 0 for status in aggregates},
+        'overdue': totals['overdue'] or 0,
+        'due_today': totals['due_today'] or 0,
+        'due_this_week': totals['due_this_week'] or 0,
+        'week_ends': week_end(today),
+    }
+
+
+def rebuild(user_ids):
+    '''
+    Recount the tasks of `user_ids` and correct their counters in place.
+    Returns how many counters were wrong.
+    '''
+    with transaction.atomic():
+        actual = Counter({
+            (row['user_id'], row['status'], row['due_date']): row['count']
+            for row in TaskModel.objects.filter(user_id__in=user_ids)
+            .values('user_id', 'status', 'due_date').annotate(count=Count('id')).order_by()
+        })
+        stored = Counter({
+            (row['user_id'], row['status'], row['due_date']): row['count']
+            for row in TaskStat.objects.filter(user_id__in=user_ids).values('user_id', 'status', 'due_date', 'count')
+        })
+        deltas = {key: actual[key] - stored[key] for key in actual.keys() | stored.keys()}
+        apply(deltas)
+        TaskStat.objects.filter(user_id__in=user_ids, count=0).delete()
+        invalidate(*user_ids)
+    return sum(1 for delta in deltas.values() if delta)
@@ -0,0 +1,170 @@
+import contextvars
+import json
+import logging
+import time
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from collections import namedtuple
+from contextlib import contextmanager
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from task.models import TaskTombstone
+from task.pagination import InvalidCursor, row_position, seek_after
+
+CHANGE_ORDERING = ('updated_at', 'id')
+TOMBSTONE_ORDERING = ('deleted_at', 'id')
+
+# Positions (timestamp, id) reached in the task and in the tombstone stream.
+SyncCursor = namedtuple('SyncCursor', ['changes', 'deleted'])
+SyncPage = namedtuple('SyncPage', ['changes', 'deleted', 'cursor', 'has_more'])
+
+_deferred = contextvars.ContextVar('task_sync_deferred', default=None)
+
+logger = logging.getLogger('task.sync')
+
+
+class ExpiredCursor(Exception):
+    '''The cursor is older than the retained tombstones'''
+
+
+def encode_sync_cursor(cursor):
+    payload = json.dumps({
+        name: [position[0].isoformat(), position[1]] if position else None
+        for name, position in cursor._asdict().items()
+    })
+    return urlsafe_b64encode(payload.encode('ascii')).decode('ascii').rstrip('=')
+
+
+def decode_sync_cursor(token):
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        payload = json.loads(urlsafe_b64decode(padded.encode('ascii')))
+        positions = {}
+        for name in SyncCursor._fields:
+            value = payload[name]
+            if value is None:
+                positions[name] = None
+                continue
+            moment, pk = parse_datetime(value[0]), int(value[1])
+            if moment is None or timezone.is_naive(moment):
+                raise ValueError
+            positions[name] = (moment, pk)
+        if positions['deleted'] is None:
+            raise ValueError
+    except Exception:
+        raise InvalidCursor(token)
+    return SyncCursor(**positions)
+
+
+def tombstones_for(user):
+    '''The deletion log matching TaskView.get_queryset'''
+    if user.is_superuser:
+        return TaskTombstone.objects.all()
+    return TaskTombstone.objects.filter(user=user)
+
+
+def _read(queryset, ordering, position, page_size, horizon):
+    '''
+    One page after `position` and the position to resume from. Rows newer
+    than `horizon` are returned but the position stops before them, as a
+    transaction still in flight may yet commit rows that sort earlier.
+    '''
+    rows = list(seek_after(queryset, ordering, position)[:page_size + 1])
+    full = len(rows) > page_size
+    rows = rows[:page_size]
+    settled = [row for row in rows if row_position(row, ordering)[0] <= horizon]
+    if settled:
+        position = row_position(settled[-1], ordering)
+    elif position is None or position < (horizon, 0):
+        # Nothing settled is left to read, so the stream is caught up to the
+        # horizon; this keeps an idle cursor from expiring.
+        position = (horizon, 0)
+    return rows, position, full and len(settled) == len(rows)
+
+
+def sync_page(tasks, tombstones, cursor, page_size, now=None):
+    '''
+    Tasks created or updated and tasks deleted since `cursor`, oldest first.
+    Either queryset may yield instances or .values() rows.
+    Without a cursor every task is sent and the deletion log starts now.
+    '''
+    now = now or timezone.now()
+    horizon = now - timedelta(seconds=settings.TASK_SYNC_LAG_SECONDS)
+    if cursor is None:
+        cursor = SyncCursor(changes=None, deleted=(horizon, 0))
+    elif cursor.deleted[0] < now - timedelta(days=settings.TASK_SYNC_TOMBSTONE_DAYS):
+        raise ExpiredCursor()
+    changes, changes_at, more_changes = _read(tasks, CHANGE_ORDERING, cursor.changes, page_size, horizon)
+    deleted, deleted_at, more_deleted = _read(tombstones, TOMBSTONE_ORDERING, cursor.deleted, page_size, horizon)
+    return SyncPage(
+        changes=changes,
+        deleted=deleted,
+        cursor=SyncCursor(changes=changes_at, deleted=deleted_at),
+        has_more=more_changes or more_deleted,
+    )
+
+
+def _tombstone(task):
+    return TaskTombstone(user_id=task.user_id, task_pk=task.pk, task_id=task.task_id)
+
+
+@contextmanager
+def deferred():
+    '''Collect the tombstones of a block and insert them with one bulk_create'''
+    if _deferred.get() is not None:
+        yield _deferred.get()
+        return
+    pending = []
+    token = _deferred.set(pending)
+    try:
+        yield pending
+    finally:
+        _deferred.reset(token)
+    TaskTombstone.objects.bulk_create(pending, batch_size=settings.TASK_BULK_BATCH_SIZE)
+    if pending:
+        check_commit_lag('tombstones')
+
+
+def check_commit_lag(what):
+    '''
+    Warn when rows stamped now commit more than TASK_SYNC_LAG_SECONDS later.
+    Cursors may already have moved past their timestamps, so sync clients
+    would miss them; stamp later in the transaction or raise the setting.
+    '''
+    stamped_at = time.monotonic()
+
+    def check():
+        lag = time.monotonic() - stamped_at
+        if lag > settings.TASK_SYNC_LAG_SECONDS:
+            logger.warning('%s committed %.1fs after they were stamped, over TASK_SYNC_LAG_SECONDS', what, lag)
+
+    transaction.on_commit(check)
+
+
+def task_deleted(task):
+    pending = _deferred.get()
+    if pending is not None:
+        pending.append(_tombstone(task))
+    else:
+        _tombstone(task).save()
+
+
+def task_restored(task):
+    '''Drop the tombstones of a task that is back under its old id'''
+    TaskTombstone.objects.filter(task_pk=task.pk).delete()
+
+
+def prune_tombstones(now=None, batch_size=1000):
+    '''Delete tombstones older than TASK_SYNC_TOMBSTONE_DAYS, returns how many'''
+    cutoff = (now or timezone.now()) - timedelta(days=settings.TASK_SYNC_TOMBSTONE_DAYS)
+    deleted = 0
+    while True:
+        batch = list(TaskTombstone.objects.filter(deleted_at__lt=cutoff)
+                     .order_by('deleted_at', 'id').values_list('id', flat=True)[:batch_size])
+        if not batch:
+            return deleted
+        deleted += TaskTombstone.objects.filter(id__in=batch).delete()[0]
@@ -0,0 +1,19 @@
+from contextlib import contextmanager
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+
+class QueryBudgetMixin:
+    '''TestCase mixin for asserting an upper bound on the queries of a block'''
+
+    @contextmanager
+    def assertQueryBudget(self, budget, using=connection):
+        with CaptureQueriesContext(using) as queries:
+            yield queries
+        executed = len(queries.captured_queries)
+        if executed > budget:
+            listing = '\n'.join(
+                f"{index}. {query['sql']}" for index, query in enumerate(queries.captured_queries, start=1)
+            )
+            self.fail(f'{executed} queries executed, budget is {budget}\n{listing}')
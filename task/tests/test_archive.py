@@ -0,0 +1,128 @@
+from datetime import date, timedelta
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from task import archive
+from task.models import ArchivedTask, TaskModel, TaskStat, TaskTombstone
+
+TASK_URL = reverse('task:task-list')
+ARCHIVE_URL = reverse('task:archive-list')
+SYNC_URL = reverse('task:task-sync')
+
+def createUser(email='example@gmail.com', password='test@123', **extra):
+    return get_user_model().objects.create_user(email=email, password=password, **extra)
+
+def archive_detail_url(id):
+    return reverse('task:archive-detail', args=[id])
+
+def restore_url(id):
+    return reverse('task:archive-restore', args=[id])
+
+
+@override_settings(TASK_ARCHIVE_AFTER_DAYS=30, TASK_PAGE_SIZE=2)
+class ArchiveTest(TestCase):
+    """Test archiving completed tasks and reading and restoring them"""
+    def setUp(self):
+        cache.clear()
+        self.user = createUser()
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        statuses = ['completed', 'completed', 'completed', 'pending', 'completed']
+        self.tasks = [
+            TaskModel.objects.create(user=self.user, task_id=i + 1, title=f'Task {i}', description='D',
+                                     due_date=date.today(), status=task_status)
+            for i, task_status in enumerate(statuses)
+        ]
+        # The first four were last touched long ago, the last one just now.
+        for days, task in zip([100, 90, 60, 100], self.tasks):
+            TaskModel.objects.filter(pk=task.pk).update(updated_at=timezone.now() - timedelta(days=days))
+        self.old_completed = [task.pk for task in self.tasks[:3]]
+
+    def archive(self, **options):
+        out = StringIO()
+        call_command('archive_tasks', stdout=out, **options)
+        return out.getvalue()
+
+    def test_archive_command(self):
+        """Test that only old completed tasks move, in batches, with their counters and tombstones"""
+        out = self.archive(batch_size=2)
+        self.assertIn('archived 2', out)
+        self.assertIn('Archived 3 tasks', out)
+        self.assertEqual(sorted(ArchivedTask.objects.values_list('id', flat=True)), self.old_completed)
+        self.assertEqual(sorted(TaskModel.objects.values_list('id', flat=True)), [self.tasks[3].pk, self.tasks[4].pk])
+        self.assertEqual(sum(TaskStat.objects.filter(user=self.user).values_list('count', flat=True)), 2)
+        self.assertEqual(TaskTombstone.objects.filter(user=self.user).count(), 3)
+        archived = ArchivedTask.objects.get(pk=self.tasks[0].pk)
+        self.assertEqual((archived.task_id, archived.title), (1, 'Task 0'))
+
+        self.assertIn('Archived 0 tasks', self.archive())
+        self.assertIn('Archived 1 tasks', self.archive(days=0))
+
+    def test_list_and_retrieve(self):
+        """Test that the archive is readable, newest first, and only the owner's"""
+        self.archive()
+        ArchivedTask.objects.create(user=createUser(email='other@gmail.com'), id=999, task_id=999, title='Other',
+                                    description='D', due_date=date.today(), status='completed',
+                                    created_at=timezone.now(), updated_at=timezone.now(), archived_at=timezone.now())
+        response = self.client.get(ARCHIVE_URL)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        ids = [task['id'] for task in response.data['results']]
+        ids += [task['id'] for task in self.client.get(response.data['next']).data['results']]
+        self.assertEqual(ids, [self.tasks[2].pk, self.tasks[1].pk, self.tasks[0].pk])
+        self.assertIn('archived_at', response.data['results'][0])
+
+        self.assertEqual(self.client.get(archive_detail_url(self.tasks[0].pk)).data['title'], 'Task 0')
+        self.assertEqual(self.client.get(archive_detail_url(999)).status_code, status.HTTP_404_NOT_FOUND)
+        response = self.client.patch(archive_detail_url(self.tasks[0].pk), {'title': 'New'})
+        self.assertEqual(response.status_code, status.HTTP_405_METHOD_NOT_ALLOWED)
+
+    def test_restore(self):
+        """Test that a restored task is back in the list under its id and left the archive"""
+        self.archive()
+        task = self.tasks[0]
+        response = self.client.post(restore_url(task.pk))
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual((response.data['id'], response.data['task_id']), (task.pk, task.task_id))
+        self.assertFalse(ArchivedTask.objects.filter(pk=task.pk).exists())
+        restored = TaskModel.objects.get(pk=task.pk)
+        self.assertEqual((restored.status, restored.created_at), ('completed', task.created_at))
+        self.assertIn(task.pk, [row['id'] for row in self.client.get(TASK_URL, {'page_size': 10}).data['results']])
+        self.assertEqual(self.client.post(restore_url(task.pk)).status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_restore_takes_back_the_tombstone(self):
+        """Test that a sync from before the archive sees the restored task only as a change"""
+        cursor = self.client.get(SYNC_URL).data['cursor']
+        self.archive()
+        task = self.tasks[0]
+        self.client.post(restore_url(task.pk))
+        self.assertFalse(TaskTombstone.objects.filter(task_pk=task.pk).exists())
+        with self.settings(TASK_SYNC_LAG_SECONDS=0):
+            data = self.client.get(SYNC_URL, {'cursor': cursor}).data
+        self.assertIn(task.pk, [row['id'] for row in data['changes']])
+        self.assertNotIn(task.pk, [row['id'] for row in data['deleted']])
+
+    def test_restore_of_a_restored_row(self):
+        """Test that restoring a row another request already restored is a not found"""
+        self.archive()
+        stale = ArchivedTask.objects.get(pk=self.tasks[0].pk)
+        archive.restore(ArchivedTask.objects.get(pk=stale.pk))
+        with self.assertRaises(ArchivedTask.DoesNotExist):
+            archive.restore(stale)
+        self.assertEqual(TaskModel.objects.filter(pk=stale.pk).count(), 1)
+
+    def test_append_only(self):
+        """Test that archived rows cannot be changed"""
+        self.archive()
+        archived = ArchivedTask.objects.first()
+        archived.title = 'Changed'
+        with self.assertRaises(ValueError):
+            archived.save()
@@ -0,0 +1,92 @@
+from asgiref.sync import sync_to_async
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import AsyncClient, TestCase, override_settings
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from task.models import TaskModel
+
+TASK_URL = reverse('task:task-list')
+ASYNC_TASK_URL = reverse('task:async_task_list')
+
+def async_detail_url(id):
+    return reverse('task:async_task_detail', args=[id])
+
+def createUser(email='example@gmail.com', password='test@123'):
+    return get_user_model().objects.create_user(email=email, password=password)
+
+def createTask(user, i):
+    return TaskModel.objects.create(user=user, task_id=i + 1, title=f'Task {i}', description='D',
+                                    due_date=f'2099-12-{i + 1:02d}', status='pending')
+
+
+@override_settings(TASK_PAGE_SIZE=2)
+class AsyncTaskAPITest(TestCase):
+    """Test the async native task API"""
+    def setUp(self):
+        cache.clear()
+        self.user = createUser()
+        self.token = Token.objects.create(user=self.user)
+        self.tasks = [createTask(self.user, i) for i in range(3)]
+        self.other = createTask(createUser(email='other@gmail.com'), 9)
+        self.headers = {'Authorization': f'Token {self.token.key}'}
+
+    async def test_list_matches_sync_view(self):
+        """Test that both stacks return the same pages"""
+        api = APIClient()
+        api.credentials(HTTP_AUTHORIZATION=f'Token {self.token.key}')
+        expected = await sync_to_async(lambda: api.get(TASK_URL).json())()
+        response = await self.async_client.get(ASYNC_TASK_URL, headers=self.headers)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        data = response.json()
+        self.assertEqual(data['results'], expected['results'])
+        self.assertIn('ETag', response)
+        response = await self.async_client.get(data['next'], headers=self.headers)
+        self.assertEqual([task['id'] for task in response.json()['results']], [self.tasks[2].id])
+
+    async def test_create_retrieve_update_complete(self):
+        """Test the write paths"""
+        response = await self.async_client.post(ASYNC_TASK_URL, {
+            'title': 'New', 'description': 'D', 'status': 'pending', 'due_date': '2099-12-25',
+        }, content_type='application/json', headers=self.headers)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        task_id = response.json()['id']
+        self.assertEqual(response.json()['user'], self.user.id)
+
+        response = await self.async_client.patch(async_detail_url(task_id), {'title': 'Renamed'},
+                                                 content_type='application/json', headers=self.headers)
+        self.assertEqual(response.json()['title'], 'Renamed')
+        response = await self.async_client.put(async_detail_url(task_id), {'title': 'Put'},
+                                               content_type='application/json', headers=self.headers)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        response = await self.async_client.patch(reverse('task:async_completed', args=[task_id]), headers=self.headers)
+        self.assertEqual(response.json()['status'], 'completed')
+        response = await self.async_client.get(async_detail_url(task_id), headers=self.headers)
+        self.assertEqual(response.json()['status'], 'completed')
+        task = await TaskModel.objects.aget(pk=task_id)
+        self.assertEqual((task.title, task.status), ('Renamed', 'completed'))
+
+    async def test_permissions(self):
+        """Test anonymous, foreign and missing tasks"""
+        response = await self.async_client.get(ASYNC_TASK_URL)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        response = await self.async_client.get(async_detail_url(self.other.id), headers=self.headers)
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        response = await self.async_client.patch(async_detail_url(self.other.id), {'title': 'x'},
+                                                 content_type='application/json', headers=self.headers)
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    async def test_session_writes_need_csrf(self):
+        """Test that session authenticated writes are CSRF checked"""
+        client = AsyncClient(enforce_csrf_checks=True)
+        await client.aforce_login(self.user)
+        response = await client.get(ASYNC_TASK_URL)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        response = await client.patch(async_detail_url(self.tasks[0].id), {'title': 'x'},
+                                      content_type='application/json')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
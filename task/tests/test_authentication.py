@@ -0,0 +1,89 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from task.authentication import TokenCache, token_cache
+
+USER_PROFILE = reverse('task:user')
+TASK_URL = reverse('task:task-list')
+
+def createUser(email='example@gmail.com', password='test@123'):
+    return get_user_model().objects.create_user(email=email, password=password)
+
+
+class TokenCacheTest(SimpleTestCase):
+    """Test the bounded token cache"""
+    class FakeUser:
+        def __init__(self, pk):
+            self.pk = pk
+
+    def test_lru_eviction(self):
+        """Test that the least recently used key is dropped first"""
+        tokens = TokenCache(max_size=2, ttl=60)
+        tokens.set('a', self.FakeUser(1), 'ta')
+        tokens.set('b', self.FakeUser(2), 'tb')
+        tokens.get('a')
+        tokens.set('c', self.FakeUser(3), 'tc')
+        self.assertIsNotNone(tokens.get('a'))
+        self.assertIsNone(tokens.get('b'))
+        self.assertEqual(len(tokens), 2)
+
+    def test_ttl_expiry(self):
+        """Test that entries expire after the ttl"""
+        now = [0]
+        tokens = TokenCache(max_size=10, ttl=5, clock=lambda: now[0])
+        tokens.set('a', self.FakeUser(1), 'ta')
+        now[0] = 6
+        self.assertIsNone(tokens.get('a'))
+        self.assertEqual(len(tokens), 0)
+
+
+class CachedTokenAuthenticationTest(TestCase):
+    """Test that cached token authentication saves queries"""
+    def setUp(self):
+        token_cache.clear()
+        cache.clear()
+        self.user = createUser()
+        self.token = Token.objects.create(user=self.user)
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.token.key}')
+
+    def test_repeat_requests_skip_token_query(self):
+        """Test that only the first request pays for the token lookup"""
+        with self.assertNumQueries(1):
+            self.client.get(USER_PROFILE)
+        with self.assertNumQueries(0):
+            response = self.client.get(USER_PROFILE)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['email'], self.user.email)
+        # With the cached task list as well, a repeated poll is query free.
+        self.client.get(TASK_URL)
+        with self.assertNumQueries(0):
+            self.client.get(TASK_URL)
+
+    def test_deleted_token_is_rejected(self):
+        """Test that deleting the token evicts it"""
+        self.client.get(USER_PROFILE)
+        self.token.delete()
+        response = self.client.get(USER_PROFILE)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_deactivated_user_is_rejected(self):
+        """Test that deactivating the user evicts their tokens"""
+        self.client.get(USER_PROFILE)
+        self.user.is_active = False
+        self.user.save()
+        response = self.client.get(USER_PROFILE)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_profile_update_is_visible(self):
+        """Test that a changed user is reloaded"""
+        self.client.get(USER_PROFILE)
+        self.client.patch(USER_PROFILE, {'name': 'New Name'}, format='json')
+        response = self.client.get(USER_PROFILE)
+        self.assertEqual(response.data['name'], 'New Name')
@@ -0,0 +1,107 @@
+from datetime import date
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from task import throttling
+from task.models import TaskModel
+
+BATCH_URL = reverse('task:batch')
+TASK_URL = reverse('task:task-list')
+USER_URL = reverse('task:user')
+
+def createUser(email='example@gmail.com', password='test@123'):
+    return get_user_model().objects.create_user(email=email, password=password)
+
+def task_detail_url(id):
+    return reverse('task:task-detail', args=[id])
+
+
+class BatchApiTest(TestCase):
+    """Test the batch endpoint"""
+    def setUp(self):
+        cache.clear()
+        throttling.get_backend().clear()
+        self.user = createUser()
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {Token.objects.create(user=self.user).key}')
+        self.task = TaskModel.objects.create(user=self.user, task_id=1, title='Task', description='D',
+                                             due_date=date.today(), status='pending')
+
+    def batch(self, requests, **extra):
+        return self.client.post(BATCH_URL, {'requests': requests, **extra}, format='json')
+
+    def test_page_load(self):
+        """Test reading the user, the list and a detail in one request"""
+        response = self.batch([
+            {'path': USER_URL},
+            {'path': TASK_URL + '?status=pending'},
+            {'path': task_detail_url(self.task.id) + '?fields=title'},
+        ])
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        user, tasks, task = response.data['responses']
+        self.assertEqual(user['body']['email'], self.user.email)
+        self.assertEqual([item['id'] for item in tasks['body']['results']], [self.task.id])
+        self.assertEqual(task['body'], {'title': 'Task'})
+        self.assertIn('ETag', task['headers'])
+        for item in response.data['responses']:
+            self.assertEqual(item['status'], status.HTTP_200_OK)
+            self.assertEqual(set(item['timing']), {'total_ms', 'db_ms', 'queries'})
+
+    def test_authenticated_once(self):
+        """Test that sub-requests reuse the batch's authentication"""
+        cache.clear()
+        # The token with its user, once, then the task.
+        with self.assertNumQueries(2):
+            response = self.batch([{'path': USER_URL}, {'path': task_detail_url(self.task.id)}])
+        self.assertEqual([item['status'] for item in response.data['responses']], [200, 200])
+
+    def test_conditional_and_errors(self):
+        """Test per item headers and per item failures"""
+        etag = self.client.get(task_detail_url(self.task.id))['ETag']
+        response = self.batch([
+            {'path': task_detail_url(self.task.id), 'headers': {'If-None-Match': etag}},
+            {'path': task_detail_url(self.task.id + 1)},
+            {'method': 'PATCH', 'path': task_detail_url(self.task.id), 'body': {'status': 'done'}},
+        ])
+        self.assertEqual([item['status'] for item in response.data['responses']], [304, 404, 400])
+        self.assertTrue(response.data['committed'])
+
+    def test_atomic_rollback(self):
+        """Test that an atomic batch is rolled back at the first failure"""
+        response = self.batch([
+            {'method': 'PATCH', 'path': task_detail_url(self.task.id), 'body': {'title': 'Renamed'}},
+            {'method': 'POST', 'path': TASK_URL, 'body': {'title': 'New', 'due_date': '2030-01-01', 'status': 'done'}},
+            {'path': USER_URL},
+        ], atomic=True)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertFalse(response.data['committed'])
+        self.assertEqual([item['status'] for item in response.data['responses']], [200, 400])
+        self.task.refresh_from_db()
+        self.assertEqual(self.task.title, 'Task')
+
+    @override_settings(TASK_BATCH_MAX_REQUESTS=2)
+    def test_invalid_batches(self):
+        """Test the size cap, unknown routes and reserved headers"""
+        for requests in (
+            [{'path': USER_URL}] * 3,
+            [],
+            [{'path': '/api/v1/nowhere/'}],
+            [{'path': BATCH_URL}],
+            [{'path': reverse('task:token')}],
+            [{'path': reverse('task:task_list')}],
+            [{'path': USER_URL, 'headers': {'Authorization': 'Token other'}}],
+        ):
+            with self.subTest(requests=requests):
+                self.assertEqual(self.batch(requests).status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_unauthenticated(self):
+        """Test that the batch needs credentials"""
+        response = APIClient().post(BATCH_URL, {'requests': [{'path': USER_URL}]}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
@@ -0,0 +1,97 @@
+from datetime import date, timedelta
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from task.models import TaskModel, TaskTombstone
+
+BULK_URL = reverse('task:task-bulk')
+
+def createUser(email='example@gmail.com', password='test@123'):
+    return get_user_model().objects.create_user(email=email, password=password)
+
+def taskPayload(i):
+    return {
+        'title': f'Task {i}',
+        'description': 'Imported task',
+        'status': 'pending',
+        'due_date': (date.today() + timedelta(days=i % 10)).isoformat(),
+    }
+
+
+class TaskBulkAPITest(TestCase):
+    """Test the bulk task endpoint"""
+    def setUp(self):
+        self.user = createUser()
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def createTask(self, user=None, i=0):
+        return TaskModel.objects.create(user=user or self.user, task_id=900 + i, **taskPayload(i))
+
+    def test_bulk_create_is_constant_queries(self):
+        """Test that a large create costs a handful of queries"""
+        payload = {'create': [taskPayload(i) for i in range(200)]}
+        # Savepoints, the batched INSERT, the late updated_at stamp and one
+        # upsert of the TaskStat counters
+        with self.assertNumQueries(6):
+            response = self.client.post(BULK_URL, payload, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data['create']), 200)
+        self.assertEqual(TaskModel.objects.filter(user=self.user).count(), 200)
+        self.assertEqual(len(set(TaskModel.objects.values_list('task_id', flat=True))), 200)
+
+    def test_bulk_update_and_delete(self):
+        """Test mixed update and delete in one call"""
+        keep = self.createTask(i=1)
+        drop = self.createTask(i=2)
+        payload = {
+            'update': [{'id': keep.id, 'status': 'completed', 'title': 'Renamed'}],
+            'delete': [drop.id],
+        }
+        response = self.client.post(BULK_URL, payload, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        keep.refresh_from_db()
+        self.assertEqual(keep.status, 'completed')
+        self.assertEqual(keep.title, 'Renamed')
+        self.assertFalse(TaskModel.objects.filter(id=drop.id).exists())
+        self.assertEqual(response.data['delete'], [{'id': drop.id, 'deleted': True}])
+
+    def test_invalid_item_rolls_back_everything(self):
+        """Test that one bad item rejects the batch with per item errors"""
+        other = self.createTask(user=createUser(email='other@gmail.com'), i=3)
+        bad = dict(taskPayload(1), status='unknown')
+        payload = {
+            'create': [taskPayload(0), bad],
+            'delete': [other.id],
+        }
+        response = self.client.post(BULK_URL, payload, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data['create'][0], {})
+        self.assertIn('status', response.data['create'][1])
+        self.assertIn('id', response.data['delete'][0])
+        self.assertEqual(TaskModel.objects.count(), 1)
+
+    def test_rows_are_stamped_together_after_the_writes(self):
+        """Test that created and updated rows get one updated_at, and late commits are logged"""
+        keep = self.createTask(i=1)
+        drop = self.createTask(i=2)
+        payload = {'create': [taskPayload(3), taskPayload(4)], 'update': [{'id': keep.id}], 'delete': [drop.id]}
+        with self.settings(TASK_SYNC_LAG_SECONDS=0), self.assertLogs('task.sync', 'WARNING') as logs, \
+                self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(BULK_URL, payload, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        stamps = set(TaskModel.objects.filter(user=self.user).values_list('updated_at', flat=True))
+        self.assertEqual(len(stamps), 1)
+        self.assertGreaterEqual(TaskTombstone.objects.get(task_pk=drop.id).deleted_at, stamps.pop())
+        self.assertEqual(len(logs.records), 2)
+
+    def test_batch_size_limit(self):
+        """Test that oversized batches are rejected"""
+        with self.settings(TASK_BULK_MAX_ITEMS=2):
+            response = self.client.post(BULK_URL, {'delete': [1, 2, 3]}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
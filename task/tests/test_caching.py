@@ -0,0 +1,115 @@
+from datetime import date
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+
+from rest_framework.test import APIClient
+
+from task.caching import cache_stats
+from task.models import TaskModel
+
+TASK_URL = reverse('task:task-list')
+TASK_LIST_PAGE = reverse('task:task_list')
+BULK_URL = reverse('task:task-bulk')
+
+def createUser(email='example@gmail.com', password='test@123', **extra):
+    return get_user_model().objects.create_user(email=email, password=password, **extra)
+
+def createTask(user, i=0, **extra):
+    data = dict(
+        user=user, task_id=1000 + i, title=f'Task {i}', description='Description',
+        due_date=date(2099, 1, 1), status='pending',
+    )
+    data.update(extra)
+    return TaskModel.objects.create(**data)
+
+
+class TaskListCacheTest(TestCase):
+    """Test the per user task list cache"""
+    def setUp(self):
+        cache.clear()
+        self.user = createUser()
+        self.task = createTask(self.user)
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def test_second_list_is_served_from_cache(self):
+        """Test that a repeated poll runs no queries"""
+        before = cache_stats()
+        first = self.client.get(TASK_URL)
+        with self.assertNumQueries(0):
+            second = self.client.get(TASK_URL)
+        self.assertEqual(first.data, second.data)
+        after = cache_stats()
+        self.assertEqual(after['hits'] - before['hits'], 1)
+        self.assertEqual(after['misses'] - before['misses'], 1)
+
+    def test_query_params_are_part_of_the_key(self):
+        """Test that different pages are cached separately"""
+        createTask(self.user, i=1)
+        self.client.get(TASK_URL)
+        response = self.client.get(TASK_URL, {'page_size': 1})
+        self.assertEqual(len(response.data['results']), 1)
+
+    def test_save_and_delete_invalidate(self):
+        """Test that model writes bump the version"""
+        self.client.get(TASK_URL)
+        self.task.title = 'Renamed'
+        self.task.save()
+        response = self.client.get(TASK_URL)
+        self.assertEqual(response.data['results'][0]['title'], 'Renamed')
+        self.task.delete()
+        response = self.client.get(TASK_URL)
+        self.assertEqual(response.data['results'], [])
+
+    def test_complete_and_bulk_invalidate(self):
+        """Test that the complete and bulk endpoints invalidate"""
+        self.client.get(TASK_URL)
+        self.client.patch(reverse('task:completed', args=[self.task.id]))
+        response = self.client.get(TASK_URL)
+        self.assertEqual(response.data['results'][0]['status'], 'completed')
+        self.client.post(BULK_URL, {'delete': [self.task.id]}, format='json')
+        response = self.client.get(TASK_URL)
+        self.assertEqual(response.data['results'], [])
+
+    def test_other_users_keep_their_cache(self):
+        """Test that a write only invalidates the owner and admins"""
+        other = createUser(email='other@gmail.com')
+        other_client = APIClient()
+        other_client.force_authenticate(user=other)
+        other_client.get(TASK_URL)
+        self.task.save()
+        with self.assertNumQueries(0):
+            other_client.get(TASK_URL)
+
+    def test_admin_list_follows_every_write(self):
+        """Test that the all tasks list of an admin is invalidated by any user"""
+        admin = createUser(email='admin@gmail.com', is_superuser=True)
+        admin_client = APIClient()
+        admin_client.force_authenticate(user=admin)
+        admin_client.get(TASK_URL)
+        createTask(self.user, i=2)
+        response = admin_client.get(TASK_URL)
+        self.assertEqual(len(response.data['results']), 2)
+
+    def test_admins_do_not_share_api_lists(self):
+        """Test that a non superuser admin only gets their own cached tasks"""
+        first, second = (createUser(email=f'admin{i}@gmail.com', is_admin=True) for i in (1, 2))
+        createTask(first, i=4, title='Private')
+        first_client, second_client = APIClient(), APIClient()
+        first_client.force_authenticate(user=first)
+        second_client.force_authenticate(user=second)
+        self.assertEqual(len(first_client.get(TASK_URL).data['results']), 1)
+        self.assertEqual(second_client.get(TASK_URL).data['results'], [])
+
+    def test_html_list_is_cached(self):
+        """Test that the html list caches its page and invalidates on write"""
+        self.client.force_login(self.user)
+        self.client.get(TASK_LIST_PAGE)
+        response = self.client.get(TASK_LIST_PAGE)
+        self.assertEqual(list(response.context['task_list']), [self.task])
+        createTask(self.user, i=3)
+        response = self.client.get(TASK_LIST_PAGE)
+        self.assertEqual(len(response.context['task_list']), 2)
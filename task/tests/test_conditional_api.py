@@ -0,0 +1,99 @@
+import time
+from datetime import date
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from django.utils.http import http_date
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from task.caching import list_cache_key
+from task.conditional import list_validators
+from task.models import TaskModel
+from task.serializers import TaskSerializer
+
+TASK_URL = reverse('task:task-list')
+
+def task_detail_url(id):
+    return reverse('task:task-detail', args=[id])
+
+def createUser(email='example@gmail.com', password='test@123'):
+    return get_user_model().objects.create_user(email=email, password=password)
+
+
+class ConditionalGetTest(TestCase):
+    """Test ETag and Last-Modified handling of the task API"""
+    def setUp(self):
+        cache.clear()
+        self.user = createUser()
+        self.task = TaskModel.objects.create(
+            user=self.user, task_id=1, title='Task', description='Description',
+            due_date=date(2099, 1, 1), status='pending',
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def test_list_not_modified(self):
+        """Test that a matching If-None-Match gets a 304 without serializing"""
+        response = self.client.get(TASK_URL)
+        self.assertIn('ETag', response)
+        with self.assertNumQueries(0):
+            cached = self.client.get(TASK_URL, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(cached.status_code, status.HTTP_304_NOT_MODIFIED)
+        cache.delete(list_cache_key(self.user, 'api', 'http://testserver' + TASK_URL))
+        with mock.patch.object(TaskSerializer, 'to_representation') as to_representation:
+            with self.assertNumQueries(1):
+                again = self.client.get(TASK_URL, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(again.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(again.content, b'')
+        to_representation.assert_not_called()
+
+    def test_list_etag_changes_on_write(self):
+        """Test that an update, create or delete changes the list ETag"""
+        etag = self.client.get(TASK_URL)['ETag']
+        self.task.title = 'Renamed'
+        self.task.save()
+        response = self.client.get(TASK_URL, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_list_has_no_last_modified(self):
+        """Test that a delete within the same second cannot get a stale 304 by date"""
+        response = self.client.get(TASK_URL)
+        self.assertNotIn('Last-Modified', response)
+        since = http_date(time.time() + 60)
+        self.task.delete()
+        response = self.client.get(TASK_URL, HTTP_IF_MODIFIED_SINCE=since)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['results'], [])
+
+    def test_bad_query_is_checked_before_the_etag(self):
+        """Test that an invalid filter is a 400 even with a matching If-None-Match"""
+        query = {'status': 'nonsense'}
+        etag = list_validators(TaskModel.objects.filter(user=self.user), self.user,
+                               'http://testserver' + TASK_URL + '?status=nonsense')[0]
+        response = self.client.get(TASK_URL, query, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_list_etag_depends_on_query(self):
+        """Test that different pages have different ETags"""
+        first = self.client.get(TASK_URL)['ETag']
+        other = self.client.get(TASK_URL, {'page_size': 1})['ETag']
+        self.assertNotEqual(first, other)
+
+    def test_detail_not_modified(self):
+        """Test If-None-Match and If-Modified-Since on the detail"""
+        url = task_detail_url(self.task.id)
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        again = self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(again.status_code, status.HTTP_304_NOT_MODIFIED)
+        since = self.client.get(url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified'])
+        self.assertEqual(since.status_code, status.HTTP_304_NOT_MODIFIED)
+        older = http_date(self.task.updated_at.timestamp() - 60)
+        stale = self.client.get(url, HTTP_IF_MODIFIED_SINCE=older)
+        self.assertEqual(stale.status_code, status.HTTP_200_OK)
@@ -0,0 +1,34 @@
+import os
+import tempfile
+
+from django.db import connection, connections
+from django.test import TestCase, override_settings
+
+
+class SQLiteProfileTest(TestCase):
+    """Test the SQLite connection tuning"""
+    def pragma(self, conn, name):
+        with conn.cursor() as cursor:
+            cursor.execute(f'PRAGMA {name}')
+            return cursor.fetchone()[0]
+
+    def test_pragmas_on_new_connections(self):
+        """Test that a new file database connection gets WAL and the PRAGMAs"""
+        path = os.path.join(tempfile.mkdtemp(), 'profile.sqlite3')
+        conn = connections.create_connection('default')
+        conn.settings_dict = {**conn.settings_dict, 'NAME': path}
+        self.addCleanup(conn.close)
+        self.assertEqual(self.pragma(conn, 'journal_mode'), 'wal')
+        self.assertEqual(self.pragma(conn, 'synchronous'), 1)
+        self.assertEqual(self.pragma(conn, 'cache_size'), -64000)
+        self.assertEqual(self.pragma(conn, 'busy_timeout'), 20000)
+
+    @override_settings(TASK_SQLITE_PRAGMAS={'cache_size': -1000})
+    def test_setting(self):
+        """Test that the PRAGMAs come from TASK_SQLITE_PRAGMAS"""
+        conn = connections.create_connection('default')
+        self.addCleanup(conn.close)
+        conn.settings_dict = {**conn.settings_dict, 'NAME': os.path.join(tempfile.mkdtemp(), 'other.sqlite3')}
+        self.assertEqual(self.pragma(conn, 'cache_size'), -1000)
+        self.assertEqual(self.pragma(conn, 'journal_mode'), 'delete')
+        self.assertEqual(connection.settings_dict['OPTIONS']['transaction_mode'], 'IMMEDIATE')
@@ -0,0 +1,142 @@
+import asyncio
+import json
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from task.events import OVERFLOW, RESET_FRAME, Hub, hub, render
+
+EVENTS_URL = reverse('task:events')
+TASK_URL = reverse('task:task-list')
+
+def createUser(email='example@gmail.com', password='test@123'):
+    return get_user_model().objects.create_user(email=email, password=password)
+
+def parse(frame):
+    kind, data = frame.decode().strip().split('\n')
+    return kind.removeprefix('event: '), json.loads(data.removeprefix('data: '))
+
+
+class HubTest(TestCase):
+    """Test the in-process pub/sub hub"""
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+        self.addCleanup(self.loop.close)
+        self.hub = Hub()
+
+    def subscribe(self, scope, maxsize=10):
+        async def subscribe():
+            return self.hub.subscribe(scope, maxsize)
+        return self.loop.run_until_complete(subscribe())
+
+    def drain(self, subscription):
+        async def drain():
+            await asyncio.sleep(0)
+            frames = []
+            while not subscription.queue.empty():
+                frames.append(subscription.queue.get_nowait())
+            return frames
+        return self.loop.run_until_complete(drain())
+
+    def test_dispatch_by_scope(self):
+        """Test that users only get their own events and '*' gets all"""
+        mine, other, admin = self.subscribe(1), self.subscribe(2), self.subscribe('*')
+        self.hub.dispatch(1, b'a')
+        self.assertEqual(self.drain(mine), [b'a'])
+        self.assertEqual(self.drain(other), [])
+        self.assertEqual(self.drain(admin), [b'a'])
+        for subscription in (mine, other, admin):
+            self.hub.unsubscribe(subscription)
+        self.assertEqual(len(self.hub), 0)
+
+    def test_slow_subscriber_overflows(self):
+        """Test that a full queue never blocks and ends in OVERFLOW"""
+        slow = self.subscribe(1, maxsize=2)
+        for i in range(5):
+            self.hub.dispatch(1, b'%d' % i)
+        self.assertEqual(self.drain(slow), [OVERFLOW])
+
+
+class TaskEventsPublishTest(TestCase):
+    """Test that task writes publish events after commit"""
+    def setUp(self):
+        self.user = createUser()
+        self.api = APIClient()
+        self.api.force_authenticate(user=self.user)
+        self.loop = asyncio.new_event_loop()
+        self.addCleanup(self.loop.close)
+
+        async def subscribe():
+            return hub.subscribe(self.user.pk)
+        self.subscription = self.loop.run_until_complete(subscribe())
+        self.addCleanup(hub.unsubscribe, self.subscription)
+
+    def received(self):
+        async def drain():
+            await asyncio.sleep(0)
+            frames = []
+            while not self.subscription.queue.empty():
+                frames.append(parse(self.subscription.queue.get_nowait()))
+            return frames
+        return self.loop.run_until_complete(drain())
+
+    def test_create_update_complete_delete(self):
+        """Test the event kinds of a task's life"""
+        with self.captureOnCommitCallbacks(execute=True):
+            task_id = self.api.post(TASK_URL, {
+                'title': 'Task', 'description': 'D', 'status': 'pending', 'due_date': '2099-12-25',
+            }, format='json').data['id']
+        with self.captureOnCommitCallbacks(execute=True):
+            self.api.patch(reverse('task:task-detail', args=[task_id]), {'title': 'Renamed'}, format='json')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.api.patch(reverse('task:completed', args=[task_id]))
+        with self.captureOnCommitCallbacks(execute=True):
+            self.api.delete(reverse('task:task-detail', args=[task_id]))
+        frames = self.received()
+        self.assertEqual([kind for kind, _ in frames], ['created', 'updated', 'completed', 'deleted'])
+        self.assertEqual(frames[1][1]['title'], 'Renamed')
+        self.assertEqual(frames[3][1]['id'], task_id)
+
+    def test_nothing_before_commit(self):
+        """Test that rolled back writes publish nothing"""
+        with self.captureOnCommitCallbacks(execute=False):
+            self.api.post(TASK_URL, {
+                'title': 'Task', 'description': 'D', 'status': 'pending', 'due_date': '2099-12-25',
+            }, format='json')
+        self.assertEqual(self.received(), [])
+
+
+@override_settings(TASK_EVENTS_KEEPALIVE_SECONDS=0.05)
+class TaskEventsStreamTest(TestCase):
+    """Test the SSE endpoint"""
+    async def test_stream(self):
+        """Test keepalives, events and the reset of an overflowing stream"""
+        user = await sync_to_async(createUser)()
+        token = await Token.objects.acreate(user=user)
+        response = await self.async_client.get(EVENTS_URL, headers={'Authorization': f'Token {token.key}'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        stream = aiter(response.streaming_content)
+        self.assertEqual(await anext(stream), b'retry: 3000\n\n')
+        self.assertEqual(await anext(stream), b': keepalive\n\n')
+        hub.dispatch(user.pk, render('updated', {'id': 1}))
+        self.assertEqual(parse(await anext(stream)), ('updated', {'id': 1}))
+        for _ in range(200):
+            hub.dispatch(user.pk, render('updated', {'id': 1}))
+        await asyncio.sleep(0)
+        self.assertEqual(await anext(stream), RESET_FRAME)
+        with self.assertRaises(StopAsyncIteration):
+            await anext(stream)
+        self.assertFalse(hub.has_subscribers(user.pk))
+
+    async def test_requires_authentication(self):
+        """Test that anonymous and bad token requests are refused"""
+        response = await self.async_client.get(EVENTS_URL)
+        self.assertEqual(response.status_code, 401)
+        response = await self.async_client.get(EVENTS_URL, headers={'Authorization': 'Token nope'})
+        self.assertEqual(response.status_code, 401)
@@ -0,0 +1,86 @@
+import csv
+import io
+import json
+from datetime import date, timedelta
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from task.models import TaskModel
+
+EXPORT_URL = reverse('task:task-export')
+
+def createUser(email='example@gmail.com', password='test@123'):
+    return get_user_model().objects.create_user(email=email, password=password)
+
+
+class TaskExportAPITest(TestCase):
+    """Test the streaming task export"""
+    def setUp(self):
+        self.user = createUser()
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        today = date.today()
+        statuses = ['pending', 'in_progress', 'completed']
+        TaskModel.objects.bulk_create([
+            TaskModel(
+                user=self.user,
+                task_id=i + 1,
+                title=f'Task {i}',
+                description='Line one\nLine "two"',
+                due_date=today + timedelta(days=i),
+                status=statuses[i % 3],
+            )
+            for i in range(9)
+        ])
+        TaskModel.objects.create(
+            user=createUser(email='other@gmail.com'), task_id=100,
+            title='Other', description='', due_date=today, status='pending',
+        )
+
+    def read(self, response):
+        return b''.join(response.streaming_content).decode()
+
+    def test_ndjson_export(self):
+        """Test that ndjson has one object per task of the user"""
+        response = self.client.get(EXPORT_URL)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.streaming)
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        rows = [json.loads(line) for line in self.read(response).splitlines()]
+        self.assertEqual(len(rows), 9)
+        self.assertEqual({row['user'] for row in rows}, {self.user.id})
+        self.assertEqual(rows[0]['due_date'], date.today().isoformat())
+
+    def test_csv_export_with_filters(self):
+        """Test csv output with status and due date range filters"""
+        today = date.today()
+        response = self.client.get(EXPORT_URL, {
+            'file_format': 'csv',
+            'status': 'pending',
+            'due_after': today.isoformat(),
+            'due_before': (today + timedelta(days=5)).isoformat(),
+        })
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        rows = list(csv.DictReader(io.StringIO(self.read(response))))
+        self.assertEqual([row['title'] for row in rows], ['Task 0', 'Task 3'])
+        self.assertEqual(rows[0]['description'], 'Line one\nLine "two"')
+
+    def test_export_streams_in_chunks(self):
+        """Test that rows are read through a chunked iterator"""
+        with self.settings(TASK_EXPORT_CHUNK_SIZE=2):
+            response = self.client.get(EXPORT_URL)
+            with self.assertNumQueries(1):
+                lines = self.read(response).splitlines()
+        self.assertEqual(len(lines), 9)
+
+    def test_invalid_filters(self):
+        """Test that bad filters are rejected"""
+        response = self.client.get(EXPORT_URL, {'status': 'done'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.client.get(EXPORT_URL, {'due_after': '2030-01-02', 'due_before': '2030-01-01'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
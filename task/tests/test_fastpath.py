@@ -0,0 +1,59 @@
+from datetime import date, datetime, timedelta, timezone as dt_timezone
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from rest_framework import serializers
+from rest_framework.test import APIClient
+
+from task.fastpath import RowEncoder
+from task.models import TaskModel
+from task.serializers import TaskSerializer
+
+TASK_URL = reverse('task:task-list')
+
+def createUser(email='example@gmail.com', password='test@123'):
+    return get_user_model().objects.create_user(email=email, password=password)
+
+
+class RowEncoderTest(TestCase):
+    """Test that the row encoder renders what TaskSerializer renders"""
+    def setUp(self):
+        self.user = createUser()
+        for i in range(5):
+            TaskModel.objects.create(user=self.user, task_id=i + 1, title=f'Tâche {i}', description='D\n"x"',
+                                     due_date=date.today() + timedelta(days=i), status='pending')
+        # Whole seconds, to cover isoformat without microseconds.
+        TaskModel.objects.filter(task_id=1).update(created_at=datetime(2030, 1, 1, tzinfo=dt_timezone.utc))
+
+    def assertMatchesSerializer(self):
+        queryset = TaskModel.objects.order_by('id')
+        encoder = RowEncoder()
+        self.assertEqual(encoder.encode(encoder.values(queryset)), TaskSerializer(queryset, many=True).data)
+
+    def test_matches_serializer(self):
+        """Test the project timezone, UTC and an activated timezone"""
+        self.assertMatchesSerializer()
+        with override_settings(TIME_ZONE='UTC'):
+            self.assertMatchesSerializer()
+            self.assertTrue(RowEncoder()(RowEncoder().values(TaskModel.objects).first())['created_at'].endswith('Z'))
+        with timezone.override('America/New_York'):
+            self.assertMatchesSerializer()
+
+    def test_custom_formats_fall_back(self):
+        """Test fields with a custom format use their own to_representation"""
+        class Serializer(TaskSerializer):
+            due_date = serializers.DateField(format='%d/%m/%Y')
+
+        row = RowEncoder(Serializer).values(TaskModel.objects.order_by('id')).first()
+        self.assertEqual(RowEncoder(Serializer)(row)['due_date'], date.today().strftime('%d/%m/%Y'))
+
+    def test_list_response(self):
+        """Test that the list API still returns the serializer output"""
+        client = APIClient()
+        client.force_authenticate(user=self.user)
+        response = client.get(TASK_URL)
+        self.assertEqual(response.json()['results'],
+                         TaskSerializer(TaskModel.objects.order_by('due_date', 'id'), many=True).data)
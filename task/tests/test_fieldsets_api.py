@@ -0,0 +1,95 @@
+from datetime import date, timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from task.models import TaskModel
+
+TASK_URL = reverse('task:task-list')
+ASYNC_TASK_URL = reverse('task:async_task_list')
+
+def detail_url(id):
+    return reverse('task:task-detail', args=[id])
+
+def createUser(email='example@gmail.com', password='test@123'):
+    return get_user_model().objects.create_user(email=email, password=password)
+
+
+@override_settings(TASK_PAGE_SIZE=2)
+class SparseFieldsetsTest(TestCase):
+    """Test ?fields= and ?exclude= on the task list and detail"""
+    def setUp(self):
+        cache.clear()
+        self.user = createUser()
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.tasks = [
+            TaskModel.objects.create(user=self.user, task_id=i + 1, title=f'Task {i}', description='Long ' * 100,
+                                     due_date=date.today() + timedelta(days=i), status='pending')
+            for i in range(3)
+        ]
+
+    def selects_description(self, queries):
+        return any('"description"' in query['sql'] for query in queries.captured_queries)
+
+    def test_list_fields(self):
+        """Test that only the asked for fields are read and returned"""
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(TASK_URL, {'fields': 'id,title,status,due_date'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        data = response.json()
+        self.assertEqual([list(task) for task in data['results']], [['id', 'title', 'due_date', 'status']] * 2)
+        self.assertFalse(self.selects_description(queries))
+
+        response = self.client.get(data['next'])
+        self.assertEqual(response.json()['results'], [{
+            'id': self.tasks[2].id, 'title': 'Task 2',
+            'due_date': self.tasks[2].due_date.isoformat(), 'status': 'pending',
+        }])
+
+    def test_list_exclude(self):
+        """Test that excluded fields are left out, also combined with fields"""
+        response = self.client.get(TASK_URL, {'exclude': 'description'})
+        self.assertNotIn('description', response.json()['results'][0])
+        self.assertIn('created_at', response.json()['results'][0])
+        response = self.client.get(TASK_URL, {'fields': 'id,title', 'exclude': 'title'})
+        self.assertEqual(list(response.json()['results'][0]), ['id'])
+
+    def test_invalid_selection(self):
+        """Test unknown fields and empty selections"""
+        response = self.client.get(TASK_URL, {'fields': 'id,secret'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.json(), {'fields': ['Unknown field: secret.']})
+        response = self.client.get(detail_url(self.tasks[0].id), {'exclude': 'nope'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.client.get(TASK_URL, {'fields': 'id', 'exclude': 'id'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_detail_fields(self):
+        """Test the detail selection, its query and its own ETag"""
+        task = self.tasks[0]
+        full = self.client.get(detail_url(task.id))
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(detail_url(task.id), {'fields': 'title,status'})
+        self.assertEqual(response.json(), {'title': 'Task 0', 'status': 'pending'})
+        self.assertFalse(self.selects_description(queries))
+        self.assertNotEqual(response['ETag'], full['ETag'])
+
+        response = self.client.get(detail_url(task.id), {'fields': 'title,status'}, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        response = self.client.get(detail_url(task.id), {'fields': 'title'}, HTTP_IF_NONE_MATCH=full['ETag'])
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_async_list_fields(self):
+        """Test that the async list accepts the same selection"""
+        expected = self.client.get(TASK_URL, {'fields': 'id,title'}).json()
+        self.client.force_login(self.user)
+        response = self.client.get(ASYNC_TASK_URL, {'fields': 'id,title'})
+        self.assertEqual(response.json()['results'], expected['results'])
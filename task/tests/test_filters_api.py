@@ -0,0 +1,84 @@
+from datetime import date, timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from task.models import TaskModel
+
+TASK_URL = reverse('task:task-list')
+
+def createUser(email='example@gmail.com', password='test@123', **extra):
+    return get_user_model().objects.create_user(email=email, password=password, **extra)
+
+
+@override_settings(TASK_PAGE_SIZE=2)
+class TaskListFilterTest(TestCase):
+    """Test filtering and ordering the task list"""
+    def setUp(self):
+        cache.clear()
+        self.user = createUser()
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.today = date.today()
+        statuses = ['pending', 'completed', 'pending', 'in_progress', 'pending']
+        self.tasks = [
+            TaskModel.objects.create(user=self.user, task_id=i + 1, title=f'Task {i}', description='D',
+                                     due_date=self.today + timedelta(days=i), status=task_status)
+            for i, task_status in enumerate(statuses)
+        ]
+
+    def ids(self, params):
+        ids, url = [], TASK_URL
+        while url:
+            response = self.client.get(url, params if url == TASK_URL else None)
+            self.assertEqual(response.status_code, status.HTTP_200_OK, response.data)
+            ids += [task['id'] for task in response.data['results']]
+            url = response.data['next']
+        return ids
+
+    def test_status_and_due_range(self):
+        """Test my pending tasks due before a date, in due date order"""
+        params = {'status': 'pending', 'due_before': self.today + timedelta(days=3)}
+        self.assertEqual(self.ids(params), [self.tasks[0].id, self.tasks[2].id])
+        params['ordering'] = '-due_date'
+        self.assertEqual(self.ids(params), [self.tasks[2].id, self.tasks[0].id])
+
+    def test_timestamp_ranges(self):
+        """Test created and updated ranges, ordered by their column across pages"""
+        past = timezone.now() - timedelta(days=2)
+        TaskModel.objects.filter(pk=self.tasks[4].pk).update(created_at=past, updated_at=past)
+        ids = self.ids({'created_after': (past + timedelta(days=1)).isoformat()})
+        self.assertEqual(sorted(ids), sorted(task.id for task in self.tasks[:4]))
+        ids = self.ids({'updated_before': (past + timedelta(days=1)).isoformat()})
+        self.assertEqual(ids, [self.tasks[4].id])
+        ids = self.ids({'ordering': '-created_at'})
+        self.assertEqual(ids[-1], self.tasks[4].id)
+        self.assertEqual(len(ids), 5)
+
+    def test_unsupported_combinations(self):
+        """Test that combinations without an index are refused"""
+        for params in (
+            {'status': 'pending', 'ordering': 'created_at'},
+            {'due_before': self.today, 'ordering': 'updated_at'},
+            {'due_before': self.today, 'updated_after': timezone.now().isoformat()},
+            {'due_after': self.today, 'due_before': self.today - timedelta(days=1)},
+            {'ordering': 'title'},
+            {'status': 'done'},
+        ):
+            with self.subTest(params=params):
+                response = self.client.get(TASK_URL, params)
+                self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_admin_scope(self):
+        """Test that admins only get the combinations with a global index"""
+        self.client.force_authenticate(user=createUser(email='admin@gmail.com', is_superuser=True))
+        self.assertEqual(len(self.ids({'due_after': self.today})), 5)
+        response = self.client.get(TASK_URL, {'status': 'pending'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('every user', str(response.data))
@@ -0,0 +1,125 @@
+import json
+import tempfile
+from datetime import date, timedelta
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from task.models import TaskModel
+
+IMPORT_URL = reverse('task:task-import-file')
+
+def createUser(email='example@gmail.com', password='test@123'):
+    return get_user_model().objects.create_user(email=email, password=password)
+
+def ndjson(rows):
+    return ''.join(json.dumps(row) + '\n' for row in rows).encode()
+
+def taskRow(i, **extra):
+    row = {
+        'title': f'Task {i}',
+        'description': 'Imported',
+        'status': 'pending',
+        'due_date': (date.today() + timedelta(days=1)).isoformat(),
+    }
+    row.update(extra)
+    return row
+
+
+class TaskImportAPITest(TestCase):
+    """Test the task import endpoint"""
+    def setUp(self):
+        self.user = createUser()
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def upload(self, name, content, **data):
+        data['file'] = SimpleUploadedFile(name, content)
+        return self.client.post(IMPORT_URL, data, format='multipart')
+
+    def test_import_ndjson_in_chunks(self):
+        """Test that every chunk is written with one insert"""
+        content = ndjson(taskRow(i) for i in range(25))
+        with self.settings(TASK_IMPORT_CHUNK_SIZE=10):
+            response = self.upload('tasks.ndjson', content)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['created'], 25)
+        self.assertEqual(response.data['chunks'], 3)
+        self.assertEqual(TaskModel.objects.filter(user=self.user).count(), 25)
+
+    def test_import_csv_reports_bad_rows(self):
+        """Test that invalid rows are skipped and reported"""
+        due = (date.today() + timedelta(days=1)).isoformat()
+        content = (
+            'title,description,status,due_date\n'
+            f'Good,Fine,pending,{due}\n'
+            f'Bad,Wrong status,done,{due}\n'
+            'Old,Past,pending,2000-01-01\n'
+        ).encode()
+        response = self.upload('tasks.csv', content)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['created'], 1)
+        self.assertEqual(response.data['failed'], 2)
+        self.assertEqual([error['row'] for error in response.data['errors']], [3, 4])
+        self.assertIn('status', response.data['errors'][0]['errors'])
+        self.assertIn('due_date', response.data['errors'][1]['errors'])
+
+    def test_import_latin1_csv(self):
+        """Test that a file that is not UTF-8 is reported, not a server error"""
+        due = (date.today() + timedelta(days=1)).isoformat()
+        content = (
+            'title,description,status,due_date\n'
+            f'Good,Fine,pending,{due}\n'
+            f'Caf\xe9,R\xe9sum\xe9,pending,{due}\n'
+        ).encode('latin-1')
+        with self.settings(TASK_IMPORT_CHUNK_SIZE=1):
+            response = self.upload('tasks.csv', content)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['created'], 1)
+        self.assertEqual(response.data['errors'][0]['row'], 3)
+        self.assertIn('Unreadable CSV', response.data['errors'][0]['errors']['non_field_errors'][0])
+
+        response = self.upload('tasks.csv', 'title,description\n\xe9,x\n'.encode('latin-1'))
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_import_ndjson_bad_encoding_line(self):
+        """Test that a line that is not UTF-8 is skipped by line number"""
+        content = ndjson([taskRow(0)]) + '{"title": "Caf\xe9"}\n'.encode('latin-1') + ndjson([taskRow(2)])
+        response = self.upload('tasks.ndjson', content)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['created'], 2)
+        self.assertEqual([error['row'] for error in response.data['errors']], [2])
+
+    def test_import_invalid_json_line(self):
+        """Test that malformed lines are reported by line number"""
+        content = ndjson([taskRow(0)]) + b'{not json\n'
+        response = self.upload('tasks.ndjson', content)
+        self.assertEqual(response.data['created'], 1)
+        self.assertEqual(response.data['errors'][0]['row'], 2)
+
+    def test_import_requires_file(self):
+        """Test that a missing file is rejected"""
+        response = self.client.post(IMPORT_URL, {}, format='multipart')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class ImportTasksCommandTest(TestCase):
+    """Test the import_tasks management command"""
+    def test_command_imports_file(self):
+        """Test importing a file from disk"""
+        user = createUser()
+        with tempfile.NamedTemporaryFile(suffix='.ndjson') as handle:
+            handle.write(ndjson(taskRow(i) for i in range(5)))
+            handle.flush()
+            out = StringIO()
+            call_command('import_tasks', handle.name, user=user.email, chunk_size=2, stdout=out, stderr=StringIO())
+        self.assertEqual(TaskModel.objects.filter(user=user).count(), 5)
+        self.assertIn('rows 4: created 4', out.getvalue())
+        self.assertIn('Imported 5 of 5 rows', out.getvalue())
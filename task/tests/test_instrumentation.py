@@ -0,0 +1,108 @@
+from datetime import date
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from task.instrumentation import route_stats
+from task.models import TaskModel
+from task.tests.helpers import QueryBudgetMixin
+
+TASK_URL = reverse('task:task-list')
+METRICS_URL = reverse('task:metrics')
+
+def task_detail_url(id):
+    return reverse('task:task-detail', args=[id])
+
+def createUser(email='example@gmail.com', password='test@123', **extra):
+    return get_user_model().objects.create_user(email=email, password=password, **extra)
+
+def createTask(user, i=0):
+    return TaskModel.objects.create(
+        user=user, task_id=500 + i, title=f'Task {i}', description='Description',
+        due_date=date(2099, 1, 1), status='pending',
+    )
+
+
+@override_settings(TASK_REQUEST_METRICS=True)
+class RequestMetricsMiddlewareTest(TestCase):
+    """Test the request metrics middleware"""
+    def setUp(self):
+        cache.clear()
+        route_stats.reset()
+        self.user = createUser()
+        createTask(self.user)
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def test_server_timing_header(self):
+        """Test that timings and the query count are reported"""
+        response = self.client.get(TASK_URL)
+        timing = response['Server-Timing']
+        self.assertIn('db;dur=', timing)
+        self.assertIn('desc="2 queries"', timing)
+        self.assertIn('serializer;dur=', timing)
+        self.assertIn('total;dur=', timing)
+
+    def test_route_stats(self):
+        """Test that requests are aggregated per route"""
+        self.client.get(TASK_URL)
+        self.client.get(TASK_URL)
+        admin = createUser(email='admin@gmail.com', is_staff=True)
+        self.client.force_authenticate(user=admin)
+        response = self.client.get(METRICS_URL)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        stats = response.data['GET api/v1/task/$']
+        self.assertEqual(stats['requests'], 2)
+        self.assertEqual(stats['queries'], 2)
+
+    def test_metrics_requires_staff(self):
+        """Test that the stats are not public"""
+        response = self.client.get(METRICS_URL)
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    @override_settings(TASK_REQUEST_METRICS=False)
+    def test_disabled(self):
+        """Test that nothing is added when the flag is off"""
+        response = self.client.get(TASK_URL)
+        self.assertNotIn('Server-Timing', response)
+
+
+class ViewQueryBudgetTest(QueryBudgetMixin, TestCase):
+    """Test the query budget of every task view"""
+    def setUp(self):
+        cache.clear()
+        self.user = createUser()
+        self.task = createTask(self.user)
+        self.api = APIClient()
+        self.api.force_authenticate(user=self.user)
+        self.client.force_login(self.user)
+
+    def test_api_budgets(self):
+        with self.assertQueryBudget(2):
+            self.api.get(TASK_URL)
+        with self.assertQueryBudget(1):
+            self.api.get(task_detail_url(self.task.id))
+        # Writes that move a task between TaskStat counters add one upsert,
+        # and saves of an existing task one locked read of its old counter.
+        with self.assertQueryBudget(2):
+            self.api.post(TASK_URL, {
+                'title': 'New', 'description': 'New', 'status': 'pending', 'due_date': '2099-01-01',
+            }, format='json')
+        with self.assertQueryBudget(3):
+            self.api.patch(task_detail_url(self.task.id), {'title': 'Renamed'}, format='json')
+        with self.assertQueryBudget(4):
+            self.api.patch(reverse('task:completed', args=[self.task.id]))
+        # Delete also writes the tombstone read by the sync endpoint.
+        with self.assertQueryBudget(4):
+            self.api.delete(task_detail_url(self.task.id))
+
+    def test_html_budgets(self):
+        with self.assertQueryBudget(3):
+            self.client.get(reverse('task:task_list'))
+        with self.assertQueryBudget(3):
+            self.client.get(reverse('task:task_detail', args=[self.task.id]))
@@ -0,0 +1,110 @@
+from datetime import date, timedelta
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from task.models import TaskModel
+
+TASK_URL = reverse('task:task-list')
+TASK_LIST_PAGE = reverse('task:task_list')
+
+def createUser(email='example@gmail.com', password='test@123'):
+    return get_user_model().objects.create_user(email=email, password=password)
+
+def createTasks(user, count, start=1):
+    today = date.today()
+    return [
+        TaskModel.objects.create(
+            user=user,
+            task_id=user.id * 1000 + start + i,
+            title=f'Task {start + i}',
+            description='Description',
+            due_date=today + timedelta(days=(start + i) // 2),
+            status='pending',
+        )
+        for i in range(count)
+    ]
+
+
+@override_settings(TASK_PAGE_SIZE=2)
+class TaskCursorPaginationTest(TestCase):
+    """Test keyset pagination of the task list API"""
+    def setUp(self):
+        self.user = createUser()
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.tasks = createTasks(self.user, 5)
+        createTasks(createUser(email='other@gmail.com'), 3)
+
+    def test_pages_follow_due_date_then_id(self):
+        """Test walking forwards through every page"""
+        seen = []
+        url = TASK_URL
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertLessEqual(len(response.data['results']), 2)
+            seen += [task['id'] for task in response.data['results']]
+            url = response.data['next']
+        expected = [task.id for task in sorted(self.tasks, key=lambda t: (t.due_date, t.id))]
+        self.assertEqual(seen, expected)
+
+    def test_previous_link_returns_previous_page(self):
+        """Test that previous walks back to the same page"""
+        first = self.client.get(TASK_URL)
+        self.assertIsNone(first.data['previous'])
+        second = self.client.get(first.data['next'])
+        back = self.client.get(second.data['previous'])
+        self.assertEqual(
+            [task['id'] for task in back.data['results']],
+            [task['id'] for task in first.data['results']],
+        )
+        self.assertIsNone(back.data['previous'])
+        self.assertIsNotNone(back.data['next'])
+
+    def test_page_size_param(self):
+        """Test that page_size is honoured and capped"""
+        response = self.client.get(TASK_URL, {'page_size': 4})
+        self.assertEqual(len(response.data['results']), 4)
+        with self.settings(TASK_MAX_PAGE_SIZE=3):
+            response = self.client.get(TASK_URL, {'page_size': 100})
+        self.assertEqual(len(response.data['results']), 3)
+
+    def test_invalid_cursor(self):
+        """Test that a tampered cursor is a 404"""
+        response = self.client.get(TASK_URL, {'cursor': 'not-a-cursor'})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_deep_page_has_no_offset(self):
+        """Test that later pages seek on the key instead of using OFFSET"""
+        response = self.client.get(TASK_URL)
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(response.data['next'])
+        self.assertFalse(any('OFFSET' in query['sql'] for query in queries.captured_queries))
+
+
+@override_settings(TASK_PAGE_SIZE=2)
+class TaskListViewPaginationTest(TestCase):
+    """Test keyset pagination of the HTML task list"""
+    def setUp(self):
+        self.user = createUser()
+        self.client.force_login(self.user)
+        self.tasks = createTasks(self.user, 3)
+
+    def test_html_list_pages(self):
+        """Test that the html list is paged newest due date first"""
+        response = self.client.get(TASK_LIST_PAGE)
+        self.assertEqual(response.status_code, 200)
+        ordered = sorted(self.tasks, key=lambda t: (t.due_date, t.id), reverse=True)
+        self.assertEqual(list(response.context['task_list']), ordered[:2])
+        self.assertIsNone(response.context['previous_cursor'])
+        response = self.client.get(TASK_LIST_PAGE, {'cursor': response.context['next_cursor']})
+        self.assertEqual(list(response.context['task_list']), ordered[2:])
+        self.assertIsNone(response.context['next_cursor'])
+        self.assertIsNotNone(response.context['previous_cursor'])
@@ -0,0 +1,172 @@
+import re
+from datetime import date, timedelta
+from unittest import skipUnless
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from rest_framework.test import APIClient
+
+from task.filters import INDEXES
+from task.models import TaskModel
+from task.reminders import ReminderScheduler
+from task.stats import user_stats
+from task.sync import sync_page, tombstones_for
+
+TASK_URL = reverse('task:task-list')
+TASK_LIST_PAGE = reverse('task:task_list')
+
+FULL_SCAN = re.compile(r'\bSCAN (\w+)$')
+TEMP_SORT = re.compile(r'USE TEMP B-TREE')
+
+def task_detail_url(id):
+    return reverse('task:task-detail', args=[id])
+
+def createUser(email='example@gmail.com', password='test@123', **extra):
+    return get_user_model().objects.create_user(email=email, password=password, **extra)
+
+def explain(sql, params=()):
+    with connection.cursor() as cursor:
+        cursor.execute('EXPLAIN QUERY PLAN ' + sql, params)
+        return [row[-1] for row in cursor.fetchall()]
+
+def bad_plan_steps(sql, params=()):
+    '''Return the plan steps that are a full table scan or a temp sort'''
+    return [
+        step for step in explain(sql, params)
+        if FULL_SCAN.search(step) or TEMP_SORT.search(step)
+    ]
+
+
+@skipUnless(connection.vendor == 'sqlite', 'EXPLAIN QUERY PLAN is SQLite specific')
+@override_settings(TASK_PAGE_SIZE=5)
+class QueryPlanTest(TestCase):
+    """Test that every hot query of the task views is served by an index"""
+    def setUp(self):
+        self.user = createUser()
+        self.admin = createUser(email='admin@gmail.com', is_admin=True, is_superuser=True)
+        today = date.today()
+        TaskModel.objects.bulk_create([
+            TaskModel(
+                user=self.user if i % 2 else self.admin,
+                task_id=i + 1,
+                title=f'Task {i}',
+                description='Description',
+                due_date=today + timedelta(days=i % 30),
+                status='pending',
+            )
+            for i in range(60)
+        ])
+        self.task = TaskModel.objects.filter(user=self.user).first()
+        self.api = APIClient()
+
+    def assertIndexedQueries(self, request):
+        with CaptureQueriesContext(connection) as queries:
+            response = request()
+        self.assertLess(response.status_code, 400)
+        selects = [q['sql'] for q in queries.captured_queries if q['sql'].startswith('SELECT')]
+        self.assertTrue(selects)
+        for sql in selects:
+            self.assertEqual(bad_plan_steps(sql), [], sql)
+        return response
+
+    def test_api_list(self):
+        """Test the api list and its next page for a user"""
+        self.api.force_authenticate(user=self.user)
+        response = self.assertIndexedQueries(lambda: self.api.get(TASK_URL))
+        self.assertIndexedQueries(lambda: self.api.get(response.data['next']))
+
+    def test_api_list_superuser(self):
+        """Test the api list over every task"""
+        self.api.force_authenticate(user=self.admin)
+        response = self.assertIndexedQueries(lambda: self.api.get(TASK_URL))
+        self.assertIndexedQueries(lambda: self.api.get(response.data['next']))
+
+    def test_api_list_filters(self):
+        """Test that every supported filter and ordering seeks its index, on both pages"""
+        today = date.today()
+        moment = self.task.created_at
+        filters = {
+            ('due_date', ()): {'due_after': today, 'due_before': today + timedelta(days=20)},
+            ('due_date', ('status',)): {'status': 'pending', 'due_after': today},
+            ('created_at', ()): {'created_after': (moment - timedelta(days=1)).isoformat()},
+            ('updated_at', ()): {'updated_before': (moment + timedelta(days=1)).isoformat()},
+        }
+        for (column, equality), indexes in INDEXES.items():
+            for user, index in zip((self.user, self.admin), indexes):
+                if index is None:
+                    continue
+                self.api.force_authenticate(user=user)
+                for ordering in (column, f'-{column}'):
+                    params = {**filters[column, equality], 'ordering': ordering}
+                    with self.subTest(user=user.email, params=params):
+                        response = self.assertListSeeks(index, lambda: self.api.get(TASK_URL, params))
+                        self.assertIsNotNone(response.data['next'])
+                        self.assertListSeeks(index, lambda: self.api.get(response.data['next']))
+
+    def assertListSeeks(self, index, request):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.assertIndexedQueries(request)
+        page = [q['sql'] for q in queries.captured_queries if q['sql'].startswith('SELECT') and 'ORDER BY' in q['sql']]
+        self.assertEqual(len(page), 1, page)
+        self.assertTrue(any(f'INDEX {index} ' in step for step in explain(page[0])), explain(page[0]))
+        return response
+
+    def test_api_detail(self):
+        """Test the api detail"""
+        self.api.force_authenticate(user=self.user)
+        self.assertIndexedQueries(lambda: self.api.get(task_detail_url(self.task.id)))
+
+    def test_html_list(self):
+        """Test the html list and its next page"""
+        for user in (self.user, self.admin):
+            self.client.force_login(user)
+            response = self.assertIndexedQueries(lambda: self.client.get(TASK_LIST_PAGE))
+            cursor = response.context['next_cursor']
+            self.assertIndexedQueries(lambda: self.client.get(TASK_LIST_PAGE, {'cursor': cursor}))
+
+    def test_html_detail(self):
+        """Test the html detail"""
+        self.client.force_login(self.user)
+        self.assertIndexedQueries(
+            lambda: self.client.get(reverse('task:task_detail', args=[self.task.id]))
+        )
+
+    def test_status_and_updated_at_lookups(self):
+        """Test the lookups the indexes on status and updated_at serve"""
+        for queryset in (
+            TaskModel.objects.filter(user=self.user, status='pending'),
+            TaskModel.objects.filter(updated_at__gte=self.task.updated_at).order_by('updated_at'),
+        ):
+            sql, params = queryset.query.sql_with_params()
+            self.assertEqual(bad_plan_steps(sql, params), [], sql)
+
+    def test_reminder_scans(self):
+        """Test the range scans of the reminder scheduler"""
+        scheduler = ReminderScheduler(sink=None, batch_size=10, max_heap=40)
+        with CaptureQueriesContext(connection) as queries:
+            scheduler.refill()
+            scheduler.catch_up()
+        self.assertGreater(len(queries.captured_queries), 2)
+        for query in queries.captured_queries:
+            self.assertEqual(bad_plan_steps(query['sql']), [], query['sql'])
+
+    def test_stats_read(self):
+        """Test that the stats read only touches the user's counters"""
+        with CaptureQueriesContext(connection) as queries:
+            user_stats(self.user)
+        for query in queries.captured_queries:
+            self.assertEqual(bad_plan_steps(query['sql']), [], query['sql'])
+
+    def test_sync_reads(self):
+        """Test the seeks on updated_at and on the deletion log"""
+        for user in (self.user, self.admin):
+            tasks = TaskModel.objects.all() if user.is_superuser else TaskModel.objects.filter(user=user)
+            page = sync_page(tasks, tombstones_for(user), None, 5)
+            with CaptureQueriesContext(connection) as queries:
+                sync_page(tasks, tombstones_for(user), page.cursor, 5)
+            for query in queries.captured_queries:
+                self.assertEqual(bad_plan_steps(query['sql']), [], query['sql'])
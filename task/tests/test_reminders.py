@@ -0,0 +1,148 @@
+from datetime import date, datetime, timedelta
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core import mail
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from task import reminders
+from task.models import TaskModel
+
+def createUser(email='example@gmail.com', password='test@123'):
+    return get_user_model().objects.create_user(email=email, password=password)
+
+def at(day, hour=0):
+    return timezone.make_aware(datetime.combine(day, datetime.min.time()) + timedelta(hours=hour))
+
+
+class CollectingSink:
+    def __init__(self):
+        self.batches = []
+
+    def send(self, items):
+        self.batches.append(items)
+
+    @property
+    def titles(self):
+        return [item['title'] for batch in self.batches for item in batch]
+
+
+@override_settings(TASK_REMINDER_DAYS_BEFORE=0, TASK_REMINDER_TIME='09:00', TASK_REMINDER_CATCH_UP_HOURS=0)
+class ReminderSchedulerTest(TestCase):
+    """Test the due date reminder scheduler"""
+    def setUp(self):
+        self.user = createUser()
+        self.today = date(2099, 1, 1)
+        self.sink = CollectingSink()
+
+    def createTask(self, i, days, status='pending'):
+        return TaskModel.objects.create(
+            user=self.user, task_id=700 + i, title=f'Task {i}', description='Description',
+            due_date=self.today + timedelta(days=days), status=status,
+        )
+
+    def scheduler(self, **kwargs):
+        return reminders.ReminderScheduler(self.sink, now=at(self.today), **kwargs)
+
+    def test_sends_due_reminders_in_order(self):
+        """Test that only due, open tasks are reminded, earliest first"""
+        self.createTask(1, 1)
+        self.createTask(2, 0)
+        self.createTask(3, 0, status='completed')
+        self.createTask(4, 5)
+        scheduler = self.scheduler()
+        scheduler.refill()
+        self.assertEqual(scheduler.dispatch(at(self.today, 8)), 0)
+        self.assertEqual(scheduler.dispatch(at(self.today + timedelta(days=1), 10)), 2)
+        self.assertEqual(self.sink.titles, ['Task 2', 'Task 1'])
+        self.assertEqual(scheduler.next_reminder(), at(self.today + timedelta(days=5), 9))
+
+    def test_bounded_heap_refills_by_range_scan(self):
+        """Test that a small heap still reaches every task"""
+        for i in range(25):
+            self.createTask(i, i % 5)
+        scheduler = self.scheduler(batch_size=4, max_heap=8)
+        scheduler.refill()
+        self.assertLessEqual(len(scheduler), 8)
+        sent = scheduler.dispatch(at(self.today + timedelta(days=10)))
+        self.assertEqual(sent, 25)
+        self.assertEqual(len(set(self.sink.titles)), 25)
+        self.assertTrue(all(len(batch) <= 4 for batch in self.sink.batches))
+
+    def test_signals_update_active_scheduler(self):
+        """Test that saves and deletes in this process reschedule reminders"""
+        moved = self.createTask(1, 3)
+        done = self.createTask(2, 0)
+        dropped = self.createTask(3, 0)
+        scheduler = self.scheduler()
+        scheduler.refill()
+        reminders.active_scheduler = scheduler
+        try:
+            moved.due_date = self.today
+            moved.save()
+            done.status = 'completed'
+            done.save()
+            dropped.delete()
+            added = self.createTask(4, 0)
+        finally:
+            reminders.active_scheduler = None
+        self.assertEqual(scheduler.scheduled.get(added.pk), self.today)
+        scheduler.dispatch(at(self.today, 10))
+        self.assertEqual(sorted(self.sink.titles), ['Task 1', 'Task 4'])
+
+    def test_edit_after_sending_does_not_remind_again(self):
+        """Test that a sent reminder is only queued again when the due date moves"""
+        task = self.createTask(1, 0)
+        scheduler = self.scheduler()
+        scheduler.refill()
+        reminders.active_scheduler = scheduler
+        try:
+            self.assertEqual(scheduler.dispatch(at(self.today, 10)), 1)
+            task.title = 'Renamed'
+            task.save()
+            scheduler.catch_up()
+            self.assertEqual(scheduler.dispatch(at(self.today, 11)), 0)
+            task.due_date = self.today + timedelta(days=1)
+            task.save()
+        finally:
+            reminders.active_scheduler = None
+        self.assertEqual(scheduler.dispatch(at(self.today + timedelta(days=1), 10)), 1)
+        self.assertEqual(self.sink.titles, ['Task 1', 'Renamed'])
+
+    def test_catch_up_sees_other_processes(self):
+        """Test that writes without signals are found through updated_at"""
+        scheduler = self.scheduler()
+        scheduler.refill()
+        task = self.createTask(1, 0)
+        TaskModel.objects.filter(pk=task.pk).update(due_date=self.today, updated_at=timezone.now())
+        scheduler.catch_up()
+        scheduler.dispatch(at(self.today, 10))
+        self.assertEqual(self.sink.titles, ['Task 1'])
+
+    def test_stale_entries_are_checked_before_sending(self):
+        """Test that a task completed behind the scheduler's back is skipped"""
+        task = self.createTask(1, 0)
+        scheduler = self.scheduler()
+        scheduler.refill()
+        TaskModel.objects.filter(pk=task.pk).update(status='completed')
+        self.assertEqual(scheduler.dispatch(at(self.today, 10)), 0)
+
+
+class RunRemindersCommandTest(TestCase):
+    """Test the run_reminders command"""
+    @override_settings(TASK_REMINDER_DAYS_BEFORE=0, TASK_REMINDER_TIME='00:00', TASK_REMINDER_CATCH_UP_HOURS=24,
+                       EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend')
+    def test_once_sends_email(self):
+        """Test that --once mails what is due today"""
+        user = createUser()
+        TaskModel.objects.create(
+            user=user, task_id=1, title='Due today', description='Description',
+            due_date=timezone.localdate(), status='pending',
+        )
+        out = StringIO()
+        call_command('run_reminders', once=True, stdout=out)
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].to, [user.email])
+        self.assertIn('Sent 1 reminders', out.getvalue())
@@ -0,0 +1,111 @@
+import gzip
+import json
+from datetime import date, timedelta
+from unittest import mock, skipUnless
+
+import msgpack
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from task import compression
+from task.models import TaskModel
+
+TASK_URL = reverse('task:task-list')
+MSGPACK = 'application/msgpack'
+
+def createUser(email='example@gmail.com', password='test@123'):
+    return get_user_model().objects.create_user(email=email, password=password)
+
+
+class MessagePackTest(TestCase):
+    """Test the MessagePack renderer and parser"""
+    def setUp(self):
+        cache.clear()
+        self.user = createUser()
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def test_render_list(self):
+        """Test that msgpack carries the same data as JSON"""
+        TaskModel.objects.create(user=self.user, task_id=1, title='Task', description='D',
+                                 due_date=date.today(), status='pending')
+        expected = self.client.get(TASK_URL).json()
+        response = self.client.get(TASK_URL, HTTP_ACCEPT=MSGPACK)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['Content-Type'], MSGPACK)
+        self.assertIn('Accept', response['Vary'])
+        self.assertEqual(msgpack.unpackb(response.content), expected)
+
+    def test_parse_create(self):
+        """Test creating a task from a msgpack body"""
+        body = msgpack.packb({'title': 'Packed', 'description': 'D', 'status': 'pending',
+                              'due_date': (date.today() + timedelta(days=1)).isoformat()})
+        response = self.client.post(TASK_URL, body, content_type=MSGPACK, HTTP_ACCEPT=MSGPACK)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(msgpack.unpackb(response.content)['title'], 'Packed')
+
+    def test_parse_error(self):
+        """Test that a broken body is a 400"""
+        response = self.client.post(TASK_URL, b'\xc1', content_type=MSGPACK)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+@override_settings(TASK_COMPRESSION_MIN_BYTES=1024)
+class CompressionTest(TestCase):
+    """Test response compression"""
+    def setUp(self):
+        cache.clear()
+        self.user = createUser()
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        TaskModel.objects.bulk_create([
+            TaskModel(user=self.user, task_id=i + 1, title=f'Task {i}', description='Description ' * 10,
+                      due_date=date.today(), status='pending')
+            for i in range(20)
+        ])
+
+    @mock.patch.object(compression, 'zstandard', None)
+    def test_gzip_above_threshold(self):
+        """Test that large lists are gzipped and small responses are not"""
+        plain = self.client.get(TASK_URL)
+        response = self.client.get(TASK_URL, HTTP_ACCEPT_ENCODING='gzip, deflate')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertIn('Accept-Encoding', response['Vary'])
+        self.assertEqual(response['ETag'], 'W/' + plain['ETag'])
+        self.assertEqual(json.loads(gzip.decompress(response.content)), plain.json())
+
+        response = self.client.get(TASK_URL, {'page_size': 1}, HTTP_ACCEPT_ENCODING='gzip')
+        self.assertFalse(response.has_header('Content-Encoding'))
+
+    def test_not_acceptable_or_html(self):
+        """Test refused codings and HTML pages are sent as they are"""
+        response = self.client.get(TASK_URL, HTTP_ACCEPT_ENCODING='gzip;q=0, identity')
+        self.assertFalse(response.has_header('Content-Encoding'))
+        self.client.force_login(self.user)
+        response = self.client.get(reverse('task:task_list'), HTTP_ACCEPT_ENCODING='gzip')
+        self.assertFalse(response.has_header('Content-Encoding'))
+
+    @skipUnless(compression.zstandard, 'zstandard is not installed')
+    def test_zstd_preferred(self):
+        """Test that zstd wins when both are accepted"""
+        response = self.client.get(TASK_URL, HTTP_ACCEPT_ENCODING='gzip, zstd')
+        self.assertEqual(response['Content-Encoding'], 'zstd')
+        content = compression.zstandard.ZstdDecompressor().decompressobj().decompress(response.content)
+        self.assertEqual(len(json.loads(content)['results']), 20)
+
+
+class ChooseCodingTest(SimpleTestCase):
+    """Test Accept-Encoding negotiation"""
+    @mock.patch.object(compression, 'zstandard', None)
+    def test_choose(self):
+        self.assertEqual(compression.choose_coding('gzip'), 'gzip')
+        self.assertEqual(compression.choose_coding('*'), 'gzip')
+        self.assertIsNone(compression.choose_coding(''))
+        self.assertIsNone(compression.choose_coding('br, zstd'))
+        self.assertIsNone(compression.choose_coding('*, gzip;q=0'))
+        self.assertIsNone(compression.choose_coding('gzip;q=bad'))
@@ -0,0 +1,108 @@
+from datetime import date
+from unittest import skipUnless
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from task.models import TaskModel
+from task.search import fts5_enabled, fts5_match
+
+SEARCH_URL = reverse('task:task-search')
+BULK_URL = reverse('task:task-bulk')
+
+def createUser(email='example@gmail.com', password='test@123', **extra):
+    return get_user_model().objects.create_user(email=email, password=password, **extra)
+
+
+class TaskSearchAPITest(TestCase):
+    """Test the task search endpoint"""
+    def setUp(self):
+        self.user = createUser()
+        self.other = createUser(email='other@gmail.com')
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.invoice = self.createTask(self.user, 1, 'Send invoice', 'Email the invoice to the client')
+        self.mention = self.createTask(self.user, 2, 'Call the bank', 'Ask about the invoice fee')
+        self.createTask(self.user, 3, 'Buy milk', 'Groceries')
+        self.createTask(self.other, 4, 'Invoice for other', 'Not visible')
+
+    def createTask(self, user, i, title, description):
+        return TaskModel.objects.create(
+            user=user, task_id=i, title=title, description=description,
+            due_date=date(2099, 1, 1), status='pending',
+        )
+
+    def search(self, q, **params):
+        response = self.client.get(SEARCH_URL, dict(params, q=q))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response
+
+    def test_ranked_and_scoped_to_user(self):
+        """Test that title hits rank first and other users are hidden"""
+        response = self.search('invoice')
+        self.assertEqual([task['id'] for task in response.data['results']], [self.invoice.id, self.mention.id])
+
+    def test_prefix_and_all_terms(self):
+        """Test that every word must match, as a prefix"""
+        self.assertEqual(len(self.search('invo').data['results']), 2)
+        self.assertEqual([t['id'] for t in self.search('invoice fee').data['results']], [self.mention.id])
+
+    def test_index_follows_writes(self):
+        """Test that updates, deletes and bulk creates reach the index"""
+        self.invoice.title = 'Send receipt'
+        self.invoice.description = 'Receipt'
+        self.invoice.save()
+        self.mention.delete()
+        self.assertEqual(self.search('invoice').data['results'], [])
+        self.client.post(BULK_URL, {'create': [{
+            'title': 'Invoice batch', 'description': 'Bulk', 'status': 'pending', 'due_date': '2099-01-01',
+        }]}, format='json')
+        self.assertEqual(len(self.search('invoice').data['results']), 1)
+
+    def test_pagination(self):
+        """Test page links"""
+        response = self.search('invoice', page_size=1)
+        self.assertEqual(len(response.data['results']), 1)
+        self.assertIsNone(response.data['previous'])
+        second = self.client.get(response.data['next'])
+        self.assertEqual([t['id'] for t in second.data['results']], [self.mention.id])
+        self.assertIsNone(second.data['next'])
+
+    def test_fts_syntax_is_escaped(self):
+        """Test that query operators in the input are treated as words"""
+        self.assertEqual(self.search('invoice OR "milk" NEAR(').status_code, status.HTTP_200_OK)
+        self.assertEqual(self.search('*:-').data['results'], [])
+
+    def test_query_required(self):
+        """Test that q is required"""
+        response = self.client.get(SEARCH_URL)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_admin_searches_everyone(self):
+        """Test that admins are not scoped"""
+        self.client.force_authenticate(user=createUser(email='admin@gmail.com', is_superuser=True))
+        self.assertEqual(len(self.search('invoice').data['results']), 3)
+
+    def test_non_superuser_admin_is_scoped(self):
+        """Test that an is_admin user only searches their own tasks, as in the task list"""
+        self.client.force_authenticate(user=createUser(email='admin@gmail.com', is_admin=True))
+        self.assertEqual(self.search('invoice').data['results'], [])
+
+
+@skipUnless(connection.vendor == 'sqlite', 'FTS5 is SQLite specific')
+class FTS5Test(TestCase):
+    """Test the FTS5 plumbing"""
+    def test_table_is_created(self):
+        """Test that the migration created the FTS table"""
+        self.assertTrue(fts5_enabled())
+
+    def test_match_expression(self):
+        """Test that terms are quoted and scoped"""
+        user = createUser()
+        self.assertEqual(fts5_match(user, 'a"b c'), f'owner:"u{user.pk}" AND ("a"* AND "b"* AND "c"*)')
+        self.assertIsNone(fts5_match(user, '  ()" '))
@@ -0,0 +1,48 @@
+from datetime import date
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import CommandError, call_command
+from django.db.models import Count
+from django.test import TestCase
+
+from task.models import TaskModel, TaskStat
+
+
+class SeedTasksCommandTest(TestCase):
+    """Test the seed_tasks command"""
+    def seed(self, **options):
+        out = StringIO()
+        call_command('seed_tasks', stdout=out, **{'users': 20, 'tasks': 2000, 'batch_size': 700, **options})
+        return out.getvalue()
+
+    def test_seed(self):
+        """Test the counts, passwords and counters of the generated data"""
+        out = self.seed()
+        self.assertIn('Created 20 users and 2000 tasks', out)
+        users = get_user_model().objects.filter(email__endswith='@example.com')
+        self.assertEqual(users.count(), 20)
+        self.assertTrue(users.get(email='seed0@example.com').check_password('seed@123'))
+        self.assertEqual(TaskModel.objects.count(), 2000)
+        self.assertEqual(sum(TaskStat.objects.values_list('count', flat=True)), 2000)
+
+    def test_distributions(self):
+        """Test that ownership is skewed and statuses follow the due dates"""
+        self.seed()
+        per_user = sorted(TaskModel.objects.values('user').annotate(n=Count('id')).values_list('n', flat=True))
+        self.assertGreater(per_user[-1], 3 * 2000 / 20)
+        today = date.today()
+        overdue = TaskModel.objects.filter(due_date__lt=today)
+        later = TaskModel.objects.filter(due_date__gt=date.fromordinal(today.toordinal() + 7))
+        self.assertGreater(overdue.filter(status='completed').count(), overdue.count() / 2)
+        self.assertGreater(later.filter(status='pending').count(), later.count() / 2)
+
+    def test_repeatable(self):
+        """Test that the same seed gives the same tasks, and prefixes are not reused"""
+        self.seed(tasks=50)
+        first = list(TaskModel.objects.order_by('id').values_list('title', 'due_date', 'status'))
+        with self.assertRaises(CommandError):
+            self.seed(tasks=50)
+        self.seed(tasks=50, prefix='again')
+        second = list(TaskModel.objects.order_by('id').values_list('title', 'due_date', 'status'))[50:]
+        self.assertEqual(first, second)
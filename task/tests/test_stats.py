@@ -0,0 +1,180 @@
+from datetime import date, timedelta
+from io import BytesIO, StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db.models import Count
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from task.imports import import_tasks
+from task.models import TaskModel, TaskStat
+from task.stats import week_end
+
+TASK_URL = reverse('task:task-list')
+STATS_URL = reverse('task:task-stats')
+BULK_URL = reverse('task:task-bulk')
+
+def task_detail_url(id):
+    return reverse('task:task-detail', args=[id])
+
+def createUser(email='example@gmail.com', password='test@123'):
+    return get_user_model().objects.create_user(email=email, password=password)
+
+def recount(user):
+    return {
+        (row['status'], row['due_date']): row['count']
+        for row in TaskModel.objects.filter(user=user)
+        .values('status', 'due_date').annotate(count=Count('id')).order_by()
+    }
+
+def counters(user):
+    return {
+        (row['status'], row['due_date']): row['count']
+        for row in TaskStat.objects.filter(user=user).exclude(count=0).values('status', 'due_date', 'count')
+    }
+
+
+class TaskStatCountersTest(TestCase):
+    """Test that the counters follow every write path"""
+    def setUp(self):
+        self.user = createUser()
+        self.api = APIClient()
+        self.api.force_authenticate(user=self.user)
+        self.day = date(2099, 12, 25)
+
+    def assertCountersMatch(self):
+        self.assertEqual(counters(self.user), recount(self.user))
+
+    def test_api_writes(self):
+        """Test create, update, complete and delete through the API"""
+        response = self.api.post(TASK_URL, {
+            'title': 'Task', 'description': 'Task', 'status': 'pending', 'due_date': self.day.isoformat(),
+        }, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        task_id = response.data['id']
+        self.assertEqual(counters(self.user), {('pending', self.day): 1})
+
+        self.api.patch(task_detail_url(task_id), {'status': 'in_progress', 'due_date': '2099-12-26'}, format='json')
+        self.assertEqual(counters(self.user), {('in_progress', date(2099, 12, 26)): 1})
+
+        self.api.patch(reverse('task:completed', args=[task_id]))
+        self.assertEqual(counters(self.user), {('completed', date(2099, 12, 26)): 1})
+
+        self.api.patch(task_detail_url(task_id), {'title': 'Renamed'}, format='json')
+        self.api.delete(task_detail_url(task_id))
+        self.assertEqual(counters(self.user), {})
+
+    def test_model_saves(self):
+        """Test saves of fresh, deferred and stale instances"""
+        task = TaskModel.objects.create(user=self.user, task_id=1, title='T', description='D',
+                                        due_date=self.day, status='pending')
+        task.status = 'in_progress'
+        task.save()
+        deferred = TaskModel.objects.only('title').get(pk=task.pk)
+        deferred.status = 'completed'
+        deferred.save()
+        task.refresh_from_db()
+        task.due_date = self.day + timedelta(days=1)
+        task.save(update_fields=['due_date'])
+        self.assertCountersMatch()
+
+    def test_racing_saves(self):
+        """Test two writers that read the task before either saved it"""
+        task = TaskModel.objects.create(user=self.user, task_id=1, title='T', description='D',
+                                        due_date=self.day, status='pending')
+        first = TaskModel.objects.get(pk=task.pk)
+        second = TaskModel.objects.get(pk=task.pk)
+        first.status = 'in_progress'
+        first.save()
+        second.status = 'completed'
+        second.save()
+        self.assertCountersMatch()
+        self.assertEqual(counters(self.user), {('completed', self.day): 1})
+
+    def test_bulk_and_import(self):
+        """Test the bulk endpoint and the importer"""
+        payload = {'create': [
+            {'title': f'Task {i}', 'description': 'D', 'status': 'pending', 'due_date': self.day.isoformat()}
+            for i in range(5)
+        ]}
+        created = self.api.post(BULK_URL, payload, format='json').data['create']
+        self.api.post(BULK_URL, {
+            'update': [{'id': created[0]['id'], 'status': 'completed'}],
+            'delete': [created[1]['id'], created[2]['id']],
+        }, format='json')
+        import_tasks(self.user, BytesIO(
+            b'{"title": "I", "description": "D", "status": "in_progress", "due_date": "2099-12-24"}\n'
+        ), 'ndjson')
+        self.assertCountersMatch()
+        self.assertEqual(sum(counters(self.user).values()), 4)
+
+    def test_deleting_user(self):
+        """Test that a user with tasks can be deleted"""
+        TaskModel.objects.create(user=self.user, task_id=1, title='T', description='D',
+                                 due_date=self.day, status='pending')
+        self.user.delete()
+        self.assertFalse(TaskStat.objects.exists())
+
+
+class TaskStatsAPITest(TestCase):
+    """Test the stats endpoint and rebuild_task_stats"""
+    def setUp(self):
+        cache.clear()
+        self.user = createUser()
+        self.api = APIClient()
+        self.api.force_authenticate(user=self.user)
+        today = timezone.localdate()
+        rows = [
+            ('pending', today - timedelta(days=3)),
+            ('in_progress', today - timedelta(days=1)),
+            ('completed', today - timedelta(days=1)),
+            ('pending', today),
+            ('pending', week_end(today)),
+            ('pending', week_end(today) + timedelta(days=1)),
+        ]
+        for i, (task_status, due_date) in enumerate(rows):
+            TaskModel.objects.create(user=self.user, task_id=i + 1, title='T', description='D',
+                                     due_date=due_date, status=task_status)
+        TaskModel.objects.create(user=createUser(email='other@gmail.com'), task_id=99, title='T',
+                                 description='D', due_date=today, status='pending')
+
+    def test_stats(self):
+        """Test the counts and buckets"""
+        response = self.api.get(STATS_URL)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['total'], 6)
+        self.assertEqual(response.data['by_status'], {'pending': 4, 'in_progress': 1, 'completed': 1})
+        self.assertEqual(response.data['overdue'], 2)
+        self.assertEqual(response.data['due_today'], 1)
+        self.assertEqual(response.data['due_this_week'], 2 if week_end(timezone.localdate()) != timezone.localdate() else 1)
+
+    def test_read_cost_does_not_grow_with_tasks(self):
+        """Test that a read is one query on the counters, and none when cached"""
+        day = date(2099, 12, 25)
+        TaskModel.objects.bulk_create([
+            TaskModel(user=self.user, task_id=1000 + i, title='T', description='D', due_date=day, status='pending')
+            for i in range(500)
+        ])
+        call_command('rebuild_task_stats', stdout=StringIO())
+        with self.assertNumQueries(1):
+            response = self.api.get(STATS_URL)
+        self.assertEqual(response.data['total'], 506)
+        with self.assertNumQueries(0):
+            self.api.get(STATS_URL)
+
+    def test_rebuild_command(self):
+        """Test that drifted counters are corrected"""
+        TaskStat.objects.filter(user=self.user, status='completed').update(count=7)
+        TaskStat.objects.create(user=self.user, status='in_progress', due_date=date(2099, 1, 1), count=2)
+        expected = recount(self.user)
+        out = StringIO()
+        call_command('rebuild_task_stats', user=[self.user.email], stdout=out)
+        self.assertIn('corrected 2 counters', out.getvalue())
+        self.assertEqual(counters(self.user), expected)
+        self.assertFalse(TaskStat.objects.filter(count=0).exists())
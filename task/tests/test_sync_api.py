@@ -0,0 +1,120 @@
+from datetime import date, timedelta
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from task.models import TaskModel, TaskTombstone
+from task.sync import SyncCursor, encode_sync_cursor
+
+SYNC_URL = reverse('task:task-sync')
+BULK_URL = reverse('task:task-bulk')
+
+def task_detail_url(id):
+    return reverse('task:task-detail', args=[id])
+
+def createUser(email='example@gmail.com', password='test@123'):
+    return get_user_model().objects.create_user(email=email, password=password)
+
+def createTask(user, i):
+    return TaskModel.objects.create(user=user, task_id=i + 1, title=f'Task {i}', description='D',
+                                    due_date=date(2099, 12, 25), status='pending')
+
+
+@override_settings(TASK_SYNC_LAG_SECONDS=0)
+class TaskSyncAPITest(TestCase):
+    """Test the delta sync endpoint"""
+    def setUp(self):
+        self.user = createUser()
+        self.api = APIClient()
+        self.api.force_authenticate(user=self.user)
+        self.tasks = [createTask(self.user, i) for i in range(5)]
+        createTask(createUser(email='other@gmail.com'), 99)
+
+    def sync(self, cursor=None, **params):
+        if cursor:
+            params['cursor'] = cursor
+        response = self.api.get(SYNC_URL, params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.data
+
+    def test_full_sync_in_pages(self):
+        """Test that a first sync pages through every task of the user"""
+        seen, cursor = [], None
+        while True:
+            data = self.sync(cursor, page_size=2)
+            seen += [task['id'] for task in data['changes']]
+            cursor = data['cursor']
+            if not data['has_more']:
+                break
+        self.assertEqual(seen, [task.id for task in self.tasks])
+        self.assertEqual(self.sync(cursor)['changes'], [])
+
+    def test_only_changes_since_cursor(self):
+        """Test that updates, creates and deletes after the cursor are all that is sent"""
+        cursor = self.sync()['cursor']
+        self.api.patch(task_detail_url(self.tasks[1].id), {'status': 'completed'}, format='json')
+        created = createTask(self.user, 10)
+        self.api.delete(task_detail_url(self.tasks[3].id))
+        self.api.post(BULK_URL, {'delete': [self.tasks[4].id]}, format='json')
+
+        data = self.sync(cursor)
+        self.assertEqual([task['id'] for task in data['changes']], [self.tasks[1].id, created.id])
+        self.assertEqual(data['changes'][0]['status'], 'completed')
+        self.assertEqual(
+            [(item['id'], item['task_id']) for item in data['deleted']],
+            [(self.tasks[3].id, self.tasks[3].task_id), (self.tasks[4].id, self.tasks[4].task_id)],
+        )
+        data = self.sync(data['cursor'])
+        self.assertEqual((data['changes'], data['deleted']), ([], []))
+
+    def test_cost_follows_the_change(self):
+        """Test that a sync costs the same queries however many tasks exist"""
+        TaskModel.objects.bulk_create([
+            TaskModel(user=self.user, task_id=1000 + i, title='T', description='D',
+                      due_date=date(2099, 12, 25), status='pending')
+            for i in range(300)
+        ])
+        cursor = self.sync(page_size=500)['cursor']
+        self.tasks[0].save()
+        with self.assertNumQueries(2):
+            data = self.sync(cursor)
+        self.assertEqual(len(data['changes']), 1)
+
+    @override_settings(TASK_SYNC_LAG_SECONDS=60)
+    def test_recent_changes_are_sent_again(self):
+        """Test that the cursor stays behind changes that may not be settled"""
+        first = self.sync()
+        self.assertEqual(len(first['changes']), 5)
+        self.assertFalse(first['has_more'])
+        self.assertEqual(len(self.sync(first['cursor'])['changes']), 5)
+
+    def test_deleting_a_user_leaves_no_tombstones(self):
+        """Test that cascaded deletes are not logged"""
+        self.user.delete()
+        self.assertFalse(TaskTombstone.objects.exists())
+
+    def test_bad_cursors(self):
+        """Test invalid and expired cursors"""
+        response = self.api.get(SYNC_URL, {'cursor': 'garbage'})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        old = timezone.now() - timedelta(days=365)
+        response = self.api.get(SYNC_URL, {'cursor': encode_sync_cursor(SyncCursor((old, 1), (old, 1)))})
+        self.assertEqual(response.status_code, status.HTTP_410_GONE)
+
+    def test_prune_tombstones(self):
+        """Test that old tombstones are pruned"""
+        old_pk = self.tasks[0].pk
+        self.tasks[0].delete()
+        self.tasks[1].delete()
+        TaskTombstone.objects.filter(task_pk=old_pk).update(deleted_at=timezone.now() - timedelta(days=400))
+        out = StringIO()
+        call_command('prune_tombstones', stdout=out)
+        self.assertIn('Deleted 1 tombstones', out.getvalue())
+        self.assertEqual(TaskTombstone.objects.count(), 1)
@@ -34,7 +34,7 @@ class TaskTestCase(TestCase):
             'title': 'Test Task',
             'description': 'This is a test task',
             'status': 'pending',
-            'due_date': '2024-12-25',
+            'due_date': '2099-12-25',
         }
         response = self.client.post(TASK_URL, task_data, format='json')
         self.assertEqual(response.status_code, status.HTTP_201_CREATED)
@@ -58,7 +58,7 @@ class TaskTestCase(TestCase):
             'title': 'Test task',
             'description': 'Test task description',
             'status': 'pending',
-            'due_date':'2024-12-25',
+            'due_date':'2099-12-25',
         }
         response = self.client.post(TASK_URL, data=task_data, format='json')
         task_id = response.data['id']
@@ -73,7 +73,7 @@ class TaskTestCase(TestCase):
             'title': 'Test task put',
             'description': 'Test task description put',
             'status': 'in_progress',
-            'due_date':'2024-12-25',
+            'due_date':'2099-12-25',
         }
         put_response = self.client.put(url, data=put_update_data, format='json')
         self.assertEqual(put_response.status_code, status.HTTP_200_OK)
@@ -93,7 +93,7 @@ class TaskTestCase(TestCase):
             'title': 'Test task',
             'description': 'Test task description',
             'status': 'pending',
-            'due_date':'2024-12-25',
+            'due_date':'2099-12-25',
         }
         response = self.client.post(TASK_URL, data=task_data, format='json')
         task_id = response.data['id']
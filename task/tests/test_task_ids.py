@@ -0,0 +1,136 @@
+import multiprocessing
+import os
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock, skipUnless
+
+from django.contrib.auth import get_user_model
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from task import ids
+from task.ids import MAX_SEQUENCE, TaskIdGenerator, next_task_id, parse_task_id
+from task.models import TaskModel
+
+TASK_URL = reverse('task:task-list')
+
+def _try_lock(lease_file, offset, queue):
+    fd = os.open(lease_file, os.O_RDWR)
+    try:
+        ids._lock_byte(fd, offset)
+    except OSError:
+        queue.put(True)
+    else:
+        queue.put(False)
+
+def _lease_held_elsewhere(lease_file, offset):
+    '''Whether another process is refused the lock on a worker id byte'''
+    context = multiprocessing.get_context('fork')
+    queue = context.Queue()
+    process = context.Process(target=_try_lock, args=(lease_file, offset, queue))
+    process.start()
+    held = queue.get(timeout=30)
+    process.join()
+    return held
+
+def _child_ids(queue, barrier):
+    next_task_id()
+    # Stay alive until every worker holds its lease.
+    barrier.wait(timeout=30)
+    queue.put([next_task_id() for _ in range(2000)])
+
+
+class TaskIdGeneratorTest(SimpleTestCase):
+    """Test the snowflake task id generator"""
+    def test_ids_fit_in_signed_64_bits(self):
+        """Test that ids are positive and fit a BigIntegerField"""
+        task_id = TaskIdGenerator(worker_id=1023)()
+        self.assertGreater(task_id, 0)
+        self.assertLess(task_id, 2 ** 63)
+        self.assertEqual(parse_task_id(task_id)[1], 1023)
+
+    def test_sequence_overflow_borrows_next_millisecond(self):
+        """Test that a frozen clock still yields unique increasing ids"""
+        generator = TaskIdGenerator(worker_id=1, clock=lambda: 1800000000000)
+        ids = [generator() for _ in range(MAX_SEQUENCE * 3)]
+        self.assertEqual(len(set(ids)), len(ids))
+        self.assertEqual(ids, sorted(ids))
+
+    def test_clock_going_backwards(self):
+        """Test that ids stay monotonic when the clock steps back"""
+        ticks = iter([1800000000005, 1800000000001, 1800000000002])
+        generator = TaskIdGenerator(worker_id=1, clock=lambda: next(ticks))
+        ids = [generator() for _ in range(3)]
+        self.assertEqual(ids, sorted(ids))
+        self.assertEqual(len(set(ids)), 3)
+
+    def test_concurrent_threads(self):
+        """Test that many threads never get the same id"""
+        generator = TaskIdGenerator(worker_id=7)
+        with ThreadPoolExecutor(max_workers=16) as pool:
+            batches = list(pool.map(lambda _: [generator() for _ in range(5000)], range(16)))
+        ids = [task_id for batch in batches for task_id in batch]
+        self.assertEqual(len(set(ids)), len(ids))
+
+    def test_worker_id_from_environment(self):
+        """Test that TASK_ID_WORKER_ID in the environment of the process is used"""
+        with mock.patch.dict(os.environ, {'TASK_ID_WORKER_ID': '42'}):
+            self.assertEqual(parse_task_id(TaskIdGenerator()())[1], 42)
+
+    @skipUnless(hasattr(os, 'fork'), 'needs fork')
+    def test_leased_worker_ids_are_distinct(self):
+        """Test that generators lease different worker ids until the range runs out"""
+        lease_file = os.path.join(tempfile.mkdtemp(), 'task-ids.lock')
+        generators = []
+        with override_settings(TASK_ID_LEASE_FILE=lease_file, TASK_ID_WORKER_RANGE=(5, 6)), \
+                mock.patch.dict(os.environ, clear=True):
+            try:
+                for _ in range(2):
+                    generators.append(TaskIdGenerator())
+                    generators[-1]()
+                self.assertEqual([parse_task_id(generator())[1] for generator in generators], [5, 6])
+                with self.assertRaises(RuntimeError):
+                    TaskIdGenerator()()
+                # Running out must not drop the leases already held.
+                self.assertTrue(_lease_held_elsewhere(lease_file, 5))
+                self.assertTrue(_lease_held_elsewhere(lease_file, 6))
+            finally:
+                for generator in generators:
+                    ids.release_worker_id(generator.worker_id)
+
+    @skipUnless(hasattr(os, 'fork'), 'needs fork')
+    def test_forked_workers(self):
+        """Test that forked workers pick distinct worker ids"""
+        context = multiprocessing.get_context('fork')
+        queue, barrier = context.Queue(), context.Barrier(4)
+        workers = [context.Process(target=_child_ids, args=(queue, barrier)) for _ in range(4)]
+        for worker in workers:
+            worker.start()
+        batches = [queue.get(timeout=30) for _ in workers]
+        for worker in workers:
+            worker.join()
+        ids = [task_id for batch in batches for task_id in batch]
+        self.assertEqual(len(set(ids)), len(ids))
+        self.assertEqual(len({parse_task_id(batch[0])[1] for batch in batches}), 4)
+
+
+class TaskIdCreateTest(TestCase):
+    """Test creating many tasks within the same second"""
+    def test_rapid_creates_do_not_collide(self):
+        """Test that back to back creates by one user all succeed"""
+        user = get_user_model().objects.create_user(email='example@gmail.com', password='test@123')
+        client = APIClient()
+        client.force_authenticate(user=user)
+        task_data = {
+            'title': 'Test Task',
+            'description': 'This is a test task',
+            'status': 'pending',
+            'due_date': '2099-12-25',
+        }
+        for _ in range(20):
+            response = client.post(TASK_URL, task_data, format='json')
+            self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(TaskModel.objects.values('task_id').distinct().count(), 20)
@@ -0,0 +1,170 @@
+import base64
+from datetime import date
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from task import throttling
+from task.models import TaskModel
+
+TASK_URL = reverse('task:task-list')
+ASYNC_TASK_URL = reverse('task:async_task_list')
+EXPORT_URL = reverse('task:task-export')
+USER_TOKEN = reverse('task:token')
+METRICS_URL = reverse('task:metrics')
+
+RATES = {'login': '2/min', 'reads': '3/min', 'writes': '1/min', 'export': '1/min'}
+
+def createUser(email='example@gmail.com', password='test@123'):
+    return get_user_model().objects.create_user(email=email, password=password)
+
+def basic_auth(email, password):
+    return 'Basic ' + base64.b64encode(f'{email}:{password}'.encode()).decode()
+
+
+@override_settings(TASK_THROTTLE_RATES=RATES)
+class ThrottleApiTest(TestCase):
+    """Test per client rate limiting of the API"""
+    def setUp(self):
+        cache.clear()
+        throttling.get_backend().clear()
+        self.addCleanup(throttling.get_backend().clear)
+        self.user = createUser()
+        self.token = Token.objects.create(user=self.user)
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.token.key}')
+
+    def test_reads_throttled_with_retry_after(self):
+        """Test that the request past the burst gets a 429 and Retry-After"""
+        for _ in range(3):
+            self.assertEqual(self.client.get(TASK_URL).status_code, status.HTTP_200_OK)
+        response = self.client.get(TASK_URL)
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertEqual(response['Retry-After'], '20')
+
+    def test_buckets_per_client_and_scope(self):
+        """Test that other tokens and other scopes have their own buckets"""
+        for _ in range(3):
+            self.client.get(TASK_URL)
+        self.assertEqual(self.client.get(TASK_URL).status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        response = self.client.post(TASK_URL, {'title': 'Task', 'description': 'D', 'status': 'pending',
+                                               'due_date': date.today()}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+        other = APIClient(REMOTE_ADDR='10.0.0.2')
+        other.credentials(HTTP_AUTHORIZATION=f'Token {Token.objects.create(user=createUser("other@gmail.com")).key}')
+        self.assertEqual(other.get(TASK_URL).status_code, status.HTTP_200_OK)
+
+    def test_credentials_are_limited_on_every_ip(self):
+        """Test that a token keeps its bucket when it moves to another address"""
+        for _ in range(3):
+            self.client.get(TASK_URL)
+        response = self.client.get(TASK_URL, REMOTE_ADDR='10.0.0.2')
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+
+    def test_made_up_credentials_share_the_ip_bucket(self):
+        """Test that a new bogus token per request does not get a fresh bucket"""
+        for i in range(3):
+            response = APIClient().get(TASK_URL, HTTP_AUTHORIZATION=f'Token bogus{i}')
+            self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        response = APIClient().get(TASK_URL, HTTP_AUTHORIZATION='Token bogus3')
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+
+    def test_basic_auth_guesses_are_throttled(self):
+        """Test that password guesses on the metrics view are refused before the hash"""
+        for i in range(3):
+            APIClient().get(METRICS_URL, HTTP_AUTHORIZATION=basic_auth(self.user.email, f'guess{i}'))
+        with mock.patch('rest_framework.authentication.authenticate') as authenticate:
+            response = APIClient().get(METRICS_URL, HTTP_AUTHORIZATION=basic_auth(self.user.email, 'guess3'))
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        authenticate.assert_not_called()
+
+    def test_export_scope(self):
+        """Test that export has its own, smaller bucket"""
+        TaskModel.objects.create(user=self.user, task_id=1, title='Task', description='D',
+                                 due_date=date.today(), status='pending')
+        self.assertEqual(self.client.get(EXPORT_URL).status_code, status.HTTP_200_OK)
+        self.assertEqual(self.client.get(EXPORT_URL).status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertEqual(self.client.get(TASK_URL).status_code, status.HTTP_200_OK)
+
+    def test_throttled_before_authentication(self):
+        """Test that a throttled request is refused without touching the database"""
+        for _ in range(3):
+            self.client.get(TASK_URL)
+        cache.clear()
+        with self.assertNumQueries(0):
+            response = self.client.get(TASK_URL)
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+
+    def test_async_views_share_the_buckets(self):
+        """Test that the async API is throttled too, in the same buckets"""
+        for _ in range(2):
+            self.assertEqual(self.client.get(TASK_URL).status_code, status.HTTP_200_OK)
+        self.assertEqual(self.client.get(ASYNC_TASK_URL).status_code, status.HTTP_200_OK)
+        response = self.client.get(ASYNC_TASK_URL)
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertEqual(response['Retry-After'], '20')
+        self.assertIn('throttled', response.json()['detail'])
+        response = self.client.patch(reverse('task:async_completed', args=[1]))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        response = self.client.patch(reverse('task:async_completed', args=[1]))
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+
+    def test_login_per_ip(self):
+        """Test that token requests are counted per IP and refused before the password check"""
+        payload = {'email': self.user.email, 'password': 'test@123'}
+        for _ in range(2):
+            self.assertEqual(APIClient().post(USER_TOKEN, payload).status_code, status.HTTP_200_OK)
+        with mock.patch('task.views.AuthTokenSerializer.validate') as validate:
+            response = APIClient().post(USER_TOKEN, payload)
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        validate.assert_not_called()
+        response = APIClient().post(USER_TOKEN, payload, REMOTE_ADDR='10.0.0.2')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+
+class LocalBackendTest(SimpleTestCase):
+    """Test the in process token buckets"""
+    def setUp(self):
+        self.now = 100 * throttling.NS
+        self.backend = throttling.LocalBackend(max_keys=2, clock=lambda: self.now)
+
+    def test_refill(self):
+        """Test bursts and the steady refill rate"""
+        burst, interval = throttling.parse_rate('2/s')
+        self.assertEqual((burst, interval), (2, throttling.NS // 2))
+        self.assertEqual(self.backend.take('a', burst, interval), 0.0)
+        self.assertEqual(self.backend.take('a', burst, interval), 0.0)
+        self.assertAlmostEqual(self.backend.take('a', burst, interval), 0.5)
+        self.now += interval
+        self.assertEqual(self.backend.take('a', burst, interval), 0.0)
+        self.assertAlmostEqual(self.backend.take('a', burst, interval), 0.5)
+
+    def test_sweep(self):
+        """Test that refilled buckets are forgotten past max_keys"""
+        self.backend.take('a', 1, throttling.NS)
+        self.now += 2 * throttling.NS
+        self.backend.take('b', 1, throttling.NS)
+        self.backend.take('c', 1, throttling.NS)
+        self.assertEqual(sorted(self.backend._full_at), ['b', 'c'])
+
+    def test_first_take_is_never_refused(self):
+        """Test that a fresh bucket always has its burst, whatever the clock reads"""
+        for burst, interval in (throttling.parse_rate('1/min'), throttling.parse_rate('7/s')):
+            for now in range(100 * throttling.NS, 1000 * throttling.NS, 7919 * 10 ** 6):
+                self.now = now
+                self.backend.clear()
+                waits = [self.backend.take('a', burst, interval) for _ in range(burst)]
+                self.assertEqual(waits, [0.0] * burst)
+
+    def test_parse_rate(self):
+        self.assertEqual(throttling.parse_rate('120/min'), (120, throttling.NS // 2))
+        self.assertEqual(throttling.parse_rate('24/day'), (24, 3600 * throttling.NS))
+        self.assertIsNone(throttling.parse_rate(None))
@@ -0,0 +1,170 @@
+'''
+Token bucket rate limiting for the API, per scope (login, reads, writes,
+export) and per client.
+
+Every request takes a token from the bucket of its IP address, and one
+from the bucket of the credentials it sends (the Authorization header or
+the session cookie) as well. Neither needs a lookup, so ThrottleFirstMixin
+can turn a request away before authentication hashes a password or reads
+a token from the database. Made up credentials get a fresh bucket each,
+but the IP bucket still runs dry.
+'''
+import hashlib
+import importlib
+import time
+
+from django.conf import settings
+
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.throttling import BaseThrottle
+
+NS = 10 ** 9
+PERIODS = {'s': 1, 'sec': 1, 'm': 60, 'min': 60, 'h': 3600, 'hour': 3600, 'd': 86400, 'day': 86400}
+
+
+def parse_rate(rate):
+    '''
+    '120/min' -> (120 requests of burst, one token every 0.5 seconds). The
+    interval is in integer nanoseconds, so the bucket arithmetic is exact.
+    '''
+    if rate is None:
+        return None
+    count, _, period = rate.partition('/')
+    count, period = int(count), PERIODS[period.strip().lower()]
+    return count, period * NS // count
+
+
+class LocalBackend:
+    '''
+    Buckets in process memory. Each bucket is kept as the single time at
+    which it would be full again (the GCRA form of a token bucket), so a take
+    is one read and one dict store without a lock. Two threads racing for
+    the last token of a bucket may both get it; that one extra request is
+    the price of taking no lock.
+    '''
+    def __init__(self, max_keys=None, clock=time.monotonic_ns):
+        self.max_keys = max_keys or settings.TASK_THROTTLE_MAX_KEYS
+        self.clock = clock
+        self._full_at = {}
+        self._swept_at = 0
+
+    def take(self, key, burst, interval):
+        '''Seconds to wait before a token is available, 0.0 if one was taken'''
+        now = self.clock()
+        full_at = max(self._full_at.get(key, now), now) + interval
+        wait = full_at - now - burst * interval
+        if wait > 0:
+            return wait / NS
+        self._full_at[key] = full_at
+        if len(self._full_at) > self.max_keys:
+            self._sweep(now)
+        return 0.0
+
+    def _sweep(self, now):
+        '''Forget the buckets that have refilled, they are the same as no bucket'''
+        if now - self._swept_at < NS:
+            return
+        self._swept_at = now
+        for key, full_at in list(self._full_at.items()):
+            if full_at <= now:
+                self._full_at.pop(key, None)
+
+    def clear(self):
+        self._full_at.clear()
+
+
+class RedisBackend:
+    '''
+    Buckets shared by every worker, in Redis (TASK_THROTTLE_REDIS_URL). The
+    take runs as one Lua script, so it is atomic across processes. Times are
+    integer microseconds there: Lua numbers are doubles, which hold epoch
+    microseconds exactly but not nanoseconds.
+    '''
+    script = '''
+        local now = tonumber(ARGV[1])
+        local burst, interval = tonumber(ARGV[2]), tonumber(ARGV[3])
+        local full_at = math.max(tonumber(redis.call('GET', KEYS[1]) or now), now) + interval
+        local wait = full_at - now - burst * interval
+        if wait > 0 then
+            return string.format('%d', wait)
+        end
+        redis.call('SET', KEYS[1], string.format('%d', full_at), 'PX', math.ceil((full_at - now) / 1000))
+        return '0'
+    '''
+
+    def __init__(self):
+        import redis
+
+        self.client = redis.Redis.from_url(settings.TASK_THROTTLE_REDIS_URL)
+        self._take = self.client.register_script(self.script)
+
+    def take(self, key, burst, interval):
+        wait = self._take(keys=[f'task-throttle:{key}'], args=[time.time_ns() // 1000, burst, interval // 1000])
+        return int(wait) / 10 ** 6
+
+    def clear(self):
+        for key in self.client.scan_iter('task-throttle:*'):
+            self.client.delete(key)
+
+
+_backend = None
+
+
+def get_backend():
+    global _backend
+    if _backend is None:
+        module, _, name = settings.TASK_THROTTLE_BACKEND.rpartition('.')
+        _backend = getattr(importlib.import_module(module), name)()
+    return _backend
+
+
+def client_key(request):
+    '''The credentials the request carries, hashed, or None'''
+    credentials = request.META.get('HTTP_AUTHORIZATION') or request.COOKIES.get(settings.SESSION_COOKIE_NAME)
+    if not credentials:
+        return None
+    return hashlib.sha256(credentials.encode()).hexdigest()[:32]
+
+
+class TokenBucketThrottle(BaseThrottle):
+    '''
+    Token buckets per scope, IP and credentials, sized by TASK_THROTTLE_RATES.
+    The scope is the view's `throttle_scopes` entry for the action, else its
+    `throttle_scope`, else reads or writes by the method. The login scope
+    counts per IP only, the credentials are in the body there.
+    '''
+    def get_scope(self, request, view):
+        scopes = getattr(view, 'throttle_scopes', {})
+        scope = scopes.get(getattr(view, 'action', None)) or getattr(view, 'throttle_scope', None)
+        return scope or ('reads' if request.method in SAFE_METHODS else 'writes')
+
+    def allow_request(self, request, view):
+        scope = self.get_scope(request, view)
+        rate = parse_rate(settings.TASK_THROTTLE_RATES.get(scope))
+        if rate is None:
+            return True
+        backend = get_backend()
+        self.retry_after = backend.take(f'{scope}:ip:{self.get_ident(request)}', *rate)
+        if self.retry_after:
+            return False
+        key = client_key(request) if scope != 'login' else None
+        if key:
+            self.retry_after = backend.take(f'{scope}:client:{key}', *rate)
+        return not self.retry_after
+
+    def wait(self):
+        return self.retry_after
+
+
+class ThrottleFirstMixin:
+    '''
+    Check the throttles before authentication and permissions rather than
+    after them, as DRF does, so a throttled client costs no password hash or
+    token lookup.
+    '''
+    def perform_authentication(self, request):
+        super().check_throttles(request)
+        super().perform_authentication(request)
+
+    def check_throttles(self, request):
+        '''Already done by perform_authentication'''
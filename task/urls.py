@@ -3,13 +3,15 @@ app_name = 'task'
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 from django.contrib.auth import views as auth_views
-from task.views import TaskView, CreateUserView, CreateTokenView, ManageUserView, CompleteTaskView
+from task.views import ArchiveView, TaskView, CreateUserView, CreateTokenView, ManageUserView, CompleteTaskView, BatchView, RequestMetricsView, task_events
+from task import async_views
 from task.views import TaskListView, DetailTaskView, CreateTaskView, UpdateTaskView, DeleteTaskView, signupAdmin, signupUser, LogoutView, homeView
 
 
 
 router = DefaultRouter()
 router.register('task', TaskView, basename='task')
+router.register('archive', ArchiveView, basename='archive')
 
 urlpatterns = [
     path('', homeView, name='home' ),
@@ -25,9 +27,18 @@ urlpatterns = [
     path('task/<pk>/update/', UpdateTaskView.as_view(), name='update_task'),
     path('task/<pk>/delete/', DeleteTaskView.as_view(), name='delete_task'),
 
+    # Before the router, which would read 'events' as a task pk.
+    path('api/v1/task/events/', task_events, name='events'),
     path('api/v1/', include(router.urls)),
     path('api/v1/task/<pk>/completed', CompleteTaskView.as_view(), name='completed'),
     path('api/v1/register/', CreateUserView.as_view(), name='register'),
     path('api/v1/token/', CreateTokenView.as_view(), name='token'),
     path('api/v1/user/', ManageUserView.as_view(), name='user'),
+    path('api/v1/metrics/', RequestMetricsView.as_view(), name='metrics'),
+    path('api/v1/batch/', BatchView.as_view(), name='batch'),
+
+    # Async native task API for ASGI deployments
+    path('api/v1/async/task/', async_views.task_list, name='async_task_list'),
+    path('api/v1/async/task/<pk>/', async_views.task_detail, name='async_task_detail'),
+    path('api/v1/async/task/<pk>/completed', async_views.complete_task, name='async_completed'),
 ]
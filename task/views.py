@@ -1,5 +1,5 @@
 # Backend Modules
-from django.http import HttpResponse, Http404
+from django.http import HttpResponse, Http404, JsonResponse, StreamingHttpResponse
 from django.shortcuts import render, redirect
 from django.contrib.auth import views as auth_views
 from django.urls import reverse, reverse_lazy
@@ -8,16 +8,39 @@ from django.contrib.auth.mixins import LoginRequiredMixin
 from django.contrib.auth import get_user_model
 
 # API Modules
-from rest_framework import viewsets, status, generics, authentication, permissions
+from rest_framework import viewsets, status, generics, permissions
+from rest_framework.decorators import action
+from rest_framework.parsers import MultiPartParser
 from rest_framework.authtoken.views import ObtainAuthToken
 from rest_framework.settings import api_settings
 from rest_framework.response import Response
+from rest_framework.views import APIView
+from rest_framework.exceptions import NotFound
+from rest_framework.generics import get_object_or_404
+from rest_framework.utils.urls import replace_query_param
 
 # Database, Serializers Modules
 from datetime import datetime
-from task.models import TaskModel
-from task.serializers import TaskSerializer, UserSerializer, AuthTokenSerializer
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from task.models import ArchivedTask, TaskModel
+from task.authentication import CachedTokenAuthentication, aauthenticate
+from task.ids import next_task_id
+from task.caching import cache_get, cache_set, invalidate, list_cache_key
+from task.instrumentation import route_stats
+from task.conditional import list_validators, not_modified, set_validators, task_validators
+from task.serializers import ArchivedTaskSerializer, TaskSerializer, TaskBulkSerializer, TaskExportSerializer, TaskSearchSerializer, UserSerializer, AuthTokenSerializer, selected_fields
 from task.forms import UserCreateForm, TaskCreationForm
+from task.exports import CONTENT_TYPES, EXPORT_FIELDS, STREAMERS
+from task.fastpath import RowEncoder
+from task.filters import TaskListFilterSerializer
+from task.imports import IMPORT_FORMATS, guess_format, import_tasks
+from task.search import search_tasks
+from task.batch import BatchSerializer, run_batch
+from task.throttling import ThrottleFirstMixin, TokenBucketThrottle
+from task import archive, events, stats as task_stats, sync as task_sync
+from task.pagination import TaskCursorPagination, InvalidCursor, decode_cursor, encode_cursor, get_page_size, paginate_keyset
 
 # Create your views here.
 
@@ -64,34 +87,61 @@ class TaskListView(ListView, LoginRequiredMixin):
     model = TaskModel
     context_object_name = 'task_list'
     template_name = 'task/tasklist.html'
+    ordering = ('-due_date', '-id')
     def get_queryset(self):
-        if self.request.user.is_superuser or self.request.user.is_admin:
-            self.queryset = TaskModel.objects.all().order_by('-due_date')
+        all_users = self.request.user.is_superuser or self.request.user.is_admin
+        if all_users:
+            self.queryset = TaskModel.objects.select_related('user').all()
         else:
-            self.queryset = TaskModel.objects.filter(user = self.request.user).all().order_by('-due_date')
-        return super().get_queryset()
+            self.queryset = TaskModel.objects.select_related('user').filter(user = self.request.user).all()
+        key = list_cache_key(self.request.user, 'html', self.request.build_absolute_uri(), all_users)
+        cached = cache_get(key)
+        if cached is not None:
+            rows, self.next_cursor, self.previous_cursor = cached
+            return rows
+        token = self.request.GET.get('cursor')
+        try:
+            cursor = decode_cursor(token, self.ordering) if token else None
+        except InvalidCursor:
+            raise Http404("Invalid cursor")
+        page_size = get_page_size(self.request.GET.get('page_size'))
+        rows, self.next_cursor, self.previous_cursor = paginate_keyset(super().get_queryset(), self.ordering, cursor, page_size)
+        cache_set(key, (rows, self.next_cursor, self.previous_cursor))
+        return rows
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['next_cursor'] = encode_cursor(self.next_cursor) if self.next_cursor else None
+        context['previous_cursor'] = encode_cursor(self.previous_cursor) if self.previous_cursor else None
+        return context
     
 class DetailTaskView(DetailView, LoginRequiredMixin):
     model = TaskModel
+    queryset = TaskModel.objects.select_related('user')
     context_object_name = 'task'
     template_name = 'task/taskdetail.html'
     def dispatch(self, request, *args, **kwargs):
         try:
             self.object = self.get_object()
-            if request.user.is_superuser or request.user.is_admin or self.object.user == request.user:
+            if request.user.is_superuser or request.user.is_admin or self.object.user_id == request.user.id:
                 return super().dispatch(request, *args, **kwargs)
             else:
                 return HttpResponse("You are not authorized to view this task", status=403)
         except Http404:
             return HttpResponse("Task not found.", status=404)
 
+    def get(self, request, *args, **kwargs):
+        # dispatch already loaded the task for the permission check
+        context = self.get_context_data(object=self.object)
+        return self.render_to_response(context)
+
 class CreateTaskView(CreateView, LoginRequiredMixin):
     model = TaskModel
     template_name = 'task/taskcreate.html'
     form_class = TaskCreationForm
     def form_valid(self, form):
         form.instance.user = self.request.user
-        form.instance.task_id = datetime.now().strftime("%Y%m%d%H%M%S") + str(form.instance.user.id)
+        form.instance.task_id = next_task_id()
         return super().form_valid(form)
     
     def get_success_url(self):
@@ -105,14 +155,14 @@ class UpdateTaskView(UpdateView, LoginRequiredMixin):
     def dispatch(self, request, *args, **kwargs):
         try:
             self.object = self.get_object()
-            if request.user.is_superuser or request.user.is_admin or self.object.user == request.user:
+            if request.user.is_superuser or request.user.is_admin or self.object.user_id == request.user.id:
                 return super().dispatch(request, *args, **kwargs)
             else:
                 return HttpResponse("You are not authorized to update this task", status=403)
         except Http404:
             return HttpResponse("Task not found.", status=404)
     def form_valid(self, form):
-        if form.instance.user!= self.request.user:
+        if form.instance.user_id!= self.request.user.id:
             return Response({"Error": "You can't update this task"}, status=status.HTTP_403_FORBIDDEN)
         form.instance.updated_at = datetime.now()
         return super().form_valid(form)
@@ -128,7 +178,7 @@ class DeleteTaskView(DeleteView, LoginRequiredMixin):
     def dispatch(self, request, *args, **kwargs):
         try:
             self.object = self.get_object()
-            if request.user.is_superuser or request.user.is_admin or self.object.user == request.user:
+            if request.user.is_superuser or request.user.is_admin or self.object.user_id == request.user.id:
                 return super().dispatch(request, *args, **kwargs)
             else:
                 return HttpResponse("You are not authorized to Delete this task", status=403)
@@ -138,16 +188,20 @@ class DeleteTaskView(DeleteView, LoginRequiredMixin):
 
 # <------------------- API Views ------------------------------->
 
-class CreateUserView(generics.CreateAPIView):
+class CreateUserView(ThrottleFirstMixin, generics.CreateAPIView):
     serializer_class = UserSerializer
+    throttle_scope = 'login'
 
-class CreateTokenView(ObtainAuthToken):
+class CreateTokenView(ThrottleFirstMixin, ObtainAuthToken):
     serializer_class = AuthTokenSerializer
     renderer_classes = api_settings.DEFAULT_RENDERER_CLASSES
+    # ObtainAuthToken turns throttling off, the password hash needs it most.
+    throttle_classes = [TokenBucketThrottle]
+    throttle_scope = 'login'
 
-class ManageUserView(generics.RetrieveUpdateAPIView):
+class ManageUserView(ThrottleFirstMixin, generics.RetrieveUpdateAPIView):
     serializer_class = UserSerializer
-    authentication_classes = [authentication.TokenAuthentication]
+    authentication_classes = [CachedTokenAuthentication]
     permission_classes = [permissions.IsAuthenticated]
     http_method_names = ['get', 'patch']
     def update(self, request, *args, **kwargs):
@@ -159,12 +213,14 @@ class ManageUserView(generics.RetrieveUpdateAPIView):
     def get_object(self):
         return self.request.user
 
-class TaskView(viewsets.ModelViewSet):
+class TaskView(ThrottleFirstMixin, viewsets.ModelViewSet):
     queryset = TaskModel.objects.all()
     serializer_class = TaskSerializer
-    authentication_classes = [authentication.TokenAuthentication]
+    authentication_classes = [CachedTokenAuthentication]
     permission_classes = [permissions.IsAuthenticated]
-    http_method_names = ['get', 'post', 'put', 'delete']
+    http_method_names = ['get', 'post', 'put', 'patch', 'delete']
+    pagination_class = TaskCursorPagination
+    throttle_scopes = {'export': 'export'}
 
     def get_queryset(self):
         if self.request.user.is_superuser:
@@ -172,27 +228,63 @@ class TaskView(viewsets.ModelViewSet):
         else:
             self.queryset = TaskModel.objects.filter(user = self.request.user).all()
         return super().get_queryset()
+
+    def list(self, request, *args, **kwargs):
+        fields = selected_fields(request.query_params)
+        url = request.build_absolute_uri()
+        key = list_cache_key(request.user, 'api', url)
+        cached = cache_get(key)
+        if cached is not None:
+            etag, last_modified, data = cached
+            return not_modified(request, etag, last_modified) or set_validators(Response(data), etag, last_modified)
+        # Filters first, so a bad query string is a 400 and never a 304.
+        params = TaskListFilterSerializer(data=request.query_params,
+                                          context={'all_users': request.user.is_superuser})
+        params.is_valid(raise_exception=True)
+        etag, last_modified = list_validators(self.get_queryset(), request.user, url)
+        response = not_modified(request, etag, last_modified)
+        if response is not None:
+            return response
+        self.list_ordering = params.validated_data['ordering']
+        # Rows skip the model and TaskSerializer, see task.fastpath.
+        encoder = RowEncoder(fields=fields, extra=[field.lstrip('-') for field in self.list_ordering])
+        page = self.paginate_queryset(encoder.values(params.filter(self.get_queryset())))
+        data = self.get_paginated_response(encoder.encode(page)).data
+        cache_set(key, (etag, last_modified, data))
+        return set_validators(Response(data), etag, last_modified)
+
+    def retrieve(self, request, *args, **kwargs):
+        fields = selected_fields(request.query_params)
+        if fields is None:
+            task = self.get_object()
+        else:
+            # Read only the asked for columns, and what the ETag is made of.
+            task = get_object_or_404(self.get_queryset().only(*fields, 'id', 'updated_at'), pk=kwargs['pk'])
+            self.check_object_permissions(request, task)
+        etag, last_modified = task_validators(task, fields)
+        response = not_modified(request, etag, last_modified)
+        if response is not None:
+            return response
+        return set_validators(Response(self.get_serializer(task, fields=fields).data), etag, last_modified)
     
     def create(self, request):
-        data = request.data
+        data = request.data.copy()
         data['due_date'] = datetime.strptime(data['due_date'], "%Y-%m-%d" ).date()
-        data['user'] = self.request.user.id
 
         serializer = TaskSerializer(data=data)
         if serializer.is_valid():
-            serializer.save()
+            serializer.save(user=self.request.user)
             return Response(serializer.data, status=status.HTTP_201_CREATED)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
     
-    def update(self, request, pk, **kwargs):
+    def update(self, request, pk, partial=False, **kwargs):
         task = TaskModel.objects.get(pk=pk)
-        if task.user!= self.request.user:
+        if task.user_id!= self.request.user.id:
             return Response({'error': 'You are not authorized to update this task.'}, status=status.HTTP_403_FORBIDDEN)
-        data = request.data
+        data = request.data.copy()
         if 'due_date' in data:
             data['due_date'] = datetime.strptime(data['due_date'], "%Y-%m-%d" ).date()
-        data['user'] = self.request.user.id
-        serializer = TaskSerializer(task, data=data)
+        serializer = TaskSerializer(task, data=data, partial=partial)
         if serializer.is_valid():
             serializer.save()
             return Response(serializer.data)
@@ -200,25 +292,255 @@ class TaskView(viewsets.ModelViewSet):
     
     def delete(self, request, pk):
         task = TaskModel.objects.get(pk=pk)
-        if task.user!= self.request.user:
+        if task.user_id!= self.request.user.id:
             return Response({'error': 'You are not authorized to delete this task.'}, status=status.HTTP_403_FORBIDDEN)
         task.delete()
         return Response({'Message': "Deleted Successfully..."}, status=status.HTTP_204_NO_CONTENT)
 
-class CompleteTaskView(generics.UpdateAPIView):
+    @action(detail=False, methods=['post'], url_path='bulk')
+    def bulk(self, request):
+        '''Create, update and delete many tasks in one transaction'''
+        bulk = TaskBulkSerializer(data=request.data)
+        bulk.is_valid(raise_exception=True)
+        creates = bulk.validated_data['create']
+        updates = bulk.validated_data['update']
+        deletes = bulk.validated_data['delete']
+
+        create_serializer = TaskSerializer(data=creates, many=True)
+        update_serializer = TaskSerializer(data=updates, many=True, partial=True)
+        create_serializer.is_valid()
+        update_serializer.is_valid()
+        errors = {
+            'create': list(create_serializer.errors) or [{} for _ in creates],
+            'update': list(update_serializer.errors) or [{} for _ in updates],
+            'delete': [{} for _ in deletes],
+        }
+
+        update_ids = [item.get('id') for item in updates]
+        batch_size = settings.TASK_BULK_BATCH_SIZE
+        # Bulk writes skip the model signals, so the counter changes are
+        # recorded here; deletes still send post_delete, and their counter
+        # changes and tombstones are batched too. The tombstones are written
+        # last, right before the commit.
+        with transaction.atomic(), task_sync.deferred(), task_stats.deferred():
+            # Locked and read inside the transaction, so the counter changes
+            # start from the rows as they are, not as another writer left them.
+            tasks = TaskModel.objects.select_for_update().filter(user=request.user).in_bulk(
+                [pk for pk in update_ids + deletes if isinstance(pk, int)]
+            )
+            seen = set()
+            for index, pk in enumerate(update_ids):
+                if pk not in tasks or pk in seen:
+                    errors['update'][index] = {**errors['update'][index], 'id': ['Task not found or repeated.']}
+                seen.add(pk)
+            for index, pk in enumerate(deletes):
+                if pk not in tasks or pk in seen:
+                    errors['delete'][index] = {'id': ['Task not found or repeated.']}
+                seen.add(pk)
+            if any(any(item for item in errors[key]) for key in errors):
+                return Response(errors, status=status.HTTP_400_BAD_REQUEST)
+
+            created = TaskModel.objects.bulk_create(
+                [
+                    TaskModel(user=request.user, task_id=next_task_id(), **data)
+                    for data in create_serializer.validated_data
+                ],
+                batch_size=batch_size,
+            )
+            task_stats.record(task_stats.added(created))
+            updated = []
+            fields = set()
+            for pk, data in zip(update_ids, update_serializer.validated_data):
+                task = tasks[pk]
+                before = task_stats.counter_key(task)
+                for attr, val in data.items():
+                    setattr(task, attr, val)
+                task_stats.record(task_stats.moved(before, task_stats.counter_key(task)))
+                fields.update(data)
+                updated.append(task)
+            if fields:
+                TaskModel.objects.bulk_update(updated, sorted(fields), batch_size=batch_size)
+            if deletes:
+                TaskModel.objects.filter(user=request.user, id__in=deletes).delete()
+            # Stamped in one statement after all the writes, so the commit
+            # follows within TASK_SYNC_LAG_SECONDS however large the batch.
+            written = created + updated
+            if written:
+                now = timezone.now()
+                TaskModel.objects.filter(id__in=[task.pk for task in written]).update(updated_at=now)
+                for task in written:
+                    task.updated_at = now
+                task_sync.check_commit_lag('bulk task writes')
+            invalidate(request.user.pk)
+            if created or updated:
+                events.tasks_changed(request.user.pk, len(created) + len(updated))
+
+        return Response({
+            'create': TaskSerializer(created, many=True).data,
+            'update': TaskSerializer(updated, many=True).data,
+            'delete': [{'id': pk, 'deleted': True} for pk in deletes],
+        })
+
+    @action(detail=False, methods=['get'])
+    def export(self, request):
+        '''Stream every matching task as NDJSON or CSV without buffering the list'''
+        params = TaskExportSerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        filters = params.validated_data
+        queryset = self.get_queryset()
+        if 'status' in filters:
+            queryset = queryset.filter(status=filters['status'])
+        if 'due_after' in filters:
+            queryset = queryset.filter(due_date__gte=filters['due_after'])
+        if 'due_before' in filters:
+            queryset = queryset.filter(due_date__lte=filters['due_before'])
+        rows = queryset.order_by('due_date', 'id').values(*EXPORT_FIELDS).iterator(
+            chunk_size=settings.TASK_EXPORT_CHUNK_SIZE
+        )
+        file_format = filters['file_format']
+        response = StreamingHttpResponse(STREAMERS[file_format](rows), content_type=CONTENT_TYPES[file_format])
+        response['Content-Disposition'] = f'attachment; filename="tasks.{file_format}"'
+        return response
+
+    @action(detail=False, methods=['get'])
+    def stats(self, request):
+        '''Task counts by status and due date bucket, read from the TaskStat counters'''
+        today = timezone.localdate()
+        key = list_cache_key(request.user, 'stats', f'{request.user.pk}:{today}')
+        data = cache_get(key)
+        if data is None:
+            data = task_stats.user_stats(request.user, today)
+            cache_set(key, data)
+        return Response(data)
+
+    @action(detail=False, methods=['get'])
+    def sync(self, request):
+        '''Tasks created, updated or deleted since the cursor, for incremental client sync'''
+        token = request.query_params.get('cursor')
+        page_size = get_page_size(request.query_params.get('page_size'))
+        try:
+            cursor = task_sync.decode_sync_cursor(token) if token else None
+            encoder = RowEncoder()
+            page = task_sync.sync_page(encoder.values(self.get_queryset()), task_sync.tombstones_for(request.user),
+                                       cursor, page_size)
+        except InvalidCursor:
+            raise NotFound('Invalid cursor')
+        except task_sync.ExpiredCursor:
+            return Response({'detail': 'Cursor expired, sync again without a cursor.'}, status=status.HTTP_410_GONE)
+        return Response({
+            'changes': encoder.encode(page.changes),
+            'deleted': [
+                {'id': tombstone.task_pk, 'task_id': tombstone.task_id, 'deleted_at': tombstone.deleted_at}
+                for tombstone in page.deleted
+            ],
+            'cursor': task_sync.encode_sync_cursor(page.cursor),
+            'has_more': page.has_more,
+        })
+
+    @action(detail=False, methods=['get'])
+    def search(self, request):
+        '''Ranked full text search over the title and description'''
+        params = TaskSearchSerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        page = params.validated_data['page']
+        page_size = get_page_size(request.query_params.get('page_size'))
+        offset = (page - 1) * page_size
+        if offset >= settings.TASK_SEARCH_MAX_RESULTS:
+            return Response({'page': [f'Only the first {settings.TASK_SEARCH_MAX_RESULTS} results can be paged.']},
+                            status=status.HTTP_400_BAD_REQUEST)
+        tasks = search_tasks(request.user, params.validated_data['q'], page_size + 1, offset)
+        has_next = len(tasks) > page_size and offset + page_size < settings.TASK_SEARCH_MAX_RESULTS
+        url = request.build_absolute_uri()
+        return Response({
+            'next': replace_query_param(url, 'page', page + 1) if has_next else None,
+            'previous': replace_query_param(url, 'page', page - 1) if page > 1 else None,
+            'results': TaskSerializer(tasks[:page_size], many=True).data,
+        })
+
+    @action(detail=False, methods=['post'], url_path='import', parser_classes=[MultiPartParser])
+    def import_file(self, request):
+        '''Import an uploaded CSV or NDJSON file chunk by chunk'''
+        upload = request.FILES.get('file')
+        if upload is None:
+            return Response({'file': ['No file was submitted.']}, status=status.HTTP_400_BAD_REQUEST)
+        file_format = request.data.get('file_format') or guess_format(upload.name)
+        if file_format not in IMPORT_FORMATS:
+            return Response({'file_format': ['Invalid file format.']}, status=status.HTTP_400_BAD_REQUEST)
+        result = import_tasks(request.user, upload, file_format)
+        return Response(result.as_dict(), status=status.HTTP_201_CREATED if result.created else status.HTTP_400_BAD_REQUEST)
+
+class CompleteTaskView(ThrottleFirstMixin, generics.UpdateAPIView):
     queryset = TaskModel.objects.all()
     serializer_class = TaskSerializer
-    authentication_classes = [authentication.TokenAuthentication]
+    authentication_classes = [CachedTokenAuthentication]
     permission_classes = [permissions.IsAuthenticated]
     http_method_names = ['patch']
 
     def update(self, request, pk, **kwargs):
         task = TaskModel.objects.get(pk=pk)
-        if task.user!= self.request.user:
+        if task.user_id!= self.request.user.id:
             return Response({'error': 'You are not authorized to update this task.'}, status=status.HTTP_403_FORBIDDEN)
         data = {"status": "completed"}
         serializer = TaskSerializer(task, data=data, partial=True)
         if serializer.is_valid():
             serializer.save()
             return Response(serializer.data)
-        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
\ No newline at end of file
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+class ArchiveView(ThrottleFirstMixin, viewsets.ReadOnlyModelViewSet):
+    '''Archived tasks, most recently completed first; restore moves one back to the task list'''
+    serializer_class = ArchivedTaskSerializer
+    authentication_classes = [CachedTokenAuthentication]
+    permission_classes = [permissions.IsAuthenticated]
+    pagination_class = TaskCursorPagination
+    list_ordering = ('-updated_at', '-id')
+
+    def get_queryset(self):
+        if self.request.user.is_superuser:
+            return ArchivedTask.objects.all()
+        return ArchivedTask.objects.filter(user=self.request.user)
+
+    @action(detail=True, methods=['post'])
+    def restore(self, request, pk=None):
+        try:
+            task = archive.restore(self.get_object())
+        except ArchivedTask.DoesNotExist:
+            raise NotFound
+        return Response(TaskSerializer(task).data, status=status.HTTP_201_CREATED)
+
+class BatchView(ThrottleFirstMixin, APIView):
+    '''Run a list of API requests in one round trip, see task.batch'''
+    authentication_classes = [CachedTokenAuthentication]
+    permission_classes = [permissions.IsAuthenticated]
+    # Each sub-request is throttled in its own scope.
+    throttle_classes = []
+
+    def post(self, request):
+        batch = BatchSerializer(data=request.data)
+        batch.is_valid(raise_exception=True)
+        results, committed = run_batch(request, batch.validated_data['requests'], batch.validated_data['atomic'])
+        return Response({'committed': committed, 'responses': results})
+
+class RequestMetricsView(ThrottleFirstMixin, APIView):
+    '''Aggregated per route costs collected by RequestMetricsMiddleware'''
+    permission_classes = [permissions.IsAdminUser]
+
+    def get(self, request):
+        return Response(route_stats.snapshot())
+
+    def delete(self, request):
+        route_stats.reset()
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+async def task_events(request):
+    '''Server-Sent Events stream of the user's task changes; needs an ASGI server'''
+    user = await aauthenticate(request)
+    if user is None:
+        return JsonResponse({'detail': 'Authentication credentials were not provided.'}, status=status.HTTP_401_UNAUTHORIZED)
+    scope = events.ALL_USERS if user.is_superuser else user.pk
+    response = StreamingHttpResponse(events.stream(scope), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    # Keep nginx from buffering the stream.
+    response['X-Accel-Buffering'] = 'no'
+    return response